@@ -0,0 +1,302 @@
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Any, Optional, Tuple, Callable
+from urllib.parse import urlparse, parse_qs, quote
+
+BENCHMARK_USER: str = 'bench-user'
+BENCHMARK_OWNER: str = 'bench-org'
+DEFAULT_BRANCH: str = 'main'
+STATS_PATH: str = '/_benchmark/stats'
+RESET_STATS_PATH: str = '/_benchmark/reset'
+NOTIFY_PATH: str = '/_benchmark/notify'
+# Like GitHub, a search only serves its first results whatever its match count
+SEARCH_MAX_RESULTS: int = 1000
+# One PR created per hour from then on, so searches can be narrowed by creation date
+CREATED_AT_START: float = 1704067200
+# GitHub asks for 60 seconds, refreshes run back to back here
+NOTIFICATIONS_POLL_INTERVAL: int = 0
+
+
+class FakeGithubData:
+    def __init__(self, base_url: str, repositories: int, active_ratio: float, prs_per_repository: int,
+                 reviews_per_pr: int, seed: int):
+        self.base_url = base_url
+        self.repositories: List[Dict[str, Any]] = []
+        self.pull_requests: Dict[str, List[Dict[str, Any]]] = {}
+        self.reviews: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        self.protected_repositories: set = set()
+        self.notifications: List[Dict[str, Any]] = []
+        self.created_pull_requests = 0
+        randomizer = random.Random(seed)
+
+        for index in range(repositories):
+            repository: Dict[str, Any] = self._build_repository(f'repo-{index:05d}')
+            name: str = repository['name']
+            self.repositories.append(repository)
+            if randomizer.random() < 0.5:
+                self.protected_repositories.add(name)
+            is_active: bool = randomizer.random() < active_ratio
+            self.pull_requests[name] = [self._build_pull_request(repository, number, randomizer)
+                                        for number in range(1, prs_per_repository + 1)] if is_active else []
+            for pull_request in self.pull_requests[name]:
+                self.reviews[(name, pull_request['number'])] = [
+                    self._build_review(review_id, randomizer) for review_id in range(reviews_per_pr)]
+
+    def _build_repository(self, name: str) -> Dict[str, Any]:
+        full_name: str = f'{BENCHMARK_OWNER}/{name}'
+        return {'id': abs(hash(full_name)) % 10 ** 9, 'name': name, 'full_name': full_name,
+                'owner': self._build_user(BENCHMARK_OWNER), 'private': True,
+                'html_url': f'https://github.com/{full_name}', 'url': f'{self.base_url}/repos/{full_name}',
+                'default_branch': DEFAULT_BRANCH, 'archived': False}
+
+    def _build_pull_request(self, repository: Dict[str, Any], number: int, randomizer: random.Random) -> Dict[str, Any]:
+        author: str = BENCHMARK_USER if randomizer.random() < 0.2 else f'user-{randomizer.randint(0, 50)}'
+        requested: List[Dict[str, Any]] = [self._build_user(BENCHMARK_USER)] if randomizer.random() < 0.3 else []
+        url: str = f'{repository["url"]}/pulls/{number}'
+        created_at: str = time.strftime('%Y-%m-%dT%H:%M:%SZ',
+                                        time.gmtime(CREATED_AT_START + self.created_pull_requests * 3600))
+        self.created_pull_requests += 1
+        return {'id': number, 'number': number, 'state': 'open', 'title': f'Change #{number} of {repository["name"]}',
+                'url': url, 'html_url': f'{repository["html_url"]}/pull/{number}',
+                'draft': randomizer.random() < 0.2, 'user': self._build_user(author),
+                'maintainer_can_modify': randomizer.random() < 0.1, 'requested_reviewers': requested,
+                'requested_teams': [], 'updated_at': '2024-01-01T00:00:00Z', 'created_at': created_at,
+                'head': {'ref': f'feature-{number}', 'sha': f'{number:040d}', 'repo': repository},
+                'base': {'ref': DEFAULT_BRANCH, 'sha': '0' * 40, 'repo': repository}}
+
+    def _build_review(self, review_id: int, randomizer: random.Random) -> Dict[str, Any]:
+        login: str = BENCHMARK_USER if randomizer.random() < 0.2 else f'user-{randomizer.randint(0, 50)}'
+        state: str = randomizer.choice(['APPROVED', 'COMMENTED', 'CHANGES_REQUESTED'])
+        return {'id': review_id, 'user': self._build_user(login), 'state': state}
+
+    def add_notification(self, name: str) -> None:
+        repository: Dict[str, Any] = next(repo for repo in self.repositories if repo['name'] == name)
+        pull_requests: List[Dict[str, Any]] = self.pull_requests[name]
+        subject_url: str = pull_requests[0]['url'] if pull_requests else repository['url']
+        updated_at: str = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        self.notifications.insert(0, {'id': str(len(self.notifications) + 1), 'unread': True, 'reason': 'subscribed',
+                                      'updated_at': updated_at, 'repository': repository,
+                                      'subject': {'title': 'Benchmark change', 'url': subject_url,
+                                                  'type': 'PullRequest'}})
+
+    def _build_user(self, login: str) -> Dict[str, Any]:
+        return {'login': login, 'id': abs(hash(login)) % 10 ** 9, 'type': 'User',
+                'url': f'{self.base_url}/users/{login}'}
+
+
+class FakeGithubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: 'FakeGithubServer'
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        if parsed.path == STATS_PATH:
+            return self._send_json(200, self.server.get_stats())
+        if parsed.path == RESET_STATS_PATH:
+            self.server.reset_stats()
+            return self._send_json(200, {})
+        if parsed.path == NOTIFY_PATH:
+            self.server.data.add_notification(parse_qs(parsed.query)['repository'][0])
+            return self._send_json(200, {})
+
+        time.sleep(self.server.latency)
+        for pattern, template, handler in self.server.routes:
+            match = pattern.fullmatch(parsed.path)
+            if match is not None:
+                if self.server.should_fail():
+                    self.server.count(template, 502)
+                    return self._send_json(502, {'message': 'Server Error'})
+                query: Dict[str, List[str]] = parse_qs(parsed.query)
+                status, body = handler(query, *match.groups())
+                return self._send_paginated(template, status, body, query, parsed.path)
+        self._send_json(404, {'message': 'Not Found'})
+        self.server.count('unknown', 404)
+
+    def _send_paginated(self, template: str, status: int, body: Any, query: Dict[str, List[str]], path: str) -> None:
+        link: Optional[str] = None
+        # Search results wrap the paginated list in an envelope
+        items: Any = body['items'] if isinstance(body, dict) and 'items' in body else body
+        if isinstance(items, list):
+            per_page: int = int(query.get('per_page', ['30'])[0])
+            page: int = int(query.get('page', ['1'])[0])
+            if page * per_page < len(items):
+                params: str = '&'.join(f'{key}={quote(values[0])}' for key, values in query.items() if key != 'page')
+                link = f'<{self.server.base_url}{path}?{params}&page={page + 1}>; rel="next"'
+            items = items[(page - 1) * per_page:page * per_page]
+            body = {**body, 'items': items} if isinstance(body, dict) else items
+
+        payload: bytes = json.dumps(body).encode()
+        etag: str = f'"{hashlib.md5(payload).hexdigest()}"'
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.server.count(template, 304)
+            return self._send(304, b'', {'ETag': etag})
+        self.server.count(template, status)
+        headers: Dict[str, str] = {'ETag': etag, 'Content-Type': 'application/json; charset=utf-8',
+                                   **self.server.route_headers.get(template, {})}
+        if link is not None:
+            headers['Link'] = link
+        self._send(status, payload, headers)
+
+    def _send_json(self, status: int, body: Any) -> None:
+        self._send(status, json.dumps(body).encode(), {'Content-Type': 'application/json; charset=utf-8'})
+
+    def _send(self, status: int, payload: bytes, headers: Dict[str, str]) -> None:
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('X-RateLimit-Resource', 'core')
+        self.send_header('X-RateLimit-Limit', '5000')
+        self.send_header('X-RateLimit-Remaining', '5000')
+        self.send_header('X-RateLimit-Reset', str(int(time.time()) + 3600))
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class FakeGithubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    _REPOSITORY: str = r'/repos/([^/]+)/([^/]+)'
+
+    def __init__(self, repositories: int, active_ratio: float, prs_per_repository: int, reviews_per_pr: int,
+                 latency: float, seed: int = 0, port: int = 0, error_rate: float = 0):
+        super().__init__(('127.0.0.1', port), FakeGithubRequestHandler)
+        self.base_url: str = f'http://127.0.0.1:{self.server_address[1]}'
+        self.latency = latency
+        # Share of requests answered with a transient "502 Bad Gateway"
+        self.error_rate = error_rate
+        self.error_randomizer = random.Random(seed)
+        self.data = FakeGithubData(self.base_url, repositories, active_ratio, prs_per_repository, reviews_per_pr, seed)
+        self.counters: Counter = Counter()
+        self.counters_lock = threading.Lock()
+        self.routes: List[Tuple[re.Pattern, str, Callable[..., Tuple[int, Any]]]] = [
+            (re.compile(r'/user'), '/user', self._get_user),
+            (re.compile(r'/user/repos'), '/user/repos', self._get_repositories),
+            (re.compile(r'/user/orgs'), '/user/orgs', self._get_organizations),
+            (re.compile(r'/search/issues'), '/search/issues', self._search_issues),
+            (re.compile(r'/notifications'), '/notifications', self._get_notifications),
+            (re.compile(self._REPOSITORY), '/repos/{owner}/{repo}', self._get_repository),
+            (re.compile(self._REPOSITORY + r'/pulls'), '/repos/{owner}/{repo}/pulls', self._get_pull_requests),
+            (re.compile(self._REPOSITORY + r'/pulls/(\d+)/reviews'), '/repos/{owner}/{repo}/pulls/{number}/reviews',
+             self._get_reviews),
+            (re.compile(self._REPOSITORY + r'/pulls/(\d+)/requested_reviewers'),
+             '/repos/{owner}/{repo}/pulls/{number}/requested_reviewers', self._get_requested_reviewers),
+            (re.compile(self._REPOSITORY + r'/branches/([^/]+)'), '/repos/{owner}/{repo}/branches/{branch}',
+             self._get_branch),
+            (re.compile(self._REPOSITORY + r'/branches/([^/]+)/protection/required_pull_request_reviews'),
+             '/repos/{owner}/{repo}/branches/{branch}/protection/required_pull_request_reviews',
+             self._get_required_pull_request_reviews),
+        ]
+
+    @property
+    def route_headers(self) -> Dict[str, Dict[str, str]]:
+        return {'/notifications': {'X-Poll-Interval': str(NOTIFICATIONS_POLL_INTERVAL)}}
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients dropping keep-alive connections, e.g. after a retried error, are not server errors
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def should_fail(self) -> bool:
+        with self.counters_lock:
+            return self.error_randomizer.random() < self.error_rate
+
+    def count(self, template: str, status: int) -> None:
+        with self.counters_lock:
+            self.counters[f'{template} {status}'] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.counters_lock:
+            return dict(self.counters)
+
+    def reset_stats(self) -> None:
+        with self.counters_lock:
+            self.counters.clear()
+
+    def _get_user(self, query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        return 200, self.data._build_user(BENCHMARK_USER)
+
+    def _get_repositories(self, query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        return 200, self.data.repositories
+
+    def _get_notifications(self, query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        return 200, self.data.notifications
+
+    def _get_organizations(self, query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        return 200, [self.data._build_user(BENCHMARK_OWNER)]
+
+    def _search_issues(self, query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        qualifiers: List[str] = query.get('q', [''])[0].split()
+        pull_requests: List[Dict[str, Any]] = [
+            pull_request for repository_pull_requests in self.data.pull_requests.values()
+            for pull_request in repository_pull_requests if self._matches_search(pull_request, qualifiers)]
+        items: List[Dict[str, Any]] = [
+            {**pull_request, 'url': pull_request['url'].replace('/pulls/', '/issues/'),
+             'repository_url': pull_request['base']['repo']['url'],
+             'pull_request': {'url': pull_request['url']}} for pull_request in pull_requests]
+        return 200, {'total_count': len(items), 'incomplete_results': False, 'items': items[:SEARCH_MAX_RESULTS]}
+
+    @staticmethod
+    def _matches_search(pull_request: Dict[str, Any], qualifiers: List[str]) -> bool:
+        for qualifier in qualifiers:
+            # Every repository belongs to the benchmark organization
+            if qualifier.startswith(('user:', 'org:')) and qualifier.partition(':')[2] != BENCHMARK_OWNER:
+                return False
+            if qualifier == 'author:@me' and pull_request['user']['login'] != BENCHMARK_USER:
+                return False
+            if qualifier == 'review-requested:@me' and not any(
+                    user['login'] == BENCHMARK_USER for user in pull_request['requested_reviewers']):
+                return False
+            if qualifier.startswith('created:'):
+                # Only the `start..end` form, both bounds in the format of `created_at` so they compare as strings
+                start, _, end = qualifier[len('created:'):].partition('..')
+                if not start <= pull_request['created_at'] <= end:
+                    return False
+        return True
+
+    def _get_repository(self, query: Dict[str, List[str]], owner: str, name: str) -> Tuple[int, Any]:
+        repository = next((repo for repo in self.data.repositories if repo['name'] == name), None)
+        return (200, repository) if repository is not None else (404, {'message': 'Not Found'})
+
+    def _get_pull_requests(self, query: Dict[str, List[str]], owner: str, name: str) -> Tuple[int, Any]:
+        return 200, self.data.pull_requests.get(name, [])
+
+    def _get_reviews(self, query: Dict[str, List[str]], owner: str, name: str, number: str) -> Tuple[int, Any]:
+        return 200, self.data.reviews.get((name, int(number)), [])
+
+    def _get_requested_reviewers(self, query: Dict[str, List[str]], owner: str, name: str,
+                                 number: str) -> Tuple[int, Any]:
+        pull_request = next(pr for pr in self.data.pull_requests[name] if pr['number'] == int(number))
+        return 200, {'users': pull_request['requested_reviewers'], 'teams': []}
+
+    def _get_branch(self, query: Dict[str, List[str]], owner: str, name: str, branch: str) -> Tuple[int, Any]:
+        url: str = f'{self.base_url}/repos/{owner}/{name}/branches/{branch}'
+        return 200, {'name': branch, 'protected': name in self.data.protected_repositories,
+                     'protection_url': f'{url}/protection', 'commit': {'sha': '0' * 40}}
+
+    def _get_required_pull_request_reviews(self, query: Dict[str, List[str]], owner: str, name: str,
+                                           branch: str) -> Tuple[int, Any]:
+        if name not in self.data.protected_repositories:
+            return 404, {'message': 'Branch not protected'}
+        return 200, {'url': f'{self.base_url}/repos/{owner}/{name}/branches/{branch}/protection/'
+                            f'required_pull_request_reviews',
+                     'dismissal_restrictions': {'users': [self.data._build_user(BENCHMARK_USER)], 'teams': []},
+                     'dismiss_stale_reviews': False, 'require_code_owner_reviews': False,
+                     'required_approving_review_count': 2}
+
+
+def serve(port_queue: Any, repositories: int, active_ratio: float, prs_per_repository: int, reviews_per_pr: int,
+          latency: float, seed: int, error_rate: float = 0) -> None:
+    server = FakeGithubServer(repositories, active_ratio, prs_per_repository, reviews_per_pr, latency, seed,
+                              error_rate=error_rate)
+    port_queue.put(server.base_url)
+    server.serve_forever()
@@ -0,0 +1,95 @@
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import List, Dict, Any, Callable, Tuple
+
+from github import Github
+from github.PullRequest import PullRequest
+from github.PullRequestReview import PullRequestReview
+from github.Requester import Requester
+from github.RequiredPullRequestReviews import RequiredPullRequestReviews
+
+from benchmarks.fake_github_server import FakeGithubData, BENCHMARK_USER
+from github_pr_monitor.models.branch_protection_info import BranchProtectionInfo
+from github_pr_monitor.models.pull_request_info import PullRequestInfo
+from github_pr_monitor.models.reviewers_info import ReviewersInfo
+
+DEFAULT_PULL_REQUESTS: int = 10000
+PULL_REQUESTS_PER_REPOSITORY: int = 5
+FAKE_BASE_URL: str = 'http://127.0.0.1:1'
+
+# Raw JSON of a pull request, its reviews and its branch protection, as answered by the API
+PullRequestPayloads = Tuple[bytes, bytes, bytes]
+
+
+def build_payloads(pull_requests: int, reviews_per_pr: int) -> List[PullRequestPayloads]:
+    data = FakeGithubData(FAKE_BASE_URL, pull_requests // PULL_REQUESTS_PER_REPOSITORY, 1.0,
+                          PULL_REQUESTS_PER_REPOSITORY, reviews_per_pr, seed=0)
+    required_reviews: bytes = json.dumps({'dismissal_restrictions': {'users': [data._build_user(BENCHMARK_USER)]},
+                                          'required_approving_review_count': 2}).encode()
+    return [(json.dumps(pull_request).encode(),
+             json.dumps(data.reviews[(name, pull_request['number'])]).encode(),
+             required_reviews)
+            for name, repository_pull_requests in data.pull_requests.items()
+            for pull_request in repository_pull_requests]
+
+
+def build_github_objects(requester: Requester, payloads: PullRequestPayloads) -> Any:
+    # What was retained per PR when the models kept references to PyGithub objects
+    pull_request, reviews, required_reviews = (json.loads(payload) for payload in payloads)
+    return (PullRequest(requester, {}, pull_request, completed=True),
+            [PullRequestReview(requester, {}, review) for review in reviews],
+            RequiredPullRequestReviews(requester, {}, required_reviews, completed=True))
+
+
+def build_models(requester: Requester, payloads: PullRequestPayloads) -> Any:
+    pull_request, reviews, required_reviews = (json.loads(payload) for payload in payloads)
+    branch_protection_info = BranchProtectionInfo(
+        dismissal_users=[user['login'] for user in required_reviews['dismissal_restrictions']['users']],
+        required_approving_review_count=required_reviews['required_approving_review_count'])
+    reviewers_info = ReviewersInfo(author=pull_request['user']['login'],
+                                   maintainer_can_modify=pull_request['maintainer_can_modify'],
+                                   requested_reviewers=[user['login'] for user in pull_request['requested_reviewers']],
+                                   reviews=[(review['user']['login'], review['state']) for review in reviews],
+                                   branch_protection_info=branch_protection_info,
+                                   current_user=BENCHMARK_USER)
+    return PullRequestInfo(title=pull_request['title'],
+                           url=pull_request['html_url'],
+                           id=pull_request['number'],
+                           is_draft=pull_request['draft'],
+                           is_author=pull_request['user']['login'] == BENCHMARK_USER,
+                           reviewers_info=reviewers_info)
+
+
+def measure_retained_memory(build: Callable[[Requester, PullRequestPayloads], Any], requester: Requester,
+                            payloads: List[PullRequestPayloads]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    retained: List[Any] = [build(requester, pull_request_payloads) for pull_request_payloads in payloads]
+    gc.collect()
+    retained_memory: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del retained
+    return retained_memory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compare the memory retained per refresh by PR models')
+    parser.add_argument('-n', '--pull-requests', type=int, default=DEFAULT_PULL_REQUESTS, help='Number of PRs')
+    parser.add_argument('--reviews-per-pr', type=int, default=3, help='Reviews per pull request')
+    args = parser.parse_args()
+
+    requester: Requester = Github(base_url=FAKE_BASE_URL).requester
+    payloads: List[PullRequestPayloads] = build_payloads(args.pull_requests, args.reviews_per_pr)
+    results: Dict[str, int] = {
+        'PyGithub objects': measure_retained_memory(build_github_objects, requester, payloads),
+        'slotted models': measure_retained_memory(build_models, requester, payloads),
+    }
+    for name, retained_memory in results.items():
+        print(f'{name:>16}: {retained_memory / 2 ** 20:8.1f} MiB retained, '
+              f'{retained_memory / len(payloads):8.0f} bytes per PR')
+
+
+if __name__ == '__main__':
+    main()
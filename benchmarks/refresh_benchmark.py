@@ -0,0 +1,198 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import tracemalloc
+import urllib.request
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from benchmarks.fake_github_server import serve, STATS_PATH, RESET_STATS_PATH, NOTIFY_PATH
+from github_pr_monitor.app.repository_info_fetcher import RepositoryInfoFetcher
+from github_pr_monitor.config import HTTP_RESPONSE_CACHE, REQUEST_GUARD
+from github_pr_monitor.constants.app_setting_constants import REST_FETCH_BACKEND, ASYNC_FETCH_BACKEND, \
+    DISCOVERY_MODES, DEFAULT_DISCOVERY_MODE
+from github_pr_monitor.models.repository_info import RepositoryInfo
+
+DEFAULT_SCALES: List[int] = [10, 100, 1000, 5000]
+DEFAULT_BACKENDS: List[str] = [REST_FETCH_BACKEND, ASYNC_FETCH_BACKEND]
+DEFAULT_RESULTS_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+BENCHMARK_TOKEN: str = 'benchmark-token'
+THREAD_SAMPLING_INTERVAL: float = 0.01
+
+
+class PeakThreadSampler:
+    def __init__(self, interval: float = THREAD_SAMPLING_INTERVAL):
+        self.interval = interval
+        self.peak_threads = threading.active_count()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+
+    def __enter__(self) -> 'PeakThreadSampler':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop_event.set()
+        self.thread.join()
+
+    def _sample(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            # The sampler itself is not part of the measured workload
+            self.peak_threads = max(self.peak_threads, threading.active_count() - 1)
+
+
+class FakeGithubProcess:
+    def __init__(self, repositories: int, active_ratio: float, prs_per_repository: int, reviews_per_pr: int,
+                 latency: float, seed: int, error_rate: float = 0):
+        port_queue: multiprocessing.Queue = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=serve, daemon=True,
+                                               args=(port_queue, repositories, active_ratio, prs_per_repository,
+                                                     reviews_per_pr, latency, seed, error_rate))
+        self.process.start()
+        self.base_url: str = port_queue.get()
+
+    def get_stats(self) -> Dict[str, int]:
+        with urllib.request.urlopen(f'{self.base_url}{STATS_PATH}') as response:
+            return json.loads(response.read())
+
+    def reset_stats(self) -> None:
+        urllib.request.urlopen(f'{self.base_url}{RESET_STATS_PATH}').close()
+
+    def notify(self, repository_name: str) -> None:
+        urllib.request.urlopen(f'{self.base_url}{NOTIFY_PATH}?repository={repository_name}').close()
+
+    def stop(self) -> None:
+        self.process.terminate()
+        self.process.join()
+
+
+def run_refresh(fetcher: RepositoryInfoFetcher, server: FakeGithubProcess) -> Dict[str, Any]:
+    server.reset_stats()
+    tracemalloc.start()
+    completion_times: List[float] = []
+    start: float = time.perf_counter()
+    with PeakThreadSampler() as sampler:
+        repositories_info: List[RepositoryInfo] = fetcher.get_repositories_info(
+            BENCHMARK_TOKEN, None, lambda *_: completion_times.append(time.perf_counter() - start))
+    wall_time: float = time.perf_counter() - start
+    peak_memory: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    requests_by_endpoint: Dict[str, int] = server.get_stats()
+    request_stats: Dict[str, int] = REQUEST_GUARD.get_stats()
+    return {'wall_time': round(wall_time, 3),
+            'time_to_first_repository': round(completion_times[0], 3) if completion_times else None,
+            'repositories': len(repositories_info),
+            'pull_requests': sum(len(repository.pull_requests_info) for repository in repositories_info),
+            'requests': sum(requests_by_endpoint.values()),
+            'requests_by_endpoint': requests_by_endpoint,
+            'retries': request_stats[REQUEST_GUARD.RETRIES],
+            'failures': request_stats[REQUEST_GUARD.FAILURES],
+            'peak_memory_bytes': peak_memory,
+            'peak_threads': sampler.peak_threads}
+
+
+def run_scale(fetcher: RepositoryInfoFetcher, backends: List[str], args: argparse.Namespace,
+              repositories: int) -> Dict[str, Any]:
+    server = FakeGithubProcess(repositories, args.active_ratio, args.prs_per_repository, args.reviews_per_pr,
+                               args.latency, args.seed, args.error_rate)
+    results: Dict[str, Any] = {}
+    try:
+        fetcher.set_base_url(server.base_url)
+        for backend in backends:
+            fetcher.set_fetch_backend(backend)
+            fetcher.invalidate_cache()
+            HTTP_RESPONSE_CACHE.clear()
+            logging.info(f'Benchmarking {backend} backend with {repositories} repositories')
+            cold_results: Dict[str, Any] = run_refresh(fetcher, server)
+            for index in range(min(args.changed_repositories, repositories)):
+                server.notify(f'repo-{index:05d}')
+            results[backend] = {'cold': cold_results, 'warm': run_refresh(fetcher, server)}
+    finally:
+        server.stop()
+    return results
+
+
+def load_previous_results(results_dir: str) -> Optional[Dict[str, Any]]:
+    if not os.path.isdir(results_dir):
+        return None
+    result_files: List[str] = sorted(file_name for file_name in os.listdir(results_dir) if file_name.endswith('.json'))
+    if not result_files:
+        return None
+    with open(os.path.join(results_dir, result_files[-1])) as result_file:
+        return json.load(result_file)
+
+
+def print_report(results: Dict[str, Any], previous_results: Optional[Dict[str, Any]]) -> None:
+    print(f'{"repos":>6} {"backend":>8} {"run":>5} {"wall(s)":>9} {"first(s)":>9} {"requests":>9} {"peak MiB":>9}'
+          f' {"threads":>8} {"vs prev":>9}')
+    for scale, backends in results['scales'].items():
+        for backend, runs in backends.items():
+            for run, measures in runs.items():
+                comparison: str = '-'
+                try:
+                    previous: Dict[str, Any] = previous_results['scales'][scale][backend][run]
+                    comparison = f'{(measures["wall_time"] / previous["wall_time"] - 1) * 100:+.1f}%'
+                except (TypeError, KeyError, ZeroDivisionError):
+                    pass
+                first: str = f'{measures["time_to_first_repository"]:.3f}' \
+                    if measures.get('time_to_first_repository') is not None else '-'
+                print(f'{scale:>6} {backend:>8} {run:>5} {measures["wall_time"]:>9.3f} {first:>9}'
+                      f' {measures["requests"]:>9}'
+                      f' {measures["peak_memory_bytes"] / 2 ** 20:>9.1f} {measures["peak_threads"]:>8}'
+                      f' {comparison:>9}')
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Benchmark a full refresh against a local fake GitHub API')
+    parser.add_argument('-s', '--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help='Numbers of repositories to benchmark')
+    parser.add_argument('-b', '--backends', nargs='+', choices=DEFAULT_BACKENDS, default=DEFAULT_BACKENDS,
+                        help='Fetch backends to benchmark')
+    parser.add_argument('-d', '--discovery', choices=DISCOVERY_MODES, default=DEFAULT_DISCOVERY_MODE,
+                        help='How repositories with open pull requests are found')
+    parser.add_argument('-c', '--change-feed', action='store_true',
+                        help='Only refresh the repositories reported by the notifications feed after the cold run')
+    parser.add_argument('--changed-repositories', type=int, default=0,
+                        help='Repositories reported as changed by the notifications feed before the warm run')
+    parser.add_argument('--active-ratio', type=float, default=0.2,
+                        help='Share of repositories with open pull requests')
+    parser.add_argument('--prs-per-repository', type=int, default=5, help='Open pull requests per active repository')
+    parser.add_argument('--reviews-per-pr', type=int, default=3, help='Reviews per pull request')
+    parser.add_argument('--latency', type=float, default=0.02, help='Simulated latency of each request, in seconds')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='Share of requests answered with a transient "502 Bad Gateway"')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the generated data')
+    parser.add_argument('-o', '--output-dir', default=DEFAULT_RESULTS_DIR, help='Directory of the JSON results')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args: argparse.Namespace = parse_arguments()
+    logging.getLogger().setLevel(logging.WARNING)
+    fetcher = RepositoryInfoFetcher()
+    fetcher.set_discovery_mode(args.discovery)
+    fetcher.set_change_feed_enabled(args.change_feed)
+    results: Dict[str, Any] = {'date': datetime.now().isoformat(), 'parameters': vars(args), 'scales': {}}
+    try:
+        for repositories in args.scales:
+            results['scales'][str(repositories)] = run_scale(fetcher, args.backends, args, repositories)
+    finally:
+        if fetcher.async_fetcher is not None:
+            fetcher.async_fetcher.close()
+
+    previous_results: Optional[Dict[str, Any]] = load_previous_results(args.output_dir)
+    os.makedirs(args.output_dir, exist_ok=True)
+    result_path: str = os.path.join(args.output_dir, f'{datetime.now().strftime("%Y%m%d-%H%M%S")}.json')
+    with open(result_path, 'w') as result_file:
+        json.dump(results, result_file, indent=2)
+    print_report(results, previous_results)
+    print(f'Results written to {result_path}')
+
+
+if __name__ == '__main__':
+    main()
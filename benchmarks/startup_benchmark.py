@@ -0,0 +1,60 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import List, Dict, Any
+
+DEFAULT_RUNS: int = 10
+# Only loaded in the background once the status item is shown
+LAZY_MODULES: List[str] = ['github', 'keyring', 'aiohttp']
+CRITICAL_PATH_MODULE: str = 'github_pr_monitor.app.github_pull_request_monitor_app'
+BACKGROUND_MODULES: List[str] = ['github_pr_monitor.app.repository_info_fetcher',
+                                 'github_pr_monitor.security.keyring_manager']
+
+# Run in a fresh interpreter each time, so nothing is already imported
+MEASURE_SCRIPT: str = '''
+import importlib, json, sys, time
+start = time.perf_counter()
+importlib.import_module({critical_path_module!r})
+critical_path = time.perf_counter() - start
+loaded = [module for module in {lazy_modules!r} if module in sys.modules]
+start = time.perf_counter()
+for module in {background_modules!r}:
+    importlib.import_module(module)
+print(json.dumps({{'critical_path': critical_path, 'background': time.perf_counter() - start, 'loaded': loaded}}))
+'''
+
+
+def measure_startup() -> Dict[str, Any]:
+    script: str = MEASURE_SCRIPT.format(critical_path_module=CRITICAL_PATH_MODULE, lazy_modules=LAZY_MODULES,
+                                        background_modules=BACKGROUND_MODULES)
+    output: str = subprocess.run([sys.executable, '-c', script], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Measure the imports on the startup path of the menu bar app')
+    parser.add_argument('-n', '--runs', type=int, default=DEFAULT_RUNS, help='Number of fresh interpreters')
+    parser.add_argument('--budget', type=float, help='Fail if the median startup path exceeds this (ms)')
+    args = parser.parse_args()
+
+    runs: List[Dict[str, Any]] = [measure_startup() for _ in range(args.runs)]
+    critical_paths: List[float] = [run['critical_path'] * 1000 for run in runs]
+    backgrounds: List[float] = [run['background'] * 1000 for run in runs]
+    loaded: List[str] = sorted({module for run in runs for module in run['loaded']})
+    print(f'    startup path: median {statistics.median(critical_paths):7.1f} ms, min {min(critical_paths):7.1f} ms')
+    print(f'      background: median {statistics.median(backgrounds):7.1f} ms, min {min(backgrounds):7.1f} ms')
+
+    failures: List[str] = []
+    if loaded:
+        failures.append(f'lazily loaded modules imported on the startup path: {", ".join(loaded)}')
+    if args.budget is not None and statistics.median(critical_paths) > args.budget:
+        failures.append(f'median startup path over the {args.budget} ms budget')
+    for failure in failures:
+        print(f'FAILED: {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,35 @@
+import http
 import logging
-from time import time
-from typing import List, Optional, Any
+import math
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple, Dict, Any, Set, Iterable
+from urllib.parse import quote
 
-from github import Github, GithubException
+from github import Github, GithubException, BadCredentialsException, RateLimitExceededException
 from github.Auth import Token
-from github.Branch import Branch
+from github.Issue import Issue
 from github.PaginatedList import PaginatedList
 from github.PullRequest import PullRequest
-from github.PullRequestReview import PullRequestReview
 from github.Repository import Repository
-from github.RequiredPullRequestReviews import RequiredPullRequestReviews
 
-from github_pr_monitor.config import APPLICATION_MAX_THREADS
+from github_pr_monitor.config import APPLICATION_MAX_THREADS, HTTP_RESPONSE_CACHE, TRACE_RECORDER
+from github_pr_monitor.constants.api_constants import GITHUB_API_URL, REST_PAGE_SIZE, SEARCH_MAX_RESULTS, \
+    OPEN_PULL_REQUESTS_SEARCH_QUERY, SEARCH_CREATED_START, SEARCH_MIN_CREATED_RANGE
+from github_pr_monitor.constants.app_setting_constants import CACHE_MAX_ENTRIES, CACHE_NAMESPACE_TTLS, \
+    DEFAULT_CACHE_TTL, BRANCH_PROTECTION_CACHE_NAMESPACE
+from github_pr_monitor.managers.cache_manager import CacheManager
+from github_pr_monitor.managers.single_flight import SingleFlight
+from github_pr_monitor.models.branch_protection_info import BranchProtectionInfo
 from github_pr_monitor.models.reviewers_info import ReviewersInfo
+from github_pr_monitor.network.github_connection import install_shared_session_connection_classes
+from github_pr_monitor.network.http_cache import HttpResponseCache
 
 
 class GithubAPIFetcher:
     _DEFAULT_POOL_SIZE: int = APPLICATION_MAX_THREADS
-    _CACHE_EXPIRY: int = 3600
+    _NO_PROTECTION_STATUSES: Tuple[int, int] = (http.HTTPStatus.FORBIDDEN, http.HTTPStatus.NOT_FOUND)
+    # Unprotected branches are cached as None
+    _MISSING: object = object()
     _instance = None
 
     def __new__(cls, *args, **kwargs):
@@ -29,68 +41,205 @@ class GithubAPIFetcher:
         if not hasattr(self, 'initialized'):
             self.github: Optional[Github] = None
             self.github_pat = None
+            self.base_url = GITHUB_API_URL
             self.pool_size = self._DEFAULT_POOL_SIZE
+            # Lowercase logins of the users and organizations whose repositories are fetched, all of them when empty
+            self.owners: Set[str] = set()
             self.initialized = True
-            self.cache = {}
-            self.cache_expiry = self._CACHE_EXPIRY
+            self.cache = CacheManager(CACHE_MAX_ENTRIES, CACHE_NAMESPACE_TTLS, DEFAULT_CACHE_TTL)
+            self.branch_protection_requests = SingleFlight()
+            self.http_response_cache = HTTP_RESPONSE_CACHE
+            install_shared_session_connection_classes()
 
     def __del__(self):
-        self.github.close()
+        self._close_github_connection()
+
+    def set_base_url(self, base_url: str) -> None:
+        if base_url != self.base_url:
+            self._close_github_connection()
+            self.github_pat = None
+            self.base_url = base_url
 
     def open_github_connection(self, github_pat: str) -> None:
-        if github_pat != self.github_pat:
+        if github_pat != self.github_pat or self.github is None:
             if self.github is not None:
                 self._close_github_connection()
             self.github_pat = github_pat
             auth = Token(github_pat)
-            self.github = Github(auth=auth, pool_size=self.pool_size, per_page=100)
+            # Retries, backoff and the concurrency cap are handled by the request guard of the shared session,
+            # PyGithub's own retries and fixed delay between requests would stack on top of them
+            self.github = Github(auth=auth, base_url=self.base_url, pool_size=self.pool_size, per_page=REST_PAGE_SIZE,
+                                 retry=0, seconds_between_requests=None)
 
-    def get_all_repositories(self, filter_keyword: str = None) -> List[Repository]:
-        cache_key = f"repos__{filter_keyword or 'all'}"
-        cached_repos = self._get_from_cache(cache_key)
-
-        if cached_repos is not None:
-            return cached_repos
+    def set_owners(self, owners: Iterable[str]) -> None:
+        self.owners = {owner.lower() for owner in owners}
 
+    @TRACE_RECORDER.trace('discovery')
+    def get_all_repositories(self, filter_keyword: str = None) -> List[Repository]:
+        # Revalidated through the HTTP response cache, unchanged pages cost no rate limit
         repos = []
         for repo in self.github.get_user().get_repos():
-            if not filter_keyword or (filter_keyword.lower() in repo.name.lower()):
+            if (not filter_keyword or (filter_keyword.lower() in repo.name.lower())) and \
+                    self.is_owner_selected(self.owners, repo.full_name):
                 repos.append(repo)
-
-        self._add_to_cache(cache_key, repos)
         return repos
 
+    @TRACE_RECORDER.trace('discovery')
+    def discover_repositories(self, filter_keyword: str = None) -> List[Repository]:
+        # Only repositories with at least one open PR come back, so idle repositories cost nothing
+        repos: Dict[str, Repository] = {}
+        user = self.github.get_user()
+        # Organizations are not needed when the search is scoped to the selected owners
+        org_logins: List[str] = [org.login for org in user.get_orgs()] if not self.owners else []
+        pending_searches: List[Tuple[str, Optional[Tuple[datetime, datetime]]]] = [
+            (query, None) for query in self.get_open_pull_requests_search_queries(user.login, org_logins, self.owners)]
+        while pending_searches:
+            query, created_range = pending_searches.pop()
+            results: PaginatedList[Issue] = self.github.search_issues(self.get_search_query(query, created_range))
+            # Unlike `totalCount` alone, which counts the pages the search lets through, a page sets the match count
+            issues: List[Issue] = results.get_page(0)
+            split_created_ranges = self.split_search(query, created_range, results.totalCount)
+            if split_created_ranges:
+                pending_searches.extend((query, split_created_range) for split_created_range in split_created_ranges)
+                continue
+            for page in range(1, math.ceil(min(results.totalCount, SEARCH_MAX_RESULTS) / REST_PAGE_SIZE)):
+                issues.extend(results.get_page(page))
+            for issue in issues:
+                full_name: str = issue.repository_url.split('/repos/')[-1]
+                repo_name: str = full_name.split('/')[-1]
+                if full_name not in repos and (not filter_keyword or (filter_keyword.lower() in repo_name.lower())):
+                    # Built from the search result, `issue.repository` would cost one more request per PR
+                    repos[full_name] = self.build_repository({'url': issue.repository_url, 'name': repo_name,
+                                                              'full_name': full_name,
+                                                              'html_url': issue.html_url.rsplit('/pull/', 1)[0]})
+        return list(repos.values())
+
+    def build_repository(self, attributes: Dict[str, Any]) -> Repository:
+        # Missing attributes are only fetched when accessed
+        return Repository(self.github.requester, completed=False, attributes=attributes)
+
+    @staticmethod
+    def get_open_pull_requests_search_queries(login: str, org_logins: List[str], owners: Set[str]) -> List[str]:
+        # Review requests and authored PRs also cover repositories owned by other users. Selected owners replace
+        # these scopes, `user:` also matches the repositories of an organization
+        scopes: List[str] = [f'user:{owner}' for owner in sorted(owners)] if owners else \
+            [f'user:{login}'] + [f'org:{org_login}' for org_login in org_logins] + ['review-requested:@me', 'author:@me']
+        return [f'{OPEN_PULL_REQUESTS_SEARCH_QUERY} {scope}' for scope in scopes]
+
+    @staticmethod
+    def is_owner_selected(owners: Set[str], full_name: str) -> bool:
+        return not owners or full_name.split('/')[0].lower() in owners
+
+    @staticmethod
+    def get_search_query(query: str, created_range: Optional[Tuple[datetime, datetime]]) -> str:
+        if created_range is None:
+            return query
+        start, end = created_range
+        return f'{query} created:{start:%Y-%m-%dT%H:%M:%SZ}..{end:%Y-%m-%dT%H:%M:%SZ}'
+
+    @staticmethod
+    def split_search(query: str, created_range: Optional[Tuple[datetime, datetime]],
+                     total_count: int) -> List[Tuple[datetime, datetime]]:
+        # The search API stops at SEARCH_MAX_RESULTS, a query over it is run again on two halves of its creation
+        # dates until each one fits. Returns no range when the results of the query can be used as they are
+        if total_count <= SEARCH_MAX_RESULTS:
+            return []
+        start, end = created_range or (datetime.fromisoformat(SEARCH_CREATED_START),
+                                       datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=1))
+        search_query: str = GithubAPIFetcher.get_search_query(query, created_range)
+        if end - start < timedelta(seconds=SEARCH_MIN_CREATED_RANGE):
+            logging.warning(f'Search "{search_query}" matched {total_count} PRs, only the first '
+                            f'{SEARCH_MAX_RESULTS} were used to discover repositories')
+            return []
+        logging.info(f'Search "{search_query}" matched {total_count} PRs, split by creation date')
+        # Bounds are inclusive and creation dates are in seconds, the halves neither overlap nor leave a gap
+        middle: datetime = start + (end - start) // 2
+        return [(start, middle), (middle + timedelta(seconds=1), end)]
+
     def get_current_user_login(self) -> str:
         return self.github.get_user().login
 
+    @TRACE_RECORDER.trace('enrichment')
     def get_reviewers_info(self, pull_request: PullRequest, current_user: str) -> Optional[ReviewersInfo]:
         try:
-            branch_required_reviews: RequiredPullRequestReviews = self.get_branch_requested_reviewers(pull_request)
-            reviews: PaginatedList[PullRequestReview] = pull_request.get_reviews()
-
-            return ReviewersInfo(pull_request=pull_request, reviews=reviews,
-                                 branch_required_reviews=branch_required_reviews, current_user=current_user)
+            branch_protection_info: Optional[BranchProtectionInfo] = self.get_branch_requested_reviewers(pull_request)
+            reviews: List[Tuple[str, str]] = [(review.user.login, review.state) for review in pull_request.get_reviews()]
+            # Already part of the PR payload, `get_review_requests` would cost one more request per PR
+            requested_reviewers: List[str] = [user.login for user in pull_request.requested_reviewers]
+
+            return ReviewersInfo(author=pull_request.user.login,
+                                 maintainer_can_modify=pull_request.maintainer_can_modify,
+                                 requested_reviewers=requested_reviewers,
+                                 reviews=reviews,
+                                 branch_protection_info=branch_protection_info,
+                                 current_user=current_user)
+        except (BadCredentialsException, RateLimitExceededException):
+            # Not specific to this PR, the refresh fails as a whole and the app reports it
+            raise
         except GithubException as e:
             logging.warning(f'Failed to fetch PR reviewers information for repository {pull_request.head.repo}: {e}')
             return None
 
-    def get_branch_requested_reviewers(self, pull_request: PullRequest) -> Optional[RequiredPullRequestReviews]:
-        branch_name: str = pull_request.base.ref
-        repo_name: str = pull_request.head.repo.name
-        cache_key = f"repo__{repo_name}__{branch_name}_branch_protection"
-
-        if self._is_cached(cache_key) is True:
-            return self._get_from_cache(cache_key)
-
-        required_pull_request_review: Optional[RequiredPullRequestReviews] = None
+    def get_branch_requested_reviewers(self, pull_request: PullRequest) -> Optional[BranchProtectionInfo]:
+        return self.get_branch_protection_info(pull_request.base.repo, pull_request.base.ref)
+
+    def get_branch_protection_info(self, repository: Repository, branch_name: str) -> Optional[BranchProtectionInfo]:
+        cache_key: Tuple[str, str] = (repository.full_name, branch_name)
+        branch_protection_info = self.cache.get(BRANCH_PROTECTION_CACHE_NAMESPACE, cache_key, self._MISSING)
+        if branch_protection_info is not self._MISSING:
+            return branch_protection_info
+        # PRs of a repository mostly target the same branch, concurrent callers share a single request
+        return self.branch_protection_requests.do(cache_key, self._fetch_branch_protection_info, repository,
+                                                  branch_name, cache_key)
+
+    @TRACE_RECORDER.trace('enrichment')
+    def _fetch_branch_protection_info(self, repository: Repository, branch_name: str,
+                                      cache_key: Tuple[str, str]) -> Optional[BranchProtectionInfo]:
+        # A caller arriving right after the previous request completed finds it cached, its miss is already counted
+        cached_branch_protection_info = self.cache.get(BRANCH_PROTECTION_CACHE_NAMESPACE, cache_key, self._MISSING,
+                                                       record_stats=False)
+        if cached_branch_protection_info is not self._MISSING:
+            return cached_branch_protection_info
+
+        branch_protection_info: Optional[BranchProtectionInfo] = None
         try:
-            branch: Branch = pull_request.head.repo.get_branch(branch_name)
-            required_pull_request_review = branch.get_required_pull_request_reviews()
+            # One request instead of `get_branch()` followed by `get_required_pull_request_reviews()`
+            _, required_reviews = self.github.requester.requestJsonAndCheck(
+                'GET', f'{repository.url}/branches/{quote(branch_name, safe="")}/protection/'
+                       f'required_pull_request_reviews')
+            dismissal_restrictions: Dict[str, Any] = required_reviews.get('dismissal_restrictions') or {}
+            branch_protection_info = BranchProtectionInfo(
+                dismissal_users=[user['login'] for user in dismissal_restrictions.get('users') or []],
+                required_approving_review_count=required_reviews.get('required_approving_review_count') or 0)
         except GithubException as e:
-            logging.info(f'Failed to fetch branch protection information for repo "{repo_name}" on branch "{branch_name}": {e}')
-
-            self._add_to_cache(cache_key, required_pull_request_review)
-        return required_pull_request_review
+            # Transient failures are not cached, the caller keeps the last known reviews instead
+            if e.status not in self._NO_PROTECTION_STATUSES or isinstance(e, RateLimitExceededException):
+                raise
+            # Negative entry: the branch is not protected, or its protection is not visible with this token
+            logging.info(f'Failed to fetch branch protection information for repo "{repository.full_name}" '
+                         f'on branch "{branch_name}": {e}')
+
+        self.cache.set(BRANCH_PROTECTION_CACHE_NAMESPACE, cache_key, branch_protection_info)
+        return branch_protection_info
+
+    def invalidate_cache(self) -> None:
+        self.cache.invalidate()
+
+    def reset_cache_stats(self) -> None:
+        self.http_response_cache.reset_stats()
+        self.cache.reset_stats()
+        self.branch_protection_requests.reset_stats()
+
+    def log_cache_stats(self) -> None:
+        http_stats: Dict[str, int] = self.http_response_cache.get_stats()
+        logging.info(f'HTTP cache: {http_stats[HttpResponseCache.HITS]} hits (not modified), '
+                     f'{http_stats[HttpResponseCache.MISSES]} misses, '
+                     f'{http_stats[HttpResponseCache.REVALIDATIONS]} revalidations')
+        stats: Dict[str, int] = self.cache.get_stats()
+        logging.info(f'Cache: {stats[CacheManager.HITS]} hits, {stats[CacheManager.MISSES]} misses, '
+                     f'{stats[CacheManager.EVICTIONS]} evictions, {stats[CacheManager.EXPIRATIONS]} expirations, '
+                     f'{stats["size"]} entries, {self.branch_protection_requests.coalesced_calls} branch protection '
+                     f'requests coalesced')
 
     @staticmethod
     def get_pull_requests_for_repo(repository: Repository) -> PaginatedList[PullRequest]:
@@ -100,21 +249,3 @@ class GithubAPIFetcher:
         if self.github is not None:
             self.github.close()
             self.github = None
-
-    def _get_from_cache(self, key) -> Optional[Any]:
-        cached_data = self.cache.get(key)
-        if cached_data:
-            data, timestamp = cached_data
-            if time() - timestamp < self.cache_expiry:
-                return data
-            else:
-                del self.cache[key]
-                logging.info(f'Remove key "{key}" from cache')
-        return None
-
-    def _add_to_cache(self, key, data) -> None:
-        self.cache[key] = (data, time())
-        logging.info(f'Add key "{key}" to cache')
-
-    def _is_cached(self, key) -> bool:
-        return key in self.cache
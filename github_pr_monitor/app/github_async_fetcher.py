@@ -0,0 +1,310 @@
+import asyncio
+import concurrent.futures
+import http
+import logging
+import threading
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple, Callable, Set, Iterable
+from urllib.parse import quote
+
+import aiohttp
+from github import GithubException, RateLimitExceededException
+
+from github_pr_monitor.app.github_api_fetcher import GithubAPIFetcher
+from github_pr_monitor.config import RATE_LIMIT_TRACKER, TOKEN_POOL, REQUEST_GUARD, TRACE_RECORDER, METRICS_REGISTRY
+from github_pr_monitor.constants.api_constants import GITHUB_API_URL, GITHUB_HTTP_TIMEOUT, \
+    ASYNC_MAX_CONCURRENT_REQUESTS, REST_PAGE_SIZE
+from github_pr_monitor.constants.app_setting_constants import DEFAULT_DISCOVERY_MODE, SEARCH_DISCOVERY_MODE
+from github_pr_monitor.constants.metrics_constants import HTTP_REQUESTS_METRIC, REQUEST_ERROR_STATUS
+from github_pr_monitor.managers.cancellation_token import CancellationToken
+from github_pr_monitor.managers.trace_recorder import TraceRecorder
+from github_pr_monitor.models.branch_protection_info import BranchProtectionInfo
+from github_pr_monitor.models.pull_request_info import PullRequestInfo
+from github_pr_monitor.models.repository_info import RepositoryInfo
+from github_pr_monitor.models.reviewers_info import ReviewersInfo
+
+
+class GithubAsyncFetcher:
+    _RATE_LIMIT_STATUSES: Tuple[int, int] = (http.HTTPStatus.FORBIDDEN, http.HTTPStatus.TOO_MANY_REQUESTS)
+    _NO_PROTECTION_STATUSES: Tuple[int, int] = (http.HTTPStatus.FORBIDDEN, http.HTTPStatus.NOT_FOUND)
+
+    def __init__(self, base_url: str = GITHUB_API_URL):
+        self.base_url = base_url
+        self.github_pat: Optional[str] = None
+        self.discovery_mode = DEFAULT_DISCOVERY_MODE
+        self.owners: Set[str] = set()
+        self.max_concurrent_requests = ASYNC_MAX_CONCURRENT_REQUESTS
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread: Optional[threading.Thread] = None
+        self.loop_lock = threading.Lock()
+        # Only ever used from the event loop thread
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        # Repository URL -> info from the last refresh, kept for repositories that fail after all retries
+        self.last_repositories_info: Dict[str, RepositoryInfo] = {}
+        self.failed_repositories_count = 0
+
+    def set_base_url(self, base_url: str) -> None:
+        self.base_url = base_url
+
+    def set_discovery_mode(self, discovery_mode: str) -> None:
+        self.discovery_mode = discovery_mode
+
+    def set_owners(self, owners: Iterable[str]) -> None:
+        self.owners = {owner.lower() for owner in owners}
+
+    def set_max_concurrent_requests(self, max_concurrent_requests: int) -> None:
+        self.max_concurrent_requests = max_concurrent_requests
+        with self.loop_lock:
+            if self.loop is not None:
+                # The connector and semaphore are sized when the session is created
+                asyncio.run_coroutine_threadsafe(self._close_session(), self.loop).result()
+
+    def get_repositories_info(self, github_pat: str, repo_search_filter: Optional[str],
+                              on_repository_info: Optional[Callable[[RepositoryInfo, int, int], None]] = None) \
+            -> List[RepositoryInfo]:
+        self.github_pat = github_pat
+        cancellation_token: Optional[CancellationToken] = CancellationToken.get_current()
+        future: concurrent.futures.Future = asyncio.run_coroutine_threadsafe(
+            self._get_repositories_info(repo_search_filter, on_repository_info, cancellation_token), self._get_loop())
+        if cancellation_token is not None:
+            # Cancels every request in flight at once, instead of at their next attempt
+            cancellation_token.cancelled.add_done_callback(lambda _: future.cancel())
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError:
+            cancellation_token.raise_if_cancelled()
+            raise
+
+    def close(self) -> None:
+        with self.loop_lock:
+            if self.loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._close_session(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.loop_thread.join()
+            self.loop = None
+            self.loop_thread = None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self.loop_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+                self.loop_thread.start()
+            return self.loop
+
+    async def _close_session(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None:
+            # One keep-alive pool for the whole process, concurrency is bounded by the semaphore
+            connector = aiohttp.TCPConnector(limit=self.max_concurrent_requests)
+            self.session = aiohttp.ClientSession(connector=connector,
+                                                 timeout=aiohttp.ClientTimeout(total=GITHUB_HTTP_TIMEOUT),
+                                                 headers={'Accept': 'application/vnd.github+json'})
+            self.semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        return self.session
+
+    async def _get_repositories_info(self, repo_search_filter: Optional[str],
+                                     on_repository_info: Optional[Callable[[RepositoryInfo, int, int], None]],
+                                     cancellation_token: Optional[CancellationToken]) -> List[RepositoryInfo]:
+        if cancellation_token is not None:
+            # Tasks created from now on inherit it
+            cancellation_token.activate()
+        await self._get_session()
+        self.failed_repositories_count = 0
+        current_user: str = (await self._get_json(f'{self.base_url}/user'))['login']
+        if self.discovery_mode == SEARCH_DISCOVERY_MODE:
+            repositories: List[Dict[str, Any]] = await self._discover_repositories(current_user, repo_search_filter)
+        else:
+            repositories = [repo for repo in await self._get_all_pages(f'{self.base_url}/user/repos')
+                            if (not repo_search_filter or (repo_search_filter.lower() in repo['name'].lower())) and
+                            GithubAPIFetcher.is_owner_selected(self.owners, repo['full_name'])]
+
+        branch_protections: Dict[Tuple[str, str], asyncio.Task] = {}
+        repository_tasks: List[asyncio.Task] = [
+            asyncio.ensure_future(self._process_repo(repo, current_user, branch_protections)) for repo in repositories]
+        repositories_info: List[RepositoryInfo] = []
+        try:
+            for repository_task in asyncio.as_completed(repository_tasks):
+                repository_info: Optional[RepositoryInfo] = await repository_task
+                if repository_info is None:
+                    continue
+                repositories_info.append(repository_info)
+                if on_repository_info is not None:
+                    on_repository_info(repository_info, len(repositories_info), len(repository_tasks))
+        except BaseException:
+            for task in repository_tasks + list(branch_protections.values()):
+                task.cancel()
+            raise
+        self.last_repositories_info = {repository_info.url: repository_info for repository_info in repositories_info}
+        return sorted(repositories_info, key=lambda repository_info: repository_info.name)
+
+    @TRACE_RECORDER.trace('discovery')
+    async def _discover_repositories(self, current_user: str,
+                                     repo_search_filter: Optional[str]) -> List[Dict[str, Any]]:
+        # Organizations are not needed when the search is scoped to the selected owners
+        org_logins: List[str] = [org['login'] for org in await self._get_all_pages(f'{self.base_url}/user/orgs')] \
+            if not self.owners else []
+        repositories: Dict[str, Dict[str, Any]] = {}
+        pending_searches: List[Tuple[str, Optional[Tuple[datetime, datetime]]]] = [
+            (query, None) for query in GithubAPIFetcher.get_open_pull_requests_search_queries(current_user, org_logins,
+                                                                                              self.owners)]
+        while pending_searches:
+            query, created_range = pending_searches.pop()
+            page, next_url = await self._request(f'{self.base_url}/search/issues',
+                                                 {'q': GithubAPIFetcher.get_search_query(query, created_range),
+                                                  'per_page': str(REST_PAGE_SIZE)})
+            split_created_ranges = GithubAPIFetcher.split_search(query, created_range, page['total_count'])
+            if split_created_ranges:
+                pending_searches.extend((query, split_created_range) for split_created_range in split_created_ranges)
+                continue
+            items: List[Dict[str, Any]] = list(page['items'])
+            while next_url is not None:
+                page, next_url = await self._request(next_url)
+                items.extend(page['items'])
+            for item in items:
+                full_name: str = item['repository_url'].split('/repos/')[-1]
+                repo_name: str = full_name.split('/')[-1]
+                if not repo_search_filter or (repo_search_filter.lower() in repo_name.lower()):
+                    # Only the fields used by `_process_repo`, fetching each repository would cost a request
+                    repositories[full_name] = {'name': repo_name, 'full_name': full_name,
+                                               'url': item['repository_url'],
+                                               'html_url': item['html_url'].rsplit('/pull/', 1)[0]}
+        return list(repositories.values())
+
+    @TRACE_RECORDER.trace('listing')
+    async def _process_repo(self, repo: Dict[str, Any], current_user: str,
+                            branch_protections: Dict[Tuple[str, str], asyncio.Task]) -> Optional[RepositoryInfo]:
+        try:
+            prs: List[Dict[str, Any]] = await self._get_all_pages(f'{repo["url"]}/pulls', state='open')
+        except GithubException as e:
+            if self._is_fatal_failure(e):
+                raise
+            # Retries are exhausted, the last known state is better than a missing repository
+            self.failed_repositories_count += 1
+            repository_info: Optional[RepositoryInfo] = self.last_repositories_info.get(repo['html_url'])
+            logging.warning(f'Failed to list pull requests of {repo["full_name"]}, keeping '
+                            f'{"its previous state" if repository_info else "it out"}: {e}')
+            return repository_info
+        pull_requests_info: List[PullRequestInfo] = list(filter(lambda pr: pr is not None, await asyncio.gather(
+            *[self._format_pr_info(repo, pr, current_user, branch_protections) for pr in prs])))
+        pull_requests_info = sorted(pull_requests_info, key=lambda pull_request_info: pull_request_info.id)
+        return RepositoryInfo(name=repo['name'], url=repo['html_url'], pull_requests_info=pull_requests_info)
+
+    @TRACE_RECORDER.trace('enrichment')
+    async def _format_pr_info(self, repo: Dict[str, Any], pr: Dict[str, Any], current_user: str,
+                              branch_protections: Dict[Tuple[str, str], asyncio.Task]) -> Optional[PullRequestInfo]:
+        branch_key: Tuple[str, str] = (repo['full_name'], pr['base']['ref'])
+        if branch_key not in branch_protections:
+            branch_protections[branch_key] = asyncio.ensure_future(
+                self._get_branch_protection_info(repo, pr['base']['ref']))
+        reviewers_info: Optional[ReviewersInfo] = None
+        try:
+            reviews, branch_protection_info = await asyncio.gather(
+                self._get_all_pages(f'{pr["url"]}/reviews'),
+                branch_protections[branch_key])
+            reviewers_info = ReviewersInfo(author=pr['user']['login'],
+                                           maintainer_can_modify=pr['maintainer_can_modify'],
+                                           requested_reviewers=[user['login'] for user in pr['requested_reviewers']],
+                                           reviews=[(review['user']['login'], review['state']) for review in reviews],
+                                           branch_protection_info=branch_protection_info,
+                                           current_user=current_user)
+        except GithubException as e:
+            if self._is_fatal_failure(e):
+                raise
+            logging.warning(f'Failed to fetch PR reviewers information for repository {repo["full_name"]}: {e}')
+        return PullRequestInfo(title=pr['title'],
+                               url=pr['html_url'],
+                               id=pr['number'],
+                               is_draft=pr['draft'],
+                               is_author=pr['user']['login'] == current_user,
+                               reviewers_info=reviewers_info)
+
+    @TRACE_RECORDER.trace('enrichment')
+    async def _get_branch_protection_info(self, repo: Dict[str, Any], branch_name: str) -> Optional[BranchProtectionInfo]:
+        url: str = f'{repo["url"]}/branches/{quote(branch_name, safe="")}/protection/required_pull_request_reviews'
+        try:
+            required_reviews: Dict[str, Any] = await self._get_json(url)
+        except GithubException as e:
+            if e.status not in self._NO_PROTECTION_STATUSES:
+                raise
+            logging.info(f'Failed to fetch branch protection information for repo "{repo["name"]}" '
+                         f'on branch "{branch_name}": {e}')
+            return None
+        dismissal_restrictions: Dict[str, Any] = required_reviews.get('dismissal_restrictions') or {}
+        return BranchProtectionInfo(
+            dismissal_users=[user['login'] for user in dismissal_restrictions.get('users') or []],
+            required_approving_review_count=required_reviews.get('required_approving_review_count') or 0)
+
+    @staticmethod
+    def _is_fatal_failure(e: GithubException) -> bool:
+        # Every other request would fail the same way, the refresh is aborted so the error can be reported
+        return isinstance(e, RateLimitExceededException) or e.status == http.HTTPStatus.UNAUTHORIZED
+
+    async def _get_all_pages(self, url: str, **params: str) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        next_url: Optional[str] = url
+        next_params: Optional[Dict[str, str]] = {**params, 'per_page': str(REST_PAGE_SIZE)}
+        while next_url is not None:
+            page, next_url = await self._request(next_url, next_params)
+            items.extend(page)
+            next_params = None
+        return items
+
+    async def _get_json(self, url: str) -> Any:
+        return (await self._request(url))[0]
+
+    async def _request(self, url: str, params: Optional[Dict[str, str]] = None) -> Tuple[Any, Optional[str]]:
+        with TRACE_RECORDER.http_span('GET', url):
+            return await self._send_request(url, params)
+
+    async def _send_request(self, url: str, params: Optional[Dict[str, str]]) -> Tuple[Any, Optional[str]]:
+        CancellationToken.raise_if_current_cancelled()
+        # Requests answering for the current user keep its token
+        is_rotated: bool = TOKEN_POOL.is_rotated(url)
+        token: Optional[str] = TOKEN_POOL.acquire(self.github_pat) if is_rotated else self.github_pat
+        attempt: int = 0
+        # Same retry policy and circuit breaker as the shared requests sessions, the semaphore caps concurrency.
+        # Like the request guard, it is only held by requests in flight, not while waiting for the next attempt
+        while True:
+            await asyncio.sleep(REQUEST_GUARD.get_circuit_wait_time())
+            CancellationToken.raise_if_current_cancelled()
+            try:
+                async with self.semaphore, \
+                        self.session.get(url, params=params, headers={'Authorization': f'token {token}'}) as response:
+                    RATE_LIMIT_TRACKER.observe_headers(response.headers)
+                    delay: Optional[float] = REQUEST_GUARD.observe(attempt, response.status, response.headers)
+                    if delay is None:
+                        self._record_request(url, str(response.status))
+                        payload: Any = await response.json(content_type=None)
+                        if is_rotated and TOKEN_POOL.observe(token, response.status, response.headers) and \
+                                TOKEN_POOL.has_available_token():
+                            # Retried with the next token, each retry takes one token out of rotation
+                            token = TOKEN_POOL.acquire(None)
+                            continue
+                        if response.status in self._RATE_LIMIT_STATUSES and (
+                                response.headers.get('X-RateLimit-Remaining') == '0' or
+                                'Retry-After' in response.headers):
+                            raise RateLimitExceededException(response.status, payload, dict(response.headers))
+                        if response.status >= http.HTTPStatus.BAD_REQUEST:
+                            raise GithubException(response.status, payload, dict(response.headers))
+                        next_link = response.links.get('next')
+                        return payload, str(next_link['url']) if next_link is not None else None
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = REQUEST_GUARD.observe(attempt, None, None)
+                if delay is None:
+                    self._record_request(url, REQUEST_ERROR_STATUS)
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _record_request(url: str, status: str) -> None:
+        if METRICS_REGISTRY.is_enabled():
+            METRICS_REGISTRY.increment(HTTP_REQUESTS_METRIC, method='GET', endpoint=TraceRecorder.get_url_template(url),
+                                       status=status)
@@ -0,0 +1,324 @@
+import logging
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple, Callable, Set, Iterable
+
+import requests
+from github import GithubException, RateLimitExceededException
+
+from github_pr_monitor.app.github_api_fetcher import GithubAPIFetcher
+from github_pr_monitor.config import APPLICATION_MAX_THREADS, GITHUB_SESSION_MANAGER, TRACE_RECORDER
+from github_pr_monitor.constants.api_constants import GITHUB_API_URL, GITHUB_GRAPHQL_URL, GITHUB_HTTP_TIMEOUT, \
+    GRAPHQL_REPOSITORIES_PAGE_SIZE, GRAPHQL_REPOSITORIES_BATCH_SIZE, GRAPHQL_PULL_REQUESTS_PAGE_SIZE, \
+    GRAPHQL_REVIEWS_PAGE_SIZE, GRAPHQL_REVIEW_REQUESTS_PAGE_SIZE, GRAPHQL_DISMISSAL_ALLOWANCES_PAGE_SIZE
+from github_pr_monitor.constants.app_setting_constants import DEFAULT_DISCOVERY_MODE, SEARCH_DISCOVERY_MODE
+from github_pr_monitor.managers.cancellation_token import CancellationToken
+from github_pr_monitor.models.branch_protection_info import BranchProtectionInfo
+from github_pr_monitor.models.pull_request_info import PullRequestInfo
+from github_pr_monitor.models.repository_info import RepositoryInfo
+from github_pr_monitor.models.reviewers_info import ReviewersInfo
+
+
+class GithubGraphQLFetcher:
+    _GHOST_LOGIN: str = 'ghost'
+    _RATE_LIMIT_STATUSES: Tuple[int, int] = (403, 429)
+
+    # Same affiliations as the REST `GET /user/repos` default
+    _REPOSITORIES_QUERY: str = """
+        query($cursor: String, $pageSize: Int!) {
+          viewer {
+            login
+            repositories(first: $pageSize, after: $cursor,
+                         affiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER],
+                         ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER]) {
+              pageInfo { hasNextPage endCursor }
+              nodes { id name nameWithOwner }
+            }
+          }
+        }
+    """
+
+    _VIEWER_ORGANIZATIONS_QUERY: str = """
+        query($pageSize: Int!) {
+          viewer {
+            login
+            organizations(first: $pageSize) { nodes { login } }
+          }
+        }
+    """
+
+    _SEARCH_REPOSITORIES_QUERY: str = """
+        query($query: String!, $cursor: String, $pageSize: Int!) {
+          search(query: $query, type: ISSUE, first: $pageSize, after: $cursor) {
+            issueCount
+            pageInfo { hasNextPage endCursor }
+            nodes { ... on PullRequest { repository { id name nameWithOwner } } }
+          }
+        }
+    """
+
+    _PULL_REQUEST_FIELDS: str = """
+        fragment PullRequestFields on PullRequest {
+          id
+          number
+          title
+          url
+          isDraft
+          maintainerCanModify
+          author { login }
+          baseRef {
+            branchProtectionRule {
+              requiresApprovingReviews
+              requiredApprovingReviewCount
+              reviewDismissalAllowances(first: %(dismissal_allowances)d) { nodes { actor { ... on User { login } } } }
+            }
+          }
+          reviewRequests(first: %(review_requests)d) { nodes { requestedReviewer { ... on User { login } } } }
+          reviews(first: %(reviews)d) {
+            pageInfo { hasNextPage endCursor }
+            nodes { author { login } state }
+          }
+        }
+    """ % {'dismissal_allowances': GRAPHQL_DISMISSAL_ALLOWANCES_PAGE_SIZE,
+           'review_requests': GRAPHQL_REVIEW_REQUESTS_PAGE_SIZE,
+           'reviews': GRAPHQL_REVIEWS_PAGE_SIZE}
+
+    _REPOSITORIES_PULL_REQUESTS_QUERY: str = """
+        query($ids: [ID!]!, $pageSize: Int!) {
+          nodes(ids: $ids) {
+            ... on Repository {
+              id
+              name
+              url
+              pullRequests(states: OPEN, first: $pageSize) {
+                pageInfo { hasNextPage endCursor }
+                nodes { ...PullRequestFields }
+              }
+            }
+          }
+        }
+    """ + _PULL_REQUEST_FIELDS
+
+    _REPOSITORY_PULL_REQUESTS_PAGE_QUERY: str = """
+        query($id: ID!, $cursor: String, $pageSize: Int!) {
+          node(id: $id) {
+            ... on Repository {
+              pullRequests(states: OPEN, first: $pageSize, after: $cursor) {
+                pageInfo { hasNextPage endCursor }
+                nodes { ...PullRequestFields }
+              }
+            }
+          }
+        }
+    """ + _PULL_REQUEST_FIELDS
+
+    _PULL_REQUEST_REVIEWS_PAGE_QUERY: str = """
+        query($id: ID!, $cursor: String, $pageSize: Int!) {
+          node(id: $id) {
+            ... on PullRequest {
+              reviews(first: $pageSize, after: $cursor) {
+                pageInfo { hasNextPage endCursor }
+                nodes { author { login } state }
+              }
+            }
+          }
+        }
+    """
+
+    def __init__(self, base_url: str = GITHUB_API_URL):
+        self.github_pat: Optional[str] = None
+        self.discovery_mode = DEFAULT_DISCOVERY_MODE
+        self.owners: Set[str] = set()
+        self.graphql_url: str = GITHUB_GRAPHQL_URL
+        self.session: Optional[requests.Session] = None
+        self.pool_size: int = APPLICATION_MAX_THREADS
+        self.base_url = base_url
+        self.set_base_url(base_url)
+
+    def set_base_url(self, base_url: str) -> None:
+        self.base_url = base_url
+        self.graphql_url = GITHUB_GRAPHQL_URL if base_url == GITHUB_API_URL else f'{base_url}/graphql'
+        self.session = GITHUB_SESSION_MANAGER.get_session(base_url, pool_size=self.pool_size)
+
+    def set_pool_size(self, pool_size: int) -> None:
+        self.pool_size = pool_size
+        self.set_base_url(self.base_url)
+
+    def set_discovery_mode(self, discovery_mode: str) -> None:
+        self.discovery_mode = discovery_mode
+
+    def set_owners(self, owners: Iterable[str]) -> None:
+        self.owners = {owner.lower() for owner in owners}
+
+    def get_repositories_info(self, github_pat: str, repo_search_filter: Optional[str],
+                              on_repository_info: Optional[Callable[[RepositoryInfo, int, int], None]] = None) \
+            -> List[RepositoryInfo]:
+        self.github_pat = github_pat
+        if self.discovery_mode == SEARCH_DISCOVERY_MODE:
+            current_user, repository_ids = self._discover_repository_ids(repo_search_filter)
+        else:
+            current_user, repository_ids = self._get_repository_ids(repo_search_filter)
+
+        repositories_info: List[RepositoryInfo] = []
+        for start in range(0, len(repository_ids), GRAPHQL_REPOSITORIES_BATCH_SIZE):
+            CancellationToken.raise_if_current_cancelled()
+            batch: List[str] = repository_ids[start:start + GRAPHQL_REPOSITORIES_BATCH_SIZE]
+            for repository_info in self._get_repositories_batch_info(batch, current_user):
+                repositories_info.append(repository_info)
+                if on_repository_info is not None:
+                    on_repository_info(repository_info, len(repositories_info), len(repository_ids))
+        return sorted(repositories_info, key=lambda repository_info: repository_info.name)
+
+    @TRACE_RECORDER.trace('discovery')
+    def _get_repository_ids(self, repo_search_filter: Optional[str]) -> Tuple[str, List[str]]:
+        current_user: str = ''
+        repository_ids: List[str] = []
+        cursor: Optional[str] = None
+        has_next_page = True
+        while has_next_page:
+            viewer: Dict[str, Any] = self._execute(self._REPOSITORIES_QUERY,
+                                                   cursor=cursor, pageSize=GRAPHQL_REPOSITORIES_PAGE_SIZE)['viewer']
+            current_user = viewer['login']
+            for repository in viewer['repositories']['nodes']:
+                if (not repo_search_filter or (repo_search_filter.lower() in repository['name'].lower())) and \
+                        GithubAPIFetcher.is_owner_selected(self.owners, repository['nameWithOwner']):
+                    repository_ids.append(repository['id'])
+            has_next_page, cursor = self._get_page_info(viewer['repositories'])
+        return current_user, repository_ids
+
+    @TRACE_RECORDER.trace('discovery')
+    def _discover_repository_ids(self, repo_search_filter: Optional[str]) -> Tuple[str, List[str]]:
+        viewer: Dict[str, Any] = self._execute(self._VIEWER_ORGANIZATIONS_QUERY,
+                                               pageSize=GRAPHQL_REPOSITORIES_PAGE_SIZE)['viewer']
+        org_logins: List[str] = [org['login'] for org in viewer['organizations']['nodes']]
+        repository_ids: Dict[str, None] = {}
+        pending_searches: List[Tuple[str, Optional[Tuple[datetime, datetime]]]] = [
+            (query, None) for query in GithubAPIFetcher.get_open_pull_requests_search_queries(viewer['login'],
+                                                                                              org_logins,
+                                                                                              self.owners)]
+        while pending_searches:
+            query, created_range = pending_searches.pop()
+            search_query: str = GithubAPIFetcher.get_search_query(query, created_range)
+            search: Dict[str, Any] = self._execute(self._SEARCH_REPOSITORIES_QUERY, query=search_query, cursor=None,
+                                                   pageSize=GRAPHQL_PULL_REQUESTS_PAGE_SIZE)['search']
+            split_created_ranges = GithubAPIFetcher.split_search(query, created_range, search['issueCount'])
+            if split_created_ranges:
+                pending_searches.extend((query, split_created_range) for split_created_range in split_created_ranges)
+                continue
+            pull_requests: List[Dict[str, Any]] = list(search['nodes'])
+            has_next_page, cursor = self._get_page_info(search)
+            while has_next_page:
+                search = self._execute(self._SEARCH_REPOSITORIES_QUERY, query=search_query, cursor=cursor,
+                                       pageSize=GRAPHQL_PULL_REQUESTS_PAGE_SIZE)['search']
+                pull_requests.extend(search['nodes'])
+                has_next_page, cursor = self._get_page_info(search)
+            for pull_request in pull_requests:
+                repository: Dict[str, Any] = pull_request['repository']
+                if not repo_search_filter or (repo_search_filter.lower() in repository['name'].lower()):
+                    repository_ids[repository['id']] = None
+        return viewer['login'], list(repository_ids)
+
+    @TRACE_RECORDER.trace('listing')
+    def _get_repositories_batch_info(self, repository_ids: List[str], current_user: str) -> List[RepositoryInfo]:
+        repositories_info: List[RepositoryInfo] = []
+        data: Dict[str, Any] = self._execute(self._REPOSITORIES_PULL_REQUESTS_QUERY,
+                                             ids=repository_ids, pageSize=GRAPHQL_PULL_REQUESTS_PAGE_SIZE)
+        for repository in data['nodes']:
+            if repository is None:
+                continue
+            pull_requests: List[Dict[str, Any]] = self._get_all_pull_requests(repository)
+            pull_requests_info: List[PullRequestInfo] = [self._format_pr_info(pr, current_user) for pr in pull_requests]
+            pull_requests_info = sorted(pull_requests_info, key=lambda pull_request_info: pull_request_info.id)
+            repositories_info.append(RepositoryInfo(name=repository['name'], url=repository['url'],
+                                                    pull_requests_info=pull_requests_info))
+        return repositories_info
+
+    @TRACE_RECORDER.trace('listing')
+    def _get_all_pull_requests(self, repository: Dict[str, Any]) -> List[Dict[str, Any]]:
+        connection: Dict[str, Any] = repository['pullRequests']
+        pull_requests: List[Dict[str, Any]] = list(connection['nodes'])
+        has_next_page, cursor = self._get_page_info(connection)
+        while has_next_page:
+            connection = self._execute(self._REPOSITORY_PULL_REQUESTS_PAGE_QUERY, id=repository['id'],
+                                       cursor=cursor, pageSize=GRAPHQL_PULL_REQUESTS_PAGE_SIZE)['node']['pullRequests']
+            pull_requests.extend(connection['nodes'])
+            has_next_page, cursor = self._get_page_info(connection)
+        return pull_requests
+
+    @TRACE_RECORDER.trace('enrichment')
+    def _get_all_reviews(self, pull_request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        connection: Dict[str, Any] = pull_request['reviews']
+        reviews: List[Dict[str, Any]] = list(connection['nodes'])
+        has_next_page, cursor = self._get_page_info(connection)
+        while has_next_page:
+            connection = self._execute(self._PULL_REQUEST_REVIEWS_PAGE_QUERY, id=pull_request['id'],
+                                       cursor=cursor, pageSize=GRAPHQL_REVIEWS_PAGE_SIZE)['node']['reviews']
+            reviews.extend(connection['nodes'])
+            has_next_page, cursor = self._get_page_info(connection)
+        return reviews
+
+    def _format_pr_info(self, pr: Dict[str, Any], current_user: str) -> PullRequestInfo:
+        author: str = self._get_login(pr['author'])
+        return PullRequestInfo(title=pr['title'],
+                               url=pr['url'],
+                               id=pr['number'],
+                               is_draft=pr['isDraft'],
+                               is_author=author == current_user,
+                               reviewers_info=self._get_reviewers_info(pr, author, current_user))
+
+    def _get_reviewers_info(self, pr: Dict[str, Any], author: str, current_user: str) -> ReviewersInfo:
+        reviews: List[Tuple[str, str]] = [(self._get_login(review['author']), review['state'])
+                                          for review in self._get_all_reviews(pr)]
+        requested_reviewers: List[str] = [request['requestedReviewer']['login']
+                                          for request in pr['reviewRequests']['nodes']
+                                          if request['requestedReviewer'] and 'login' in request['requestedReviewer']]
+        return ReviewersInfo(author=author,
+                             maintainer_can_modify=pr['maintainerCanModify'],
+                             requested_reviewers=requested_reviewers,
+                             reviews=reviews,
+                             branch_protection_info=self._get_branch_protection_info(pr),
+                             current_user=current_user)
+
+    @staticmethod
+    def _get_branch_protection_info(pr: Dict[str, Any]) -> Optional[BranchProtectionInfo]:
+        # Mirrors the REST path, where `get_required_pull_request_reviews` fails when reviews are not required
+        rule: Optional[Dict[str, Any]] = (pr['baseRef'] or {}).get('branchProtectionRule')
+        if rule is None or not rule['requiresApprovingReviews']:
+            return None
+        dismissal_users: List[str] = [allowance['actor']['login']
+                                      for allowance in rule['reviewDismissalAllowances']['nodes']
+                                      if allowance['actor'] and 'login' in allowance['actor']]
+        return BranchProtectionInfo(dismissal_users=dismissal_users,
+                                    required_approving_review_count=rule['requiredApprovingReviewCount'] or 0)
+
+    @classmethod
+    def _get_login(cls, actor: Optional[Dict[str, Any]]) -> str:
+        return actor['login'] if actor else cls._GHOST_LOGIN
+
+    @staticmethod
+    def _get_page_info(connection: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        return connection['pageInfo']['hasNextPage'], connection['pageInfo']['endCursor']
+
+    def _execute(self, query: str, /, **variables: Any) -> Dict[str, Any]:
+        # Positional only, `query` is also a variable of the search query
+        response = self.session.post(self.graphql_url, json={'query': query, 'variables': variables},
+                                     headers={'Authorization': f'bearer {self.github_pat}'},
+                                     timeout=GITHUB_HTTP_TIMEOUT)
+        try:
+            payload: Any = response.json() if response.content else None
+        except ValueError:
+            # Proxies and error pages answer with HTML, reported like any other malformed answer below
+            payload = None
+        if response.status_code in self._RATE_LIMIT_STATUSES and (
+                response.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in response.headers):
+            raise RateLimitExceededException(response.status_code, payload, dict(response.headers))
+        if response.status_code != 200:
+            raise GithubException(response.status_code, payload, dict(response.headers))
+        if not isinstance(payload, dict):
+            raise GithubException(response.status_code, payload, dict(response.headers))
+
+        errors: List[Dict[str, Any]] = payload.get('errors') or []
+        if payload.get('data') is None:
+            raise GithubException(response.status_code, payload, dict(response.headers))
+        for error in errors:
+            logging.warning(f'Partial GraphQL result: {error.get("message")}')
+        return payload['data']
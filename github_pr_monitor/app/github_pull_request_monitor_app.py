@@ -1,27 +1,44 @@
 import http
 import logging
+import queue
 import threading
 import webbrowser
+from concurrent.futures import Future
 from datetime import timedelta, datetime
-from typing import Optional, List, Callable, Any, Dict, Tuple
+from typing import Optional, List, Callable, Any, Dict, Tuple, TYPE_CHECKING
 
 import requests
-from github import GithubException
 from rumps import MenuItem, separator, notification, Timer, Window, quit_application, App
 
-from github_pr_monitor.app.repository_info_fetcher import RepositoryInfoFetcher
-from github_pr_monitor.config import THREAD_MANAGER
+from github_pr_monitor.app.menu_reconciler import MenuReconciler
+from github_pr_monitor.config import THREAD_MANAGER, RATE_LIMIT_TRACKER, TOKEN_POOL, TRACE_RECORDER, METRICS_REGISTRY
+from github_pr_monitor.constants.api_constants import GITHUB_API_URL
 from github_pr_monitor.constants.app_setting_constants import DIALOG_WIDTH, DIALOG_HEIGHT, DEFAULT_REFRESH_DELAY, \
-    UPDATE_CHECKER_DELAY, DEFAULT_NOTIFICATION_DELAY
+    UPDATE_CHECKER_DELAY, DEFAULT_NOTIFICATION_DELAY, DEFAULT_FETCH_BACKEND, REFRESH_SCHEDULER_TICK, \
+    RATE_LIMIT_TARGET_BUDGET_RATIO, DEFAULT_DISCOVERY_MODE, STARTUP_TIMER_DELAY, SERVICES_RETRY_DELAY
 from github_pr_monitor.constants.display_constants import REFRESH_MENU, SETTINGS_MENU, QUIT_MENU, PAT_SETTING_MENU, \
     REPOSITORY_FILTER_SETTING_MENU, REFRESH_DELAY_SETTING_MENU, INVALID_PAT_MSG, NETWORK_ERROR_MSG, DEFAULT_ERROR, \
-    QUITTING, APP_QUITTING, APP_NAME, REFRESHING
+    QUITTING, APP_QUITTING, APP_NAME, REFRESHING, RATE_LIMITED_MSG, RATE_LIMIT_MENU, RATE_LIMIT_UNKNOWN_MENU, \
+    NEXT_REFRESH_MENU, NEXT_REFRESH_PENDING_MENU, TIME_FORMAT, REFRESH_PROGRESS, ADDITIONAL_PATS_SETTING_MENU, \
+    SERVICES_ERROR_MSG
+from github_pr_monitor.constants.metrics_constants import METRICS_HOST
 from github_pr_monitor.constants.emojis import NOTIFICATION_EMOJI, NOTHING_TO_DO_EMOJI, NO_PR_EMOJI, ERROR_EMOJI, \
     IN_PROGRESS_EMOJI, PR_URGENT_EMOJI, PR_COMMENT_EMOJI, AUTHOR_EMOJI
+from github_pr_monitor.managers.cancellation_token import RefreshCancelledError
 from github_pr_monitor.managers.config_manager import ConfigManager
+from github_pr_monitor.managers.refresh_scheduler import RefreshScheduler
+from github_pr_monitor.managers.snapshot_manager import SnapshotManager
+from github_pr_monitor.managers.startup_profiler import StartupProfiler
+from github_pr_monitor.managers.status_index import StatusIndex
 from github_pr_monitor.models.pull_request_info import PullRequestInfo
 from github_pr_monitor.models.repository_info import RepositoryInfo
-from github_pr_monitor.security.keyring_manager import KeyringManager
+from github_pr_monitor.network.metrics_server import MetricsServer
+from github_pr_monitor.network.rate_limit_tracker import RateLimitStatus
+
+if TYPE_CHECKING:
+    # PyGithub and keyring are slow to import, they are loaded in the background by `_load_services`
+    from github_pr_monitor.app.repository_info_fetcher import RepositoryInfoFetcher
+    from github_pr_monitor.security.keyring_manager import KeyringManager
 
 
 # TODO: Modify Notification timing
@@ -29,31 +46,66 @@ from github_pr_monitor.security.keyring_manager import KeyringManager
 # TODO: Notification icon does not work
 # TODO: Log file
 # TODO: Foreground message dialog
-# TODO: Clear cache if force refresh
 
 class GithubPullRequestMonitorApp(App):
+    _REPOSITORIES_SEPARATOR_KEY: str = 'repositories_separator'
 
-    def __init__(self, repo_search_filter: Optional[str] = None, ask_pat: Optional[bool] = False):
+    def __init__(self, repo_search_filter: Optional[str] = None, ask_pat: Optional[bool] = False,
+                 fetch_backend: Optional[str] = None, discovery_mode: Optional[str] = None,
+                 change_feed: Optional[bool] = False, trace_dir: Optional[str] = None,
+                 metrics_port: Optional[int] = None, startup_profiler: Optional[StartupProfiler] = None,
+                 notify_newly_urgent_only: Optional[bool] = False):
         super(GithubPullRequestMonitorApp, self).__init__(APP_NAME)
+        self.startup_profiler = startup_profiler or StartupProfiler(0)
         self.config_manager = ConfigManager()
-        self.keyring_manager = KeyringManager()
-        self.repository_info_fetcher = RepositoryInfoFetcher()
+        self.snapshot_manager = SnapshotManager()
+        self._keyring_manager: Optional['KeyringManager'] = None
+        self._repository_info_fetcher: Optional['RepositoryInfoFetcher'] = None
         self.menu_callbacks = self._setup_menu_callbacks()
         self.setting_submenu_callbacks = self._setup_settings_callbacks()
         self.thread_manager = THREAD_MANAGER
-        self.repositories_info: List[RepositoryInfo] = []
+        with self.startup_profiler.phase('load snapshot'):
+            self.repositories_info: List[RepositoryInfo] = self.snapshot_manager.load_snapshot()
+        # Counts and members per status of the displayed PRs, updated as repositories come in
+        self.status_index = StatusIndex()
+        self.status_index.reset(self.repositories_info)
+        # (refresh cycle, repository info, completed, total) pushed by the fetch thread, drained by the UI timer
+        self.repository_updates: queue.Queue = queue.Queue()
+        self.refresh_cycle = 0
+        self.streamed_repositories_info: Dict[str, RepositoryInfo] = {}
+        self.refresh_progress: Optional[Tuple[int, int]] = None
         self.are_all_buttons_disabled = False
         self.processing_done = True
         self.invalid_pat = False
+        self.rate_limited = False
         self.connection_error = False
+        self.rate_limit_item: Optional[MenuItem] = None
+        self.next_refresh_item: Optional[MenuItem] = None
+        self.menu_reconciler: Optional[MenuReconciler] = None
         self.refresh_lock = threading.Lock()
 
         # Settings init
         self.repo_search_filter = repo_search_filter or self.config_manager.get_repo_search_filter()
+        self.ask_pat = ask_pat
+        # The fetcher and the keychain are only needed by the first refresh, the status item does not wait for them
+        self.services_arguments: Tuple[str, str, bool] = (
+            fetch_backend or self.config_manager.get_fetch_backend() or DEFAULT_FETCH_BACKEND,
+            discovery_mode or self.config_manager.get_discovery_mode() or DEFAULT_DISCOVERY_MODE,
+            change_feed or self.config_manager.get_change_feed() or False)
+        self.services_loaded: Future = self.thread_manager.submit(self._load_services, *self.services_arguments)
+        self.services_error = False
         self.notification_delay = DEFAULT_NOTIFICATION_DELAY
-        if ask_pat is True or self.keyring_manager.get_github_pat() is None:
-            self.ask_for_github_pat()
+        self.notify_newly_urgent_only = \
+            notify_newly_urgent_only or self.config_manager.get_notify_newly_urgent_only() or False
+        if trace_dir is not None:
+            TRACE_RECORDER.enable(trace_dir)
+        self.metrics_server: Optional[MetricsServer] = None
+        if metrics_port is not None:
+            self.metrics_server = MetricsServer(METRICS_REGISTRY, METRICS_HOST, metrics_port)
+            self.metrics_server.start()
         self.refresh_delay = self.config_manager.get_refresh_time() or DEFAULT_REFRESH_DELAY
+        self.refresh_scheduler = RefreshScheduler(RATE_LIMIT_TRACKER, self.refresh_delay,
+                                                  RATE_LIMIT_TARGET_BUDGET_RATIO, TOKEN_POOL)
 
         # Timers init
 
@@ -63,27 +115,52 @@ class GithubPullRequestMonitorApp(App):
         initial_delay = (next_hour - now).total_seconds()
 
         self.check_update_timer = Timer(self._check_if_update_is_ready, UPDATE_CHECKER_DELAY)
-        self.refresh_timer = Timer(self.refresh, self.refresh_delay)
+        self.refresh_timer = Timer(self._refresh_if_due, REFRESH_SCHEDULER_TICK)
         self.hourly_notification_timer = Timer(self.start_hourly_notifications, initial_delay)
+        self.startup_timer = Timer(self._finish_startup, STARTUP_TIMER_DELAY)
+        self.services_retry_timer = Timer(self._retry_load_services, SERVICES_RETRY_DELAY)
 
-        self.refresh_timer.start()
-        self.hourly_notification_timer.start()
+        # Paint the last known state right away, the first refresh reconciles it in the background
+        with self.startup_profiler.phase('paint menu'):
+            self._reset_menu()
+            self._update_repositories()
+
+        self.startup_timer.start()
+
+    @property
+    def keyring_manager(self) -> 'KeyringManager':
+        self.services_loaded.result()
+        return self._keyring_manager
+
+    @property
+    def repository_info_fetcher(self) -> 'RepositoryInfoFetcher':
+        self.services_loaded.result()
+        return self._repository_info_fetcher
 
     # Buttons Callbacks
 
+    def force_refresh(self, _=None) -> None:
+        self.repository_info_fetcher.invalidate_cache()
+        self.refresh()
+
     def refresh(self, _=None) -> None:
         self.processing_done = False
-        self.repository_info_fetcher.set_abort_process_flag(True)
         with self.refresh_lock:
-            self.repository_info_fetcher.set_abort_process_flag(False)
+            # A refresh still running is superseded, its requests stop and its results are dropped
+            self.repository_info_fetcher.cancel_refresh()
             self.processing_done = False
             self.invalid_pat = False
+            self.rate_limited = False
             self.connection_error = False
-            self._reset_menu()
+            self.refresh_cycle += 1
+            TRACE_RECORDER.start_trace()
+            self.streamed_repositories_info = {}
+            self.refresh_progress = None
+            self.refresh_scheduler.start_cycle()
             self._disable_button(REFRESH_MENU)
             self.menu.get(REFRESH_MENU).title = REFRESHING
             self.title = f'{APP_NAME} {IN_PROGRESS_EMOJI}'
-            self.thread_manager.start_thread(self._fetch_repositories_info, daemon=True)
+            self.thread_manager.start_thread(self._fetch_repositories_info, args=(self.refresh_cycle,), daemon=True)
         self.check_update_timer.start()
 
     def quit(self, _=None) -> None:
@@ -92,7 +169,12 @@ class GithubPullRequestMonitorApp(App):
 
     def ask_for_github_pat(self, _=None) -> None:
         self._open_dialog(title="GitHub Personal Access Token", message="Please enter your GitHub PAT",
-                          callback=self.keyring_manager.set_github_pat, secure=True)
+                          callback=self._set_repo_github_pat, secure=True)
+
+    def ask_for_additional_github_pats(self, _=None) -> None:
+        self._open_dialog(title="Additional Access Tokens",
+                          message="Comma separated PATs, only tokens of other accounts add to the rate limit",
+                          callback=self._set_additional_github_pats, secure=True)
 
     def ask_for_repository_search_filter(self, _=None) -> None:
         self._open_dialog(title="Repository Search Filter", message="Please enter a filter",
@@ -118,12 +200,12 @@ class GithubPullRequestMonitorApp(App):
         self.hourly_notification_timer.start()
 
     def send_hourly_notification(self, _=None):
-        with self.refresh_lock:
-            prs: List[PullRequestInfo] = [pr for repo_info in self.repositories_info for pr in
-                                          repo_info.pull_requests_info]
-            pr_to_review = len([pr for pr in prs if pr.status == PR_URGENT_EMOJI])
-            pr_commented = len([pr for pr in prs if pr.status == PR_COMMENT_EMOJI])
-            pr_in_progress = len([pr for pr in prs if pr.is_author])
+        # Newly urgent PRs are notified after each refresh instead
+        if self.notify_newly_urgent_only:
+            return
+        pr_to_review = self.status_index.count(PR_URGENT_EMOJI)
+        pr_commented = self.status_index.count(PR_COMMENT_EMOJI)
+        pr_in_progress = self.status_index.count_authored()
 
         notification_message: str = ''
         if pr_to_review > 0:
@@ -136,11 +218,19 @@ class GithubPullRequestMonitorApp(App):
             notification("Pull Requests Status", None, notification_message,
                          sound=True, icon="../assets/github_pr_monitor.icns")
 
+    def send_newly_urgent_notification(self) -> None:
+        # Popped after every refresh, so enabling the setting does not notify a backlog
+        newly_urgent: List[PullRequestInfo] = self.status_index.pop_newly_urgent()
+        if self.notify_newly_urgent_only and newly_urgent:
+            notification("New Pull Requests to review", None,
+                         '\n'.join(f"{pr.status} {pr.title}" for pr in newly_urgent),
+                         sound=True, icon="../assets/github_pr_monitor.icns")
+
     # Setup Callbacks
 
     def _setup_menu_callbacks(self) -> Dict[str, Optional[Callable[[Any], None]]]:
         return {
-            REFRESH_MENU: self.refresh,
+            REFRESH_MENU: self.force_refresh,
             SETTINGS_MENU: None,
             QUIT_MENU: self.quit
         }
@@ -148,6 +238,7 @@ class GithubPullRequestMonitorApp(App):
     def _setup_settings_callbacks(self) -> Dict[str, Optional[Callable[[Any], None]]]:
         return {
             PAT_SETTING_MENU: self.ask_for_github_pat,
+            ADDITIONAL_PATS_SETTING_MENU: self.ask_for_additional_github_pats,
             REPOSITORY_FILTER_SETTING_MENU: self.ask_for_repository_search_filter,
             REFRESH_DELAY_SETTING_MENU: self.ask_for_refresh_delay
         }
@@ -158,59 +249,131 @@ class GithubPullRequestMonitorApp(App):
 
     # Timer callback
 
+    def _finish_startup(self, _) -> None:
+        self.startup_timer.stop()
+        self.startup_profiler.mark('status item shown')
+        with self.startup_profiler.phase('wait for background services'):
+            self.services_loaded.exception()
+        self._check_services_loaded()
+        # Started even when the services failed, refreshes wait until they are loaded again
+        self.refresh_timer.start()
+        self.hourly_notification_timer.start()
+        self.startup_profiler.report()
+
+    def _retry_load_services(self, _) -> None:
+        if self.services_loaded.done():
+            self._check_services_loaded()
+
+    def _check_services_loaded(self) -> None:
+        # A failure is shown in the title and the services are loaded again until they succeed
+        error: Optional[BaseException] = self.services_loaded.exception()
+        if error is not None:
+            logging.error(f'Failed to load services: {error or DEFAULT_ERROR}')
+            self.services_loaded = self.thread_manager.submit(self._load_services, *self.services_arguments)
+            self.services_retry_timer.start()
+        else:
+            self.services_retry_timer.stop()
+            if self.ask_pat is True or self.keyring_manager.get_github_pat() is None:
+                self.ask_for_github_pat()
+        if self.services_error != (error is not None):
+            self.services_error = error is not None
+            self._update_repositories()
+
+    def _refresh_if_due(self, _) -> None:
+        if self.processing_done and not self.services_error and self.refresh_scheduler.is_refresh_due():
+            self.refresh()
+
     def _check_if_update_is_ready(self, _) -> None:
+        has_updates: bool = self._drain_repository_updates()
         if self.processing_done:
             self.check_update_timer.stop()
-            self._reset_menu()
+            self.streamed_repositories_info = {}
+            self.refresh_progress = None
+            # Also drops what a failed or superseded refresh streamed
+            self.status_index.update_repositories(self.repositories_info)
+            self.refresh_scheduler.end_cycle()
+            self._update_scheduling_items()
             self._update_repositories()
+            self.send_newly_urgent_notification()
+            TRACE_RECORDER.write_trace()
+        elif has_updates:
+            self._update_repositories()
+
+    def _drain_repository_updates(self) -> bool:
+        has_updates = False
+        while True:
+            try:
+                refresh_cycle, repository_info, completed, total = self.repository_updates.get_nowait()
+            except queue.Empty:
+                return has_updates
+            # Updates from an aborted refresh may still be queued
+            if refresh_cycle == self.refresh_cycle:
+                self.streamed_repositories_info[repository_info.url] = repository_info
+                self.status_index.update_repository(repository_info)
+                self.refresh_progress = (completed, total)
+                has_updates = True
 
     # Update UI functions
 
+    @TRACE_RECORDER.trace('ui')
     def _update_repositories(self) -> None:
         self._set_title_based_on_connection_status()
 
+        if self.services_error:
+            # The last known state stays listed until the services are loaded
+            return
         if self.connection_error:
+            self.menu_reconciler.reconcile([])
             return
 
-        self.menu.add(separator)
-        is_urgent, has_no_pr = self._populate_menu_with_repos()
+        repositories_info: List[RepositoryInfo] = self._get_displayed_repositories_info()
+        self.menu_reconciler.reconcile(repositories_info)
 
-        if is_urgent is True:
+        if self.status_index.is_urgent():
             self.title += NOTIFICATION_EMOJI
-        elif has_no_pr is True:
+        elif not self.status_index.has_pull_requests():
             self.title += NO_PR_EMOJI
         else:
             self.title += NOTHING_TO_DO_EMOJI
+        if self.refresh_progress is not None:
+            completed, total = self.refresh_progress
+            self.title += REFRESH_PROGRESS.format(completed=completed, total=total)
+
+    def _get_displayed_repositories_info(self) -> List[RepositoryInfo]:
+        # While refreshing, repositories already fetched replace their last known state
+        if not self.streamed_repositories_info:
+            return self.repositories_info
+        repositories_info: Dict[str, RepositoryInfo] = {repository_info.url: repository_info
+                                                        for repository_info in self.repositories_info}
+        repositories_info.update(self.streamed_repositories_info)
+        return sorted(repositories_info.values(), key=lambda repository_info: repository_info.name)
 
     def _set_title_based_on_connection_status(self) -> None:
         self.title = APP_NAME + ' '
-        if self.connection_error:
-            self.title += f'{ERROR_EMOJI}️ {INVALID_PAT_MSG if self.invalid_pat else NETWORK_ERROR_MSG}'
-
-    def _populate_menu_with_repos(self) -> Tuple[bool, bool]:
-        is_urgent = False
-        has_no_pr = True
-        for repository_info in self.repositories_info:
-            if repository_info.pull_requests_info:
-                has_no_pr = False
-                title: str = repository_info.format_repo_title()
-                submenu = MenuItem(title, callback=self._open_web_link)
-                submenu.url = repository_info.prs_page_url
-                self.menu.add(submenu)
-                self._update_pull_requests(submenu, repository_info.pull_requests_info)
-                is_urgent |= repository_info.is_urgent
-        return is_urgent, has_no_pr
-
-    def _update_pull_requests(self, submenu: MenuItem, prs_info: List[PullRequestInfo]) -> None:
-        for pr_info in prs_info:
-            title: str = pr_info.format_pr_title()
-            item = MenuItem(title, callback=self._open_web_link)
-            item.url = pr_info.url
-            submenu.add(item)
+        if self.services_error:
+            self.title += f'{ERROR_EMOJI}️ {SERVICES_ERROR_MSG}'
+        elif self.connection_error:
+            error_message: str = INVALID_PAT_MSG if self.invalid_pat \
+                else RATE_LIMITED_MSG if self.rate_limited else NETWORK_ERROR_MSG
+            self.title += f'{ERROR_EMOJI}️ {error_message}'
+
+    def _update_scheduling_items(self) -> None:
+        status: Optional[RateLimitStatus] = RATE_LIMIT_TRACKER.get_most_constrained_status()
+        self.rate_limit_item.title = RATE_LIMIT_MENU.format(
+            remaining=status.remaining, limit=status.limit,
+            reset_time=datetime.fromtimestamp(status.reset_at).strftime(TIME_FORMAT)) \
+            if status is not None else RATE_LIMIT_UNKNOWN_MENU
+        next_refresh_time: Optional[float] = self.refresh_scheduler.next_refresh_time
+        self.next_refresh_item.title = NEXT_REFRESH_MENU.format(
+            next_refresh_time=datetime.fromtimestamp(next_refresh_time).strftime(TIME_FORMAT)) \
+            if next_refresh_time is not None else NEXT_REFRESH_PENDING_MENU
 
     def _reset_menu(self) -> None:
         self.menu.clear()
         self.title = APP_NAME
+        self.rate_limit_item = MenuItem(RATE_LIMIT_UNKNOWN_MENU)
+        self.next_refresh_item = MenuItem(NEXT_REFRESH_PENDING_MENU)
+        self._update_scheduling_items()
         settings_menu = MenuItem(SETTINGS_MENU)
         for title, callback in self.setting_submenu_callbacks.items():
             settings_menu.add(MenuItem(title=title, callback=callback))
@@ -219,28 +382,75 @@ class GithubPullRequestMonitorApp(App):
                 self.menu.add(settings_menu)
             else:
                 self.menu.add(MenuItem(title=title, callback=callback))
+        self.menu.add(separator)
+        self.menu.add(self.rate_limit_item)
+        self.menu.add(self.next_refresh_item)
+        # Repository items are kept in place by the reconciler below this separator
+        self.menu[self._REPOSITORIES_SEPARATOR_KEY] = separator
+        self.menu_reconciler = MenuReconciler(self.menu, self._REPOSITORIES_SEPARATOR_KEY, self._open_web_link)
 
     # Fetch Repository Information
 
-    def _fetch_repositories_info(self) -> None:
+    def _load_services(self, fetch_backend: str, discovery_mode: str, change_feed: bool) -> None:
+        with self.startup_profiler.phase('import services (background)'):
+            from github_pr_monitor.app.repository_info_fetcher import RepositoryInfoFetcher
+            from github_pr_monitor.security.keyring_manager import KeyringManager
+        with self.startup_profiler.phase('read keychain (background)'):
+            self._keyring_manager = KeyringManager()
+        with self.startup_profiler.phase('resolve token accounts (background)'):
+            self._update_token_pool()
+        self._repository_info_fetcher = RepositoryInfoFetcher()
+        self._repository_info_fetcher.set_fetch_backend(fetch_backend)
+        self._repository_info_fetcher.set_discovery_mode(discovery_mode)
+        self._repository_info_fetcher.set_change_feed_enabled(change_feed)
+        # The menu is filled progressively, PRs the user may have to act on come first
+        self._repository_info_fetcher.set_lazy_enrichment(True)
+
+    def _fetch_repositories_info(self, refresh_cycle: int) -> None:
+        # Already loaded by `_load_services`, importing it at the top would put PyGithub back on the startup path
+        from github import GithubException, RateLimitExceededException
+        repositories_info: Optional[List[RepositoryInfo]] = None
+        connection_error = invalid_pat = rate_limited = False
         try:
-            self.repositories_info = self.repository_info_fetcher.get_repositories_info(
-                self.keyring_manager.get_github_pat(), self.repo_search_filter)
+            repositories_info = self.repository_info_fetcher.get_repositories_info(
+                self.keyring_manager.get_github_pat(), self.repo_search_filter,
+                lambda repository_info, completed, total: self.repository_updates.put(
+                    (refresh_cycle, repository_info, completed, total)))
+        except RefreshCancelledError:
+            # A superseded refresh is dropped below, the newer one owns the UI state
+            logging.info(f'Refresh {refresh_cycle} cancelled')
+        except RateLimitExceededException as e:
+            connection_error = True
+            rate_limited = True
+            logging.error(f'GitHub rate limit exceeded: {e.message or DEFAULT_ERROR}')
         except GithubException as e:
             if e.status == http.HTTPStatus.UNAUTHORIZED:
-                self.connection_error = True
-                self.invalid_pat = True
+                connection_error = True
+                invalid_pat = True
             logging.error(e.message or DEFAULT_ERROR)
         except requests.exceptions.ConnectionError as e:
-            self.connection_error = True
+            connection_error = True
             logging.error(e or DEFAULT_ERROR)
         except Exception as e:
             logging.error(e or DEFAULT_ERROR)
 
-        self.menu.get(REFRESH_MENU).title = REFRESH_MENU
-        if self.are_all_buttons_disabled is False:
-            self._enable_button(REFRESH_MENU)
-        self.processing_done = True
+        with self.refresh_lock:
+            # Late results of a superseded refresh must not overwrite the newer ones
+            if refresh_cycle != self.refresh_cycle:
+                return
+            try:
+                self.connection_error = connection_error
+                self.invalid_pat = invalid_pat
+                self.rate_limited = rate_limited
+                if repositories_info is not None:
+                    self.repositories_info = repositories_info
+                    self.snapshot_manager.save_snapshot(repositories_info)
+            finally:
+                # The refresh timer and the Refresh button wait for this, whatever happened above
+                self.menu.get(REFRESH_MENU).title = REFRESH_MENU
+                if self.are_all_buttons_disabled is False:
+                    self._enable_button(REFRESH_MENU)
+                self.processing_done = True
 
     # Configuration Setters
 
@@ -250,6 +460,19 @@ class GithubPullRequestMonitorApp(App):
 
     def _set_repo_github_pat(self, github_pat: str) -> None:
         self.keyring_manager.set_github_pat(github_pat if github_pat != '' else None)
+        self.thread_manager.start_thread(self._update_token_pool, daemon=True)
+
+    def _set_additional_github_pats(self, github_pats: str) -> None:
+        tokens: List[str] = [token.strip() for token in github_pats.split(',') if token.strip()]
+        self.keyring_manager.set_additional_github_pats(tokens)
+        # Resolving the account of each token takes a request per token, kept off the UI thread
+        self.thread_manager.start_thread(self._update_token_pool, daemon=True)
+
+    def _update_token_pool(self) -> None:
+        # The main token takes part in the rotation, its account budget is one of those spread
+        # Also run by `_load_services`, which the `keyring_manager` property waits for
+        TOKEN_POOL.set_tokens([self._keyring_manager.get_github_pat()] +
+                              self._keyring_manager.get_additional_github_pats(), GITHUB_API_URL)
 
     def _set_refresh_time(self, refresh_time_in_minutes_string: str) -> None:
         try:
@@ -257,7 +480,7 @@ class GithubPullRequestMonitorApp(App):
             if refresh_time_in_seconds <= 0:
                 raise ValueError("Refresh time should be greater or equal than 1 minute")
             self.refresh_delay = refresh_time_in_seconds
-            self.refresh_timer.interval = self.refresh_delay
+            self.refresh_scheduler.set_refresh_delay(self.refresh_delay)
             self.config_manager.set_refresh_time(self.refresh_delay)
         except Exception as e:
             logging.warning(e)
@@ -313,9 +536,11 @@ class GithubPullRequestMonitorApp(App):
     # Exit Functions
 
     def _prepare_to_quit(self) -> None:
-        self.repository_info_fetcher.set_abort_process_flag(True)
+        if not self.services_error:
+            self.repository_info_fetcher.cancel_refresh()
         self._update_ui_for_quitting()
         self.refresh_timer.stop()
+        self.services_retry_timer.stop()
 
     def _update_ui_for_quitting(self) -> None:
         self.menu[QUIT_MENU].title = QUITTING
@@ -323,5 +548,7 @@ class GithubPullRequestMonitorApp(App):
         self._disable_all_buttons()
 
     def _quit_application(self) -> None:
-        self.thread_manager.wait_for_all_threads()
+        self.thread_manager.shutdown()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
         quit_application()
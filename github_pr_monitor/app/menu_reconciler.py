@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Optional, Callable, Any
+
+from rumps import MenuItem, Menu
+
+from github_pr_monitor.models.repository_info import RepositoryInfo
+
+
+class MenuReconciler:
+    def __init__(self, menu: Menu, anchor_key: str, callback: Callable[[Any], None]):
+        self.menu = menu
+        self.anchor_key = anchor_key
+        self.callback = callback
+        # Rendered items in menu order, keyed by repository and PR URL, which are also their keys in their menu
+        self.repository_items: OrderedDict[str, MenuItem] = OrderedDict()
+        self.pull_request_items: Dict[str, OrderedDict[str, MenuItem]] = {}
+
+    def reconcile(self, repositories_info: List[RepositoryInfo]) -> None:
+        repositories_info = [repository_info for repository_info in repositories_info
+                             if repository_info.pull_requests_info]
+        self._reconcile_items(self.menu, self.anchor_key, self.repository_items,
+                              [(repository_info.url, repository_info.format_repo_title(),
+                                repository_info.prs_page_url) for repository_info in repositories_info])
+        pull_request_items: Dict[str, OrderedDict[str, MenuItem]] = {}
+        for repository_info in repositories_info:
+            pull_request_items[repository_info.url] = self.pull_request_items.get(repository_info.url, OrderedDict())
+            self._reconcile_items(self.repository_items[repository_info.url], None,
+                                  pull_request_items[repository_info.url],
+                                  [(pr_info.url, pr_info.format_pr_title(), pr_info.url)
+                                   for pr_info in repository_info.pull_requests_info])
+        self.pull_request_items = pull_request_items
+
+    def _reconcile_items(self, menu: Menu, anchor_key: Optional[str], rendered_items: OrderedDict[str, MenuItem],
+                         desired_items: List[Tuple[str, str, str]]) -> None:
+        desired_keys = {key for key, _, _ in desired_items}
+        for key in [key for key in rendered_items if key not in desired_keys]:
+            del menu[key]
+            del rendered_items[key]
+
+        # Walk both orders at once, items found out of place are moved right after their predecessor
+        rendered_keys: List[str] = list(rendered_items)
+        position: int = 0
+        previous_key: Optional[str] = anchor_key
+        items: OrderedDict[str, MenuItem] = OrderedDict()
+        for key, title, url in desired_items:
+            item: Optional[MenuItem] = rendered_items.get(key)
+            if item is not None and position < len(rendered_keys) and rendered_keys[position] == key:
+                position += 1
+            else:
+                if item is not None:
+                    del menu[key]
+                    rendered_keys.remove(key)
+                else:
+                    item = MenuItem(key, callback=self.callback)
+                self._insert_item(menu, previous_key, key, item)
+            if item.title != title:
+                item.title = title
+            item.url = url
+            items[key] = item
+            previous_key = key
+        rendered_items.clear()
+        rendered_items.update(items)
+
+    @staticmethod
+    def _insert_item(menu: Menu, previous_key: Optional[str], key: str, item: MenuItem) -> None:
+        # rumps keys inserted items by title, the URL is used until the item is in place so keys stay unique
+        item.title = key
+        if previous_key is not None:
+            menu.insert_after(previous_key, item)
+        elif len(menu) > 0:
+            menu.insert_before(next(iter(menu.keys())), item)
+        else:
+            menu.add(item)
@@ -1,57 +1,491 @@
+import logging
 import threading
-from typing import List, Optional
+import time
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import List, Optional, Dict, Tuple, Any, Set, Callable, Iterable
 
+from github import GithubException, BadCredentialsException, RateLimitExceededException
 from github.PullRequest import PullRequest
 from github.Repository import Repository
 
 from github_pr_monitor.app.github_api_fetcher import GithubAPIFetcher
-from github_pr_monitor.config import THREAD_MANAGER
+from github_pr_monitor.app.github_graphql_fetcher import GithubGraphQLFetcher
+from github_pr_monitor.config import THREAD_MANAGER, TOKEN_POOL, REQUEST_GUARD, TRACE_RECORDER, METRICS_REGISTRY, \
+    RATE_LIMIT_TRACKER
+from github_pr_monitor.constants.api_constants import NOTIFICATIONS_DEFAULT_POLL_INTERVAL, NOTIFICATIONS_PAGE_SIZE
+from github_pr_monitor.constants.app_setting_constants import DEFAULT_FETCH_BACKEND, GRAPHQL_FETCH_BACKEND, \
+    FETCH_BACKENDS, ASYNC_FETCH_BACKEND, DEFAULT_DISCOVERY_MODE, DISCOVERY_MODES, SEARCH_DISCOVERY_MODE, \
+    CHANGE_FEED_FULL_SWEEP_PERIOD
+from github_pr_monitor.constants.metrics_constants import REFRESH_DURATION_METRIC, REFRESHES_METRIC, \
+    REPOSITORIES_PROCESSED_METRIC, PULL_REQUESTS_PROCESSED_METRIC, FAILED_REPOSITORIES_METRIC, \
+    LAST_REFRESH_REPOSITORIES_METRIC, LAST_REFRESH_PULL_REQUESTS_METRIC, CACHE_LOOKUPS_METRIC, CACHE_HIT_RATIO_METRIC, \
+    RATE_LIMIT_REMAINING_METRIC, RATE_LIMIT_LIMIT_METRIC, WORKER_THREADS_METRIC, WORKER_ACTIVE_TASKS_METRIC, \
+    WORKER_QUEUED_TASKS_METRIC, WORKER_COMPLETED_TASKS_METRIC, REFRESH_SUCCESS_OUTCOME, REFRESH_FAILURE_OUTCOME, \
+    REFRESH_ABORTED_OUTCOME, HTTP_RESPONSE_CACHE_LABEL, API_FETCHER_CACHE_LABEL, CACHE_HIT_RESULT, CACHE_MISS_RESULT
+from github_pr_monitor.managers.cache_manager import CacheManager
+from github_pr_monitor.managers.cancellation_token import CancellationToken, RefreshCancelledError
+from github_pr_monitor.managers.notification_feed import NotificationFeed
+from github_pr_monitor.managers.thread_manager import ThreadManager
 from github_pr_monitor.models.pull_request_info import PullRequestInfo
 from github_pr_monitor.models.repository_info import RepositoryInfo
 from github_pr_monitor.models.reviewers_info import ReviewersInfo
+from github_pr_monitor.network.http_cache import HttpResponseCache
 
 
 class RepositoryInfoFetcher(GithubAPIFetcher):
     def __init__(self):
         super().__init__()
-        self.abort_process = False
+        # Each refresh is a new generation, starting one cancels the previous one
+        self.generation = 0
+        self.cancellation_token = CancellationToken(self.generation)
+        self.generation_lock = threading.Lock()
         self.prs_info_lock = threading.Lock()
         self.thread_manager = THREAD_MANAGER
+        self.max_concurrency: Optional[int] = None
+        self.fetch_backend = DEFAULT_FETCH_BACKEND
+        self.discovery_mode = DEFAULT_DISCOVERY_MODE
+        self.graphql_fetcher = GithubGraphQLFetcher()
+        self.async_fetcher = None
+        self.current_user: Optional[str] = None
+        self.repo_search_filter: Optional[str] = None
+        self.change_feed_enabled = False
+        # PRs whose status does not depend on their reviews are enriched once every other PR is, see `_is_low_priority`
+        self.lazy_enrichment = False
+        self.notification_feed = NotificationFeed(CHANGE_FEED_FULL_SWEEP_PERIOD, NOTIFICATIONS_DEFAULT_POLL_INTERVAL,
+                                                  NOTIFICATIONS_PAGE_SIZE)
+        # Repository full name -> info from the last complete refresh, reused for repositories the feed did not report
+        self.last_repositories_info: Dict[str, RepositoryInfo] = {}
+        # (repository full name, PR number) -> ((updated_at, head sha), PR info) from the last complete refresh
+        self.pull_requests_snapshot: Dict[Tuple[str, int], Tuple[Tuple[datetime, str], PullRequestInfo]] = {}
+        self.next_pull_requests_snapshot: Dict[Tuple[str, int], Tuple[Tuple[datetime, str], PullRequestInfo]] = {}
+        self.reused_prs_count = 0
+        self.enriched_prs_count = 0
+        self.deferred_prs_count = 0
+        self.failed_repositories_count = 0
+        METRICS_REGISTRY.add_collector(self._collect_metrics)
 
-    def set_abort_process_flag(self, value: bool) -> None:
-        self.abort_process = value
+    def cancel_refresh(self) -> None:
+        with self.generation_lock:
+            self.cancellation_token.cancel()
 
-    def get_repositories_info(self, github_pat: str, repo_search_filter: Optional[str]) -> List[RepositoryInfo]:
+    def set_fetch_backend(self, fetch_backend: str) -> None:
+        if fetch_backend not in FETCH_BACKENDS:
+            raise ValueError(f'Unknown fetch backend "{fetch_backend}", expected one of {FETCH_BACKENDS}')
+        if fetch_backend == ASYNC_FETCH_BACKEND and self.async_fetcher is None:
+            # aiohttp is only needed by this backend, keep it out of the default import path
+            from github_pr_monitor.app.github_async_fetcher import GithubAsyncFetcher
+            self.async_fetcher = GithubAsyncFetcher(self.base_url)
+            self.async_fetcher.set_discovery_mode(self.discovery_mode)
+            self.async_fetcher.set_owners(self.owners)
+            if self.max_concurrency is not None:
+                self.async_fetcher.set_max_concurrent_requests(self.max_concurrency)
+        self.fetch_backend = fetch_backend
+
+    def set_discovery_mode(self, discovery_mode: str) -> None:
+        if discovery_mode not in DISCOVERY_MODES:
+            raise ValueError(f'Unknown discovery mode "{discovery_mode}", expected one of {DISCOVERY_MODES}')
+        self.discovery_mode = discovery_mode
+        self.graphql_fetcher.set_discovery_mode(discovery_mode)
+        if self.async_fetcher is not None:
+            self.async_fetcher.set_discovery_mode(discovery_mode)
+
+    def set_owners(self, owners: Iterable[str]) -> None:
+        super().set_owners(owners)
+        self.graphql_fetcher.set_owners(owners)
+        if self.async_fetcher is not None:
+            self.async_fetcher.set_owners(owners)
+
+    def set_max_concurrency(self, max_concurrency: int) -> None:
+        # Sizes a dedicated worker pool and the keep-alive pools, the shared application pool is left untouched
+        if self.thread_manager is not THREAD_MANAGER:
+            self.thread_manager.shutdown()
+        self.thread_manager = ThreadManager(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.pool_size = max_concurrency
+        REQUEST_GUARD.set_max_concurrent_requests(max_concurrency)
+        self._close_github_connection()
+        # The shared keep-alive pools grow to this size when this fetcher's connections get their session back
+        self.graphql_fetcher.set_pool_size(max_concurrency)
+        if self.async_fetcher is not None:
+            self.async_fetcher.set_max_concurrent_requests(max_concurrency)
+
+    def set_lazy_enrichment(self, lazy_enrichment: bool) -> None:
+        self.lazy_enrichment = lazy_enrichment
+
+    def set_change_feed_enabled(self, change_feed_enabled: bool) -> None:
+        self.change_feed_enabled = change_feed_enabled
+        self.notification_feed.reset()
+
+    def set_base_url(self, base_url: str) -> None:
+        super().set_base_url(base_url)
+        self.graphql_fetcher.set_base_url(base_url)
+        if self.async_fetcher is not None:
+            self.async_fetcher.set_base_url(base_url)
+
+    def clear_snapshot(self) -> None:
+        with self.prs_info_lock:
+            self.pull_requests_snapshot = {}
+            self.last_repositories_info = {}
+        self.notification_feed.reset()
+
+    def invalidate_cache(self) -> None:
+        super().invalidate_cache()
+        self.clear_snapshot()
+
+    @TRACE_RECORDER.trace('refresh')
+    def get_repositories_info(self, github_pat: str, repo_search_filter: Optional[str],
+                              on_repository_info: Optional[Callable[[RepositoryInfo, int, int], None]] = None) \
+            -> List[RepositoryInfo]:
+        # `on_repository_info(repository_info, completed, total)` is called from a worker as each repository completes.
+        # Raises RefreshCancelledError once cancelled, by `cancel_refresh` or by a newer refresh
+        cancellation_token: CancellationToken = self._start_generation()
+        context_token = cancellation_token.activate()
+        TOKEN_POOL.reset_usage()
+        REQUEST_GUARD.reset_stats()
+        super().reset_cache_stats()
+        self.failed_repositories_count = 0
+        start: float = time.perf_counter()
+        repositories_info: Optional[List[RepositoryInfo]] = None
+        try:
+            if self.fetch_backend == GRAPHQL_FETCH_BACKEND:
+                repositories_info = self.graphql_fetcher.get_repositories_info(github_pat, repo_search_filter,
+                                                                               on_repository_info)
+            elif self.fetch_backend == ASYNC_FETCH_BACKEND:
+                repositories_info = self.async_fetcher.get_repositories_info(github_pat, repo_search_filter,
+                                                                             on_repository_info)
+                self.failed_repositories_count = self.async_fetcher.failed_repositories_count
+            else:
+                repositories_info = self._get_rest_repositories_info(github_pat, repo_search_filter,
+                                                                     on_repository_info)
+            # Results of a cancelled generation are stale, a newer refresh owns the state
+            cancellation_token.raise_if_cancelled()
+            return repositories_info
+        except Exception as e:
+            if cancellation_token.is_cancelled() and not isinstance(e, RefreshCancelledError):
+                # Errors of interrupted requests are not worth reporting
+                raise RefreshCancelledError(f'Refresh {cancellation_token.generation} was cancelled') from e
+            raise
+        finally:
+            CancellationToken.deactivate(context_token)
+            TOKEN_POOL.log_usage()
+            REQUEST_GUARD.log_stats()
+            self._record_refresh_metrics(time.perf_counter() - start, repositories_info, cancellation_token)
+
+    def _start_generation(self) -> CancellationToken:
+        with self.generation_lock:
+            self.cancellation_token.cancel()
+            self.generation += 1
+            self.cancellation_token = CancellationToken(self.generation)
+            return self.cancellation_token
+
+    def _get_rest_repositories_info(self, github_pat: str, repo_search_filter: Optional[str],
+                                    on_repository_info: Optional[Callable[[RepositoryInfo, int, int], None]]) \
+            -> List[RepositoryInfo]:
         super().open_github_connection(github_pat)
-        repositories_info: List[RepositoryInfo] = []
+        self._start_snapshot(super().get_current_user_login(), repo_search_filter)
+        changed_repositories: Optional[Dict[str, Dict[str, Any]]] = self._get_changed_repositories()
+        if changed_repositories is None:
+            repositories: List[Repository] = super().discover_repositories(repo_search_filter) \
+                if self.discovery_mode == SEARCH_DISCOVERY_MODE else super().get_all_repositories(repo_search_filter)
+            unchanged_repositories_info: Dict[str, RepositoryInfo] = {}
+        else:
+            # Notifications also come from repositories outside the discovered ones, which wait for a full sweep to
+            # be discovered
+            repositories = [self.build_repository(repo)
+                            for full_name, repo in changed_repositories.items()
+                            if full_name in self.last_repositories_info]
+            unchanged_repositories_info = {full_name: repository_info for full_name, repository_info
+                                           in self.last_repositories_info.items()
+                                           if full_name not in changed_repositories}
+            logging.info(f'Change feed: {len(repositories)} repositories changed, '
+                         f'{len(unchanged_repositories_info)} reused')
         try:
-            repositories: List[Repository] = super().get_all_repositories(repo_search_filter)
-            for repo in repositories:
-                self.thread_manager.start_thread(self._process_repo, args=(repo, repositories_info))
+            repositories_info, failed_repositories = self._fetch_repositories_info(repositories, on_repository_info)
+        except BaseException:
+            # Changes already consumed from the feed would be lost otherwise
+            self.notification_feed.reset()
+            raise
         finally:
-            self.thread_manager.wait_for_all_threads()
-        return sorted(repositories_info, key=lambda repository_info: repository_info.name)
+            super().log_cache_stats()
+        self.failed_repositories_count = len(failed_repositories)
+        if failed_repositories:
+            # Same for the changes of repositories kept in their previous state
+            self.notification_feed.reset()
+        repositories_info.update(unchanged_repositories_info)
+        self._commit_snapshot(repositories_info, set(unchanged_repositories_info) | failed_repositories)
+        return sorted(repositories_info.values(), key=lambda repository_info: repository_info.name)
+
+    def _fetch_repositories_info(self, repositories: List[Repository],
+                                 on_repository_info: Optional[Callable[[RepositoryInfo, int, int], None]]) \
+            -> Tuple[Dict[str, RepositoryInfo], Set[str]]:
+        # Repository listing and PR enrichment share the pool, PR tasks are queued as soon as their repo is listed.
+        # Low priority PRs are only queued once every listing and other PR is done, their repository is reported
+        # with provisional PRs in between
+        repository_futures: Dict[Future, Repository] = {
+            self.thread_manager.submit(self._list_pull_requests, repo): repo for repo in repositories}
+        pull_request_futures: Dict[Repository, List[Future]] = {}
+        pull_request_repositories: Dict[Future, Repository] = {}
+        remaining_pull_requests: Dict[Repository, int] = {}
+        deferred_pull_requests: Dict[Repository, List[PullRequest]] = {}
+        deferred_repositories: List[Repository] = []
+        deferred_futures: Set[Future] = set()
+        eager_tasks: int = len(repository_futures)
+        repositories_info: Dict[str, RepositoryInfo] = {}
+        failed_repositories: Set[str] = set()
+        prefetch_futures: List[Future] = []
+        cancellation_token: CancellationToken = CancellationToken.get_current()
+        # Wakes the loop up as soon as the refresh is cancelled, not when the requests in flight complete
+        pending_futures: Set[Future] = set(repository_futures) | {cancellation_token.cancelled}
+        try:
+            while len(pending_futures) > 1:
+                done_futures, pending_futures = wait(pending_futures, return_when=FIRST_COMPLETED)
+                for future in done_futures:
+                    repository_info: Optional[RepositoryInfo] = None
+                    if future is cancellation_token.cancelled:
+                        cancellation_token.raise_if_cancelled()
+                    elif future in repository_futures:
+                        repo: Repository = repository_futures[future]
+                        eager_tasks -= 1
+                        try:
+                            pull_requests: List[PullRequest] = future.result()
+                        except GithubException as e:
+                            if isinstance(e, (BadCredentialsException, RateLimitExceededException)):
+                                raise
+                            # Retries are exhausted, the last known state is better than a missing repository
+                            failed_repositories.add(repo.full_name)
+                            repository_info = self.last_repositories_info.get(repo.full_name)
+                            logging.warning(f'Failed to list pull requests of {repo.full_name}, keeping '
+                                            f'{"its previous state" if repository_info else "it out"}: {e}')
+                            if repository_info is None:
+                                continue
+                        else:
+                            # Each distinct base branch is resolved once, ahead of the PRs waiting for it
+                            prefetch_futures.extend(
+                                self.thread_manager.submit(self._prefetch_branch_protection_info, repo, branch_name)
+                                for branch_name in dict.fromkeys(pr.base.ref for pr in pull_requests))
+                            eager_pull_requests: List[PullRequest] = []
+                            deferred_pull_requests[repo] = []
+                            for pr in pull_requests:
+                                (deferred_pull_requests[repo] if self._is_low_priority(pr, repo)
+                                 else eager_pull_requests).append(pr)
+                            self.deferred_prs_count += len(deferred_pull_requests[repo])
+                            pull_request_futures[repo] = [self.thread_manager.submit(self._format_pr_info, pr, repo)
+                                                          for pr in eager_pull_requests]
+                            pull_request_repositories.update({pr_future: repo
+                                                              for pr_future in pull_request_futures[repo]})
+                            pending_futures.update(pull_request_futures[repo])
+                            remaining_pull_requests[repo] = len(pull_request_futures[repo])
+                            eager_tasks += len(pull_request_futures[repo])
+                    else:
+                        repo = pull_request_repositories[future]
+                        future.result()
+                        remaining_pull_requests[repo] -= 1
+                        eager_tasks -= future not in deferred_futures
+                    # A repository is complete once it is listed and all of its PRs are enriched
+                    if repository_info is None and remaining_pull_requests[repo] == 0:
+                        if deferred_pull_requests.get(repo):
+                            deferred_repositories.append(repo)
+                            if on_repository_info is not None:
+                                on_repository_info(self._build_repository_info(
+                                    repo, pull_request_futures[repo],
+                                    [self._build_provisional_pr_info(pr, repo) for pr in deferred_pull_requests[repo]]),
+                                    len(repositories_info), len(repositories))
+                        else:
+                            repository_info = self._build_repository_info(repo, pull_request_futures[repo])
+                    if repository_info is not None:
+                        repositories_info[repo.full_name] = repository_info
+                        if on_repository_info is not None:
+                            on_repository_info(repository_info, len(repositories_info), len(repositories))
+                if eager_tasks == 0 and deferred_repositories:
+                    for repo in deferred_repositories:
+                        futures: List[Future] = [self.thread_manager.submit(self._format_pr_info, pr, repo)
+                                                 for pr in deferred_pull_requests.pop(repo)]
+                        pull_request_futures[repo].extend(futures)
+                        pull_request_repositories.update({pr_future: repo for pr_future in futures})
+                        deferred_futures.update(futures)
+                        pending_futures.update(futures)
+                        remaining_pull_requests[repo] = len(futures)
+                    deferred_repositories = []
+        except BaseException:
+            # Queued tasks are dropped right away, running ones stop at their next request
+            self._cancel_futures(list(repository_futures) + list(pull_request_repositories) + prefetch_futures)
+            raise
+        return repositories_info, failed_repositories
+
+    def _record_refresh_metrics(self, duration: float, repositories_info: Optional[List[RepositoryInfo]],
+                                cancellation_token: CancellationToken) -> None:
+        if not METRICS_REGISTRY.is_enabled():
+            return
+        outcome: str = REFRESH_ABORTED_OUTCOME if cancellation_token.is_cancelled() else \
+            REFRESH_FAILURE_OUTCOME if repositories_info is None else REFRESH_SUCCESS_OUTCOME
+        METRICS_REGISTRY.observe(REFRESH_DURATION_METRIC, duration, backend=self.fetch_backend, outcome=outcome)
+        METRICS_REGISTRY.increment(REFRESHES_METRIC, backend=self.fetch_backend, outcome=outcome)
+        METRICS_REGISTRY.increment(FAILED_REPOSITORIES_METRIC, self.failed_repositories_count)
+        if repositories_info is not None:
+            pull_requests_count: int = sum(len(repository_info.pull_requests_info)
+                                           for repository_info in repositories_info)
+            METRICS_REGISTRY.increment(REPOSITORIES_PROCESSED_METRIC, len(repositories_info))
+            METRICS_REGISTRY.increment(PULL_REQUESTS_PROCESSED_METRIC, pull_requests_count)
+            METRICS_REGISTRY.set(LAST_REFRESH_REPOSITORIES_METRIC, len(repositories_info))
+            METRICS_REGISTRY.set(LAST_REFRESH_PULL_REQUESTS_METRIC, pull_requests_count)
+        http_stats: Dict[str, int] = self.http_response_cache.get_stats()
+        # A revalidation answered with new content is a miss as well
+        self._record_cache_metrics(HTTP_RESPONSE_CACHE_LABEL, http_stats[HttpResponseCache.HITS],
+                                   http_stats[HttpResponseCache.MISSES] + http_stats[HttpResponseCache.REVALIDATIONS]
+                                   - http_stats[HttpResponseCache.HITS])
+        cache_stats: Dict[str, int] = self.cache.get_stats()
+        self._record_cache_metrics(API_FETCHER_CACHE_LABEL, cache_stats[CacheManager.HITS],
+                                   cache_stats[CacheManager.MISSES])
+
+    @staticmethod
+    def _record_cache_metrics(cache: str, hits: int, misses: int) -> None:
+        METRICS_REGISTRY.increment(CACHE_LOOKUPS_METRIC, hits, cache=cache, result=CACHE_HIT_RESULT)
+        METRICS_REGISTRY.increment(CACHE_LOOKUPS_METRIC, misses, cache=cache, result=CACHE_MISS_RESULT)
+        if hits + misses > 0:
+            METRICS_REGISTRY.set(CACHE_HIT_RATIO_METRIC, hits / (hits + misses), cache=cache)
 
-    def _process_repo(self, repo: Repository, repositories_info: List[RepositoryInfo]) -> None:
-        if self.abort_process is True:
+    def _collect_metrics(self) -> None:
+        for resource, status in RATE_LIMIT_TRACKER.get_statuses().items():
+            METRICS_REGISTRY.set(RATE_LIMIT_REMAINING_METRIC, status.remaining, resource=resource)
+            METRICS_REGISTRY.set(RATE_LIMIT_LIMIT_METRIC, status.limit, resource=resource)
+        thread_stats: Dict[str, int] = self.thread_manager.get_stats()
+        METRICS_REGISTRY.set(WORKER_THREADS_METRIC, self.thread_manager.max_threads)
+        METRICS_REGISTRY.set(WORKER_ACTIVE_TASKS_METRIC, thread_stats[ThreadManager.ACTIVE_TASKS])
+        METRICS_REGISTRY.set(WORKER_QUEUED_TASKS_METRIC, thread_stats[ThreadManager.QUEUED_TASKS])
+        METRICS_REGISTRY.set(WORKER_COMPLETED_TASKS_METRIC, thread_stats[ThreadManager.COMPLETED_TASKS])
+
+    def _get_changed_repositories(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        if self.change_feed_enabled is False:
             return None
-        prs = super().get_pull_requests_for_repo(repo)
-        pull_requests_info: List[PullRequestInfo] = list(filter(lambda pr: pr is not None,
-                                                                [self._format_pr_info(pr) for pr in prs]))
-        pull_requests_info = sorted(pull_requests_info, key=lambda pull_request_info: pull_request_info.id)
+        # Polled even before a full refresh, so the next cycle only sees notifications newer than this one
+        changed_repositories: Optional[Dict[str, Dict[str, Any]]] = \
+            self.notification_feed.get_changed_repositories(self.github.requester)
+        return changed_repositories if self.last_repositories_info else None
+
+    def _start_snapshot(self, current_user: str, repo_search_filter: Optional[str]) -> None:
         with self.prs_info_lock:
-            repositories_info.append(RepositoryInfo(name=repo.name, url=repo.html_url, pull_requests_info=pull_requests_info))
+            if current_user != self.current_user or repo_search_filter != self.repo_search_filter:
+                self.last_repositories_info = {}
+                self.repo_search_filter = repo_search_filter
+            if current_user != self.current_user:
+                self.pull_requests_snapshot = {}
+                self.current_user = current_user
+            self.next_pull_requests_snapshot = {}
+            self.reused_prs_count = 0
+            self.enriched_prs_count = 0
+            self.deferred_prs_count = 0
 
-    def _format_pr_info(self, pr: PullRequest) -> Optional[PullRequestInfo]:
-        if self.abort_process is True:
-            return None
-        current_user: str = super().get_current_user_login()
-        is_author: bool = pr.user.login == current_user
-        reviewers_info: ReviewersInfo = super().get_reviewers_info(pull_request=pr, current_user=current_user)
+    def _commit_snapshot(self, repositories_info: Dict[str, RepositoryInfo], unchanged_repositories: Set[str]) -> None:
+        # PRs that were closed, or whose repository vanished, are not carried over
+        with self.prs_info_lock:
+            if not CancellationToken.get_current().is_cancelled():
+                self.next_pull_requests_snapshot.update({
+                    snapshot_key: snapshot_entry for snapshot_key, snapshot_entry in self.pull_requests_snapshot.items()
+                    if snapshot_key[0] in unchanged_repositories})
+                self.pull_requests_snapshot = self.next_pull_requests_snapshot
+                self.last_repositories_info = repositories_info
+            else:
+                self.notification_feed.reset()
+            self.next_pull_requests_snapshot = {}
+            logging.info(f'Incremental refresh: {self.enriched_prs_count} PRs enriched, '
+                         f'{self.reused_prs_count} PRs reused, {self.deferred_prs_count} enriched after the others')
+
+    @TRACE_RECORDER.trace('listing')
+    def _list_pull_requests(self, repo: Repository) -> List[PullRequest]:
+        CancellationToken.raise_if_current_cancelled()
+        return list(super().get_pull_requests_for_repo(repo))
+
+    def _prefetch_branch_protection_info(self, repo: Repository, branch_name: str) -> None:
+        CancellationToken.raise_if_current_cancelled()
+        try:
+            super().get_branch_protection_info(repo, branch_name)
+        except GithubException as e:
+            # The PRs needing it request it again and fall back on their last known reviews
+            logging.info(f'Failed to prefetch branch protection of {repo.full_name} on branch "{branch_name}": {e}')
+
+    def _is_low_priority(self, pr: PullRequest, repo: Repository) -> bool:
+        if self.lazy_enrichment is False:
+            return False
+        snapshot_entry = self.pull_requests_snapshot.get((repo.full_name, pr.number))
+        if snapshot_entry is not None and snapshot_entry[0] == self._get_change_key(pr):
+            # Reused from the snapshot without any request
+            return False
+        # Any other PR can be urgent depending on its reviews and branch protection, only drafts are known from the
+        # list payload to never be, their provisional entry has the same status as the enriched one
+        return pr.draft
+
+    def _build_provisional_pr_info(self, pr: PullRequest, repo: Repository) -> PullRequestInfo:
+        # Its status is the draft one either way, only the review counts wait for the enrichment: the last known
+        # reviews if any, otherwise the review requests of the list payload
+        snapshot_entry = self.pull_requests_snapshot.get((repo.full_name, pr.number))
+        reviewers_info: ReviewersInfo = snapshot_entry[1].reviewers_info \
+            if snapshot_entry is not None and snapshot_entry[1].reviewers_info is not None else \
+            ReviewersInfo(author=pr.user.login, maintainer_can_modify=False,
+                          requested_reviewers=[user.login for user in pr.requested_reviewers], reviews=[],
+                          branch_protection_info=None, current_user=self.current_user)
         return PullRequestInfo(title=pr.title,
                                url=pr.html_url,
                                id=pr.number,
                                is_draft=pr.draft,
-                               is_author=is_author,
+                               is_author=pr.user.login == self.current_user,
                                reviewers_info=reviewers_info)
 
+    @staticmethod
+    def _get_change_key(pr: PullRequest) -> Tuple[datetime, str]:
+        # Reviews, review requests and pushes all bump `updated_at`, the head sha guards against clock granularity
+        return pr.updated_at, pr.head.sha
+
+    @staticmethod
+    def _build_repository_info(repo: Repository, pull_request_futures: List[Future],
+                               provisional_pull_requests_info: Iterable[PullRequestInfo] = ()) -> RepositoryInfo:
+        pull_requests_info: List[PullRequestInfo] = list(filter(lambda pr: pr is not None,
+                                                                [future.result() for future in pull_request_futures]))
+        pull_requests_info.extend(provisional_pull_requests_info)
+        pull_requests_info = sorted(pull_requests_info, key=lambda pull_request_info: pull_request_info.id)
+        return RepositoryInfo(name=repo.name, url=repo.html_url, pull_requests_info=pull_requests_info)
+
+    @staticmethod
+    def _cancel_futures(futures: List[Future]) -> None:
+        for future in futures:
+            future.cancel()
+
+    @TRACE_RECORDER.trace('enrichment')
+    def _format_pr_info(self, pr: PullRequest, repo: Repository) -> Optional[PullRequestInfo]:
+        cancellation_token: CancellationToken = CancellationToken.get_current()
+        cancellation_token.raise_if_cancelled()
+        snapshot_key: Tuple[str, int] = (repo.full_name, pr.number)
+        change_key: Tuple[datetime, str] = self._get_change_key(pr)
+        snapshot_entry = self.pull_requests_snapshot.get(snapshot_key)
+        if snapshot_entry is not None and snapshot_entry[0] == change_key:
+            pull_request_info: PullRequestInfo = snapshot_entry[1]
+            with self.prs_info_lock:
+                # The next snapshot may already belong to a newer generation
+                cancellation_token.raise_if_cancelled()
+                self.reused_prs_count += 1
+                self.next_pull_requests_snapshot[snapshot_key] = snapshot_entry
+            return pull_request_info
+
+        current_user: str = self.current_user
+        is_author: bool = pr.user.login == current_user
+        reviewers_info: Optional[ReviewersInfo] = super().get_reviewers_info(pull_request=pr, current_user=current_user)
+        fallback_entry = None
+        if reviewers_info is None and snapshot_entry is not None:
+            # Last known reviews are kept, the entry keeps its stale change key so the next refresh tries again
+            fallback_entry = snapshot_entry
+            reviewers_info = snapshot_entry[1].reviewers_info
+        pull_request_info = PullRequestInfo(title=pr.title,
+                                            url=pr.html_url,
+                                            id=pr.number,
+                                            is_draft=pr.draft,
+                                            is_author=is_author,
+                                            reviewers_info=reviewers_info)
+        with self.prs_info_lock:
+            cancellation_token.raise_if_cancelled()
+            self.enriched_prs_count += 1
+            if fallback_entry is not None:
+                self.next_pull_requests_snapshot[snapshot_key] = fallback_entry
+            elif reviewers_info is not None:
+                self.next_pull_requests_snapshot[snapshot_key] = (change_key, pull_request_info)
+        return pull_request_info
+
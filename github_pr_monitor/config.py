@@ -1,8 +1,30 @@
 import logging
 
+from github_pr_monitor.constants.api_constants import HTTP_CACHE_MAX_ENTRIES, HTTP_CACHE_MAX_BYTES, \
+    HTTP_CACHE_MAX_ENTRY_BYTES, GITHUB_MAX_CONCURRENT_REQUESTS, RETRY_MAX_ATTEMPTS, RETRY_BACKOFF_BASE, \
+    RETRY_BACKOFF_MAX, RETRY_AFTER_MAX, CIRCUIT_BREAKER_WINDOW_SIZE, CIRCUIT_BREAKER_MIN_REQUESTS, \
+    CIRCUIT_BREAKER_FAILURE_RATIO, CIRCUIT_BREAKER_COOL_DOWN
+from github_pr_monitor.constants.metrics_constants import METRIC_DEFINITIONS, REFRESH_DURATION_BUCKETS
 from github_pr_monitor.constants.thread_constants import APPLICATION_MAX_THREADS
+from github_pr_monitor.managers.metrics_registry import MetricsRegistry
 from github_pr_monitor.managers.thread_manager import ThreadManager
+from github_pr_monitor.managers.trace_recorder import TraceRecorder
+from github_pr_monitor.network.github_session_manager import GithubSessionManager
+from github_pr_monitor.network.http_cache import HttpResponseCache
+from github_pr_monitor.network.rate_limit_tracker import RateLimitTracker
+from github_pr_monitor.network.request_guard import RequestGuard, CircuitBreaker
+from github_pr_monitor.network.token_pool import TokenPool
 
 THREAD_MANAGER = ThreadManager(APPLICATION_MAX_THREADS)
+HTTP_RESPONSE_CACHE = HttpResponseCache(HTTP_CACHE_MAX_ENTRIES, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_MAX_ENTRY_BYTES)
+RATE_LIMIT_TRACKER = RateLimitTracker()
+TOKEN_POOL = TokenPool()
+REQUEST_GUARD = RequestGuard(GITHUB_MAX_CONCURRENT_REQUESTS, RETRY_MAX_ATTEMPTS, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX,
+                             RETRY_AFTER_MAX, CircuitBreaker(CIRCUIT_BREAKER_WINDOW_SIZE, CIRCUIT_BREAKER_MIN_REQUESTS,
+                                                             CIRCUIT_BREAKER_FAILURE_RATIO, CIRCUIT_BREAKER_COOL_DOWN))
+TRACE_RECORDER = TraceRecorder()
+METRICS_REGISTRY = MetricsRegistry(METRIC_DEFINITIONS, REFRESH_DURATION_BUCKETS)
+GITHUB_SESSION_MANAGER = GithubSessionManager(HTTP_RESPONSE_CACHE, RATE_LIMIT_TRACKER, TOKEN_POOL, REQUEST_GUARD,
+                                              TRACE_RECORDER, METRICS_REGISTRY)
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -0,0 +1,40 @@
+GITHUB_API_URL: str = 'https://api.github.com'
+GITHUB_GRAPHQL_URL: str = f'{GITHUB_API_URL}/graphql'
+GITHUB_HTTP_TIMEOUT: int = 15
+REST_PAGE_SIZE: int = 100
+ASYNC_MAX_CONCURRENT_REQUESTS: int = 32
+# GitHub secondary rate limits penalize bursts of concurrent requests, whatever the number of worker threads
+GITHUB_MAX_CONCURRENT_REQUESTS: int = 32
+
+RETRY_MAX_ATTEMPTS: int = 4
+RETRY_BACKOFF_BASE: float = 0.5
+RETRY_BACKOFF_MAX: float = 30
+# Longer Retry-After waits are reported as a rate limited refresh instead of being waited for
+RETRY_AFTER_MAX: int = 60
+CIRCUIT_BREAKER_WINDOW_SIZE: int = 50
+CIRCUIT_BREAKER_MIN_REQUESTS: int = 10
+CIRCUIT_BREAKER_FAILURE_RATIO: float = 0.5
+CIRCUIT_BREAKER_COOL_DOWN: float = 10
+
+HTTP_CACHE_MAX_ENTRIES: int = 20000
+HTTP_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+# Larger bodies are not cached, their requests are charged as if there was no cache
+HTTP_CACHE_MAX_ENTRY_BYTES: int = 1024 * 1024
+
+GRAPHQL_REPOSITORIES_PAGE_SIZE: int = 100
+GRAPHQL_REPOSITORIES_BATCH_SIZE: int = 25
+GRAPHQL_PULL_REQUESTS_PAGE_SIZE: int = 50
+GRAPHQL_REVIEWS_PAGE_SIZE: int = 50
+GRAPHQL_REVIEW_REQUESTS_PAGE_SIZE: int = 20
+GRAPHQL_DISMISSAL_ALLOWANCES_PAGE_SIZE: int = 20
+
+NOTIFICATIONS_PAGE_SIZE: int = 50
+NOTIFICATIONS_DEFAULT_POLL_INTERVAL: int = 60
+
+# The search API never returns more than this many results for a single query
+SEARCH_MAX_RESULTS: int = 1000
+# Queries over that cap are split in creation date ranges, nothing on GitHub was created before its launch
+SEARCH_CREATED_START: str = '2008-01-01T00:00:00Z'
+# Narrower ranges still over the cap are used truncated
+SEARCH_MIN_CREATED_RANGE: int = 60
+OPEN_PULL_REQUESTS_SEARCH_QUERY: str = 'is:pr is:open archived:false'
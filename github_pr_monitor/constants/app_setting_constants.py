@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, FrozenSet
 
 from github_pr_monitor.constants.emojis import PR_URGENT_EMOJI, PR_COMMENT_EMOJI, PR_OK_EMOJI, PR_DRAFT_EMOJI, \
     PR_IMPORTANT_EMOJI, REPO_WITH_PR_URGENT_EMOJI, REPO_WITH_PR_COMMENT_EMOJI, REPO_WITH_PR_OK_EMOJI, \
@@ -9,12 +9,48 @@ DIALOG_WIDTH: int = 500
 
 DEFAULT_REFRESH_DELAY: int = 300
 UPDATE_CHECKER_DELAY: int = 1
+REFRESH_SCHEDULER_TICK: int = 5
+# The rest of the startup runs once the status item is shown, from the first run loop iteration
+STARTUP_TIMER_DELAY: float = 0.1
+# Delay before loading the services again when the keychain or the token pool failed at startup
+SERVICES_RETRY_DELAY: int = 60
+STARTUP_PROFILE_MAX_IMPORTS: int = 15
+# Share of the remaining rate limit a refresh cycle may plan to consume before the window resets
+RATE_LIMIT_TARGET_BUDGET_RATIO: float = 0.8
 
 DEFAULT_NOTIFICATION_DELAY: int = 3600
 DEFAULT_CONFIG_DIR: str = '~/Library/Application Support/PRMonitor'
 DEFAULT_CONFIG_FILE_NAME: str = 'config.json'
+DEFAULT_SNAPSHOT_FILE_NAME: str = 'snapshot.sqlite3'
+SNAPSHOT_SCHEMA_VERSION: int = 1
+SNAPSHOT_MAX_BYTES: int = 5 * 1024 * 1024
 REPO_SEARCH_FILTER_CONFIG_KEY: str = 'repo_search_filter'
 REFRESH_TIME_CONFIG_KEY: str = 'refresh_time'
+FETCH_BACKEND_CONFIG_KEY: str = 'fetch_backend'
+DISCOVERY_MODE_CONFIG_KEY: str = 'discovery_mode'
+CHANGE_FEED_CONFIG_KEY: str = 'change_feed'
+NOTIFY_NEWLY_URGENT_ONLY_CONFIG_KEY: str = 'notify_newly_urgent_only'
+
+REST_FETCH_BACKEND: str = 'rest'
+GRAPHQL_FETCH_BACKEND: str = 'graphql'
+ASYNC_FETCH_BACKEND: str = 'async'
+FETCH_BACKENDS: List[str] = [REST_FETCH_BACKEND, GRAPHQL_FETCH_BACKEND, ASYNC_FETCH_BACKEND]
+DEFAULT_FETCH_BACKEND: str = REST_FETCH_BACKEND
+
+# How repositories to refresh are found: every accessible repository, or only those with open PRs found by search
+REPOSITORIES_DISCOVERY_MODE: str = 'repositories'
+SEARCH_DISCOVERY_MODE: str = 'search'
+DISCOVERY_MODES: List[str] = [REPOSITORIES_DISCOVERY_MODE, SEARCH_DISCOVERY_MODE]
+DEFAULT_DISCOVERY_MODE: str = REPOSITORIES_DISCOVERY_MODE
+# With the notifications change feed, every repository is still refreshed at least this often
+CHANGE_FEED_FULL_SWEEP_PERIOD: int = 3600
+
+CACHE_MAX_ENTRIES: int = 5000
+DEFAULT_CACHE_TTL: int = 3600
+BRANCH_PROTECTION_CACHE_NAMESPACE: str = 'branch_protection'
+CACHE_NAMESPACE_TTLS: Dict[str, int] = {
+    BRANCH_PROTECTION_CACHE_NAMESPACE: 3600
+}
 
 PR_REPO_STATUS_MAPPING: Dict[str, str] = {
     PR_URGENT_EMOJI: REPO_WITH_PR_URGENT_EMOJI,
@@ -24,3 +60,6 @@ PR_REPO_STATUS_MAPPING: Dict[str, str] = {
     PR_DRAFT_EMOJI: REPO_WITH_PR_DRAFT_EMOJI
 }
 PR_PRIORITY_ORDER: List[str] = [PR_URGENT_EMOJI, PR_COMMENT_EMOJI, PR_IMPORTANT_EMOJI, PR_OK_EMOJI, PR_DRAFT_EMOJI]
+PR_PRIORITY_RANKS: Dict[str, int] = {status: rank for rank, status in enumerate(PR_PRIORITY_ORDER)}
+# PR statuses that need the user, a repository with one of them is urgent
+URGENT_PR_STATUSES: FrozenSet[str] = frozenset({PR_URGENT_EMOJI, PR_COMMENT_EMOJI})
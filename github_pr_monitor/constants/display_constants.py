@@ -6,16 +6,23 @@ APP_QUITTING: str = f"{APP_NAME} {QUITTING_EMOJI} (Quitting)"
 DEFAULT_ERROR: str = "Unexpected Error"
 INVALID_PAT_MSG: str = "(Invalid PAT)"
 NETWORK_ERROR_MSG: str = "(Network Error)"
+RATE_LIMITED_MSG: str = "(Rate Limited)"
+SERVICES_ERROR_MSG: str = "(Startup Error)"
 
 REFRESH_MENU: str = "Force Refresh"
 REFRESHING: str = f"Refreshing… {IN_PROGRESS_EMOJI}"
 SETTINGS_MENU: str = "Settings"
 QUIT_MENU: str = "Quit"
 QUITTING: str = f"Quitting… {IN_PROGRESS_EMOJI}"
+REFRESH_PROGRESS: str = f" {IN_PROGRESS_EMOJI} {{completed}}/{{total}}"
 
 PAT_SETTING_MENU: str = "Github Personal Access Token"
+ADDITIONAL_PATS_SETTING_MENU: str = "Additional Access Tokens"
 REPOSITORY_FILTER_SETTING_MENU: str = "Repository Search Filter"
 REFRESH_DELAY_SETTING_MENU: str = "Refresh Delay"
 
-
-
+RATE_LIMIT_MENU: str = "API quota: {remaining}/{limit} (resets at {reset_time})"
+RATE_LIMIT_UNKNOWN_MENU: str = "API quota: unknown"
+NEXT_REFRESH_MENU: str = "Next refresh at {next_refresh_time}"
+NEXT_REFRESH_PENDING_MENU: str = "Next refresh: pending"
+TIME_FORMAT: str = "%H:%M"
@@ -0,0 +1,58 @@
+from typing import Dict, Tuple
+
+# Only served on the loopback interface, the endpoint is meant for a local scraper or agent
+METRICS_HOST: str = '127.0.0.1'
+METRICS_PATH: str = '/metrics'
+
+COUNTER_METRIC_TYPE: str = 'counter'
+GAUGE_METRIC_TYPE: str = 'gauge'
+HISTOGRAM_METRIC_TYPE: str = 'histogram'
+
+REFRESH_DURATION_BUCKETS: Tuple[float, ...] = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+REFRESH_DURATION_METRIC: str = 'github_pr_monitor_refresh_duration_seconds'
+REFRESHES_METRIC: str = 'github_pr_monitor_refreshes_total'
+HTTP_REQUESTS_METRIC: str = 'github_pr_monitor_http_requests_total'
+CACHE_LOOKUPS_METRIC: str = 'github_pr_monitor_cache_lookups_total'
+CACHE_HIT_RATIO_METRIC: str = 'github_pr_monitor_cache_hit_ratio'
+RATE_LIMIT_REMAINING_METRIC: str = 'github_pr_monitor_rate_limit_remaining'
+RATE_LIMIT_LIMIT_METRIC: str = 'github_pr_monitor_rate_limit_limit'
+REPOSITORIES_PROCESSED_METRIC: str = 'github_pr_monitor_repositories_processed_total'
+PULL_REQUESTS_PROCESSED_METRIC: str = 'github_pr_monitor_pull_requests_processed_total'
+FAILED_REPOSITORIES_METRIC: str = 'github_pr_monitor_failed_repositories_total'
+LAST_REFRESH_REPOSITORIES_METRIC: str = 'github_pr_monitor_last_refresh_repositories'
+LAST_REFRESH_PULL_REQUESTS_METRIC: str = 'github_pr_monitor_last_refresh_pull_requests'
+WORKER_THREADS_METRIC: str = 'github_pr_monitor_worker_threads'
+WORKER_ACTIVE_TASKS_METRIC: str = 'github_pr_monitor_worker_active_tasks'
+WORKER_QUEUED_TASKS_METRIC: str = 'github_pr_monitor_worker_queued_tasks'
+WORKER_COMPLETED_TASKS_METRIC: str = 'github_pr_monitor_worker_completed_tasks_total'
+
+# Metric name -> (type, help)
+METRIC_DEFINITIONS: Dict[str, Tuple[str, str]] = {
+    REFRESH_DURATION_METRIC: (HISTOGRAM_METRIC_TYPE, 'Duration of refreshes'),
+    REFRESHES_METRIC: (COUNTER_METRIC_TYPE, 'Refreshes by backend and outcome'),
+    HTTP_REQUESTS_METRIC: (COUNTER_METRIC_TYPE, 'GitHub HTTP requests by method, endpoint template and status'),
+    CACHE_LOOKUPS_METRIC: (COUNTER_METRIC_TYPE, 'Cache lookups by cache and result'),
+    CACHE_HIT_RATIO_METRIC: (GAUGE_METRIC_TYPE, 'Cache hit ratio of the last refresh'),
+    RATE_LIMIT_REMAINING_METRIC: (GAUGE_METRIC_TYPE, 'Remaining GitHub rate limit by resource'),
+    RATE_LIMIT_LIMIT_METRIC: (GAUGE_METRIC_TYPE, 'GitHub rate limit by resource'),
+    REPOSITORIES_PROCESSED_METRIC: (COUNTER_METRIC_TYPE, 'Repositories processed by refreshes'),
+    PULL_REQUESTS_PROCESSED_METRIC: (COUNTER_METRIC_TYPE, 'Pull requests processed by refreshes'),
+    FAILED_REPOSITORIES_METRIC: (COUNTER_METRIC_TYPE, 'Repositories kept in their previous state after a failure'),
+    LAST_REFRESH_REPOSITORIES_METRIC: (GAUGE_METRIC_TYPE, 'Repositories returned by the last refresh'),
+    LAST_REFRESH_PULL_REQUESTS_METRIC: (GAUGE_METRIC_TYPE, 'Pull requests returned by the last refresh'),
+    WORKER_THREADS_METRIC: (GAUGE_METRIC_TYPE, 'Size of the worker pool'),
+    WORKER_ACTIVE_TASKS_METRIC: (GAUGE_METRIC_TYPE, 'Tasks running on the worker pool'),
+    WORKER_QUEUED_TASKS_METRIC: (GAUGE_METRIC_TYPE, 'Tasks waiting for a worker'),
+    WORKER_COMPLETED_TASKS_METRIC: (COUNTER_METRIC_TYPE, 'Tasks completed by the worker pool'),
+}
+
+REFRESH_SUCCESS_OUTCOME: str = 'success'
+REFRESH_FAILURE_OUTCOME: str = 'failure'
+REFRESH_ABORTED_OUTCOME: str = 'aborted'
+# Requests that got no answer at all, e.g. connection errors and timeouts
+REQUEST_ERROR_STATUS: str = 'error'
+HTTP_RESPONSE_CACHE_LABEL: str = 'http_response'
+API_FETCHER_CACHE_LABEL: str = 'api_fetcher'
+CACHE_HIT_RESULT: str = 'hit'
+CACHE_MISS_RESULT: str = 'miss'
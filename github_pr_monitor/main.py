@@ -1,11 +1,35 @@
 import argparse
-from github_pr_monitor.app.github_pull_request_monitor_app import GithubPullRequestMonitorApp
+from github_pr_monitor.constants.app_setting_constants import FETCH_BACKENDS, DISCOVERY_MODES, \
+    STARTUP_PROFILE_MAX_IMPORTS
+from github_pr_monitor.managers.startup_profiler import StartupProfiler
 
 if __name__ == "__main__":
+    startup_profiler = StartupProfiler(STARTUP_PROFILE_MAX_IMPORTS)
     parser = argparse.ArgumentParser(description="Fetch GitHub PRs for repositories matching a keyword.")
     parser.add_argument("-r", "--repo_search_filter", help="Keyword to filter repositories", type=str)
     parser.add_argument("-p", "--pat", help="Set GitHub Personal Access Token", action="store_true")
+    parser.add_argument("-b", "--backend", help="API used to fetch pull requests", choices=FETCH_BACKENDS, type=str)
+    parser.add_argument("-d", "--discovery", help="How repositories with open PRs are found", choices=DISCOVERY_MODES,
+                        type=str)
+    parser.add_argument("-c", "--change_feed", help="Only refresh repositories reported by GitHub notifications",
+                        action="store_true")
+    parser.add_argument("-t", "--trace", help="Directory where a Chrome trace of each refresh is written", type=str)
+    parser.add_argument("-m", "--metrics_port", help="Serve Prometheus metrics on this local port", type=int)
+    parser.add_argument("-u", "--notify_newly_urgent_only",
+                        help="Notify PRs as they become urgent instead of an hourly summary", action="store_true")
+    parser.add_argument("-s", "--profile_startup", help="Log the import times and startup phases",
+                        action="store_true")
     args = parser.parse_args()
+    if args.profile_startup:
+        startup_profiler.enable()
 
-    app = GithubPullRequestMonitorApp(repo_search_filter=args.repo_search_filter, ask_pat=args.pat)
+    # Imported once the arguments are parsed, so its imports are profiled
+    with startup_profiler.phase('import application'):
+        from github_pr_monitor.app.github_pull_request_monitor_app import GithubPullRequestMonitorApp
+    with startup_profiler.phase('initialize application'):
+        app = GithubPullRequestMonitorApp(repo_search_filter=args.repo_search_filter, ask_pat=args.pat,
+                                          fetch_backend=args.backend, discovery_mode=args.discovery,
+                                          change_feed=args.change_feed, trace_dir=args.trace,
+                                          metrics_port=args.metrics_port, startup_profiler=startup_profiler,
+                                          notify_newly_urgent_only=args.notify_newly_urgent_only)
     app.run()
@@ -0,0 +1,66 @@
+import logging
+import threading
+from collections import OrderedDict
+from time import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class CacheManager:
+    HITS: str = 'hits'
+    MISSES: str = 'misses'
+    EVICTIONS: str = 'evictions'
+    EXPIRATIONS: str = 'expirations'
+
+    def __init__(self, max_entries: int, namespace_ttls: Dict[str, int], default_ttl: int):
+        self.max_entries = max_entries
+        self.namespace_ttls = namespace_ttls
+        self.default_ttl = default_ttl
+        # (namespace, key) -> (value, expiry timestamp), least recently used first
+        self.entries: OrderedDict[Tuple[str, Hashable], Tuple[Any, float]] = OrderedDict()
+        self.stats: Dict[str, int] = {self.HITS: 0, self.MISSES: 0, self.EVICTIONS: 0, self.EXPIRATIONS: 0}
+        self.lock = threading.Lock()
+
+    def get(self, namespace: str, key: Hashable, default: Any = None, record_stats: bool = True) -> Any:
+        # Cached values may be None, callers telling a miss apart pass a sentinel as default
+        with self.lock:
+            entry: Optional[Tuple[Any, float]] = self._get_entry(namespace, key)
+            if record_stats:
+                self.stats[self.MISSES if entry is None else self.HITS] += 1
+            return default if entry is None else entry[0]
+
+    def set(self, namespace: str, key: Hashable, value: Any) -> None:
+        ttl: int = self.namespace_ttls.get(namespace, self.default_ttl)
+        with self.lock:
+            self.entries[(namespace, key)] = (value, time() + ttl)
+            self.entries.move_to_end((namespace, key))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats[self.EVICTIONS] += 1
+
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        with self.lock:
+            if namespace is None:
+                self.entries.clear()
+            else:
+                for cache_key in [cache_key for cache_key in self.entries if cache_key[0] == namespace]:
+                    del self.entries[cache_key]
+        logging.info(f'Invalidated cache namespace "{namespace or "all"}"')
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats, size=len(self.entries))
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.stats = {stat: 0 for stat in self.stats}
+
+    def _get_entry(self, namespace: str, key: Hashable) -> Optional[Tuple[Any, float]]:
+        entry: Optional[Tuple[Any, float]] = self.entries.get((namespace, key))
+        if entry is None:
+            return None
+        if entry[1] <= time():
+            del self.entries[(namespace, key)]
+            self.stats[self.EXPIRATIONS] += 1
+            return None
+        self.entries.move_to_end((namespace, key))
+        return entry
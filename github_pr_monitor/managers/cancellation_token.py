@@ -0,0 +1,46 @@
+import contextvars
+from concurrent.futures import Future
+from typing import Optional
+
+
+class RefreshCancelledError(Exception):
+    pass
+
+
+class CancellationToken:
+    # Token of the refresh running in the current context, copied to its pool tasks and coroutines
+    _CURRENT: contextvars.ContextVar[Optional['CancellationToken']] = \
+        contextvars.ContextVar('cancellation_token', default=None)
+
+    def __init__(self, generation: int):
+        self.generation = generation
+        # Done once cancelled, so waiters can wake up on it
+        self.cancelled: Future = Future()
+
+    def cancel(self) -> None:
+        if not self.cancelled.done():
+            self.cancelled.set_result(None)
+
+    def is_cancelled(self) -> bool:
+        return self.cancelled.done()
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled.done():
+            raise RefreshCancelledError(f'Refresh {self.generation} was cancelled')
+
+    def activate(self) -> contextvars.Token:
+        return self._CURRENT.set(self)
+
+    @classmethod
+    def deactivate(cls, context_token: contextvars.Token) -> None:
+        cls._CURRENT.reset(context_token)
+
+    @classmethod
+    def get_current(cls) -> Optional['CancellationToken']:
+        return cls._CURRENT.get()
+
+    @classmethod
+    def raise_if_current_cancelled(cls) -> None:
+        token: Optional[CancellationToken] = cls._CURRENT.get()
+        if token is not None:
+            token.raise_if_cancelled()
@@ -4,7 +4,8 @@ import os
 from typing import Any, Optional, Dict
 
 from github_pr_monitor.constants.app_setting_constants import DEFAULT_CONFIG_FILE_NAME, DEFAULT_CONFIG_DIR, \
-    REPO_SEARCH_FILTER_CONFIG_KEY, REFRESH_TIME_CONFIG_KEY
+    REPO_SEARCH_FILTER_CONFIG_KEY, REFRESH_TIME_CONFIG_KEY, FETCH_BACKEND_CONFIG_KEY, \
+    DISCOVERY_MODE_CONFIG_KEY, CHANGE_FEED_CONFIG_KEY, NOTIFY_NEWLY_URGENT_ONLY_CONFIG_KEY
 
 
 class ConfigManager:
@@ -25,6 +26,30 @@ class ConfigManager:
     def set_refresh_time(self, refresh_time: int) -> None:
         self._set_config(REFRESH_TIME_CONFIG_KEY, refresh_time)
 
+    def get_fetch_backend(self) -> str:
+        return self._get_config(FETCH_BACKEND_CONFIG_KEY)
+
+    def set_fetch_backend(self, fetch_backend: str) -> None:
+        self._set_config(FETCH_BACKEND_CONFIG_KEY, fetch_backend)
+
+    def get_discovery_mode(self) -> str:
+        return self._get_config(DISCOVERY_MODE_CONFIG_KEY)
+
+    def set_discovery_mode(self, discovery_mode: str) -> None:
+        self._set_config(DISCOVERY_MODE_CONFIG_KEY, discovery_mode)
+
+    def get_change_feed(self) -> bool:
+        return self._get_config(CHANGE_FEED_CONFIG_KEY)
+
+    def set_change_feed(self, change_feed: bool) -> None:
+        self._set_config(CHANGE_FEED_CONFIG_KEY, change_feed)
+
+    def get_notify_newly_urgent_only(self) -> bool:
+        return self._get_config(NOTIFY_NEWLY_URGENT_ONLY_CONFIG_KEY)
+
+    def set_notify_newly_urgent_only(self, notify_newly_urgent_only: bool) -> None:
+        self._set_config(NOTIFY_NEWLY_URGENT_ONLY_CONFIG_KEY, notify_newly_urgent_only)
+
     def _get_config(self, key: str) -> Any:
         return self.config.get(key)
 
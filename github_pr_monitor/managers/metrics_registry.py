@@ -0,0 +1,112 @@
+import bisect
+import logging
+import threading
+from typing import Dict, Tuple, List, Callable, Optional
+
+from github_pr_monitor.constants.metrics_constants import HISTOGRAM_METRIC_TYPE
+
+# Sorted (label name, label value) pairs, so the same labels always map to the same series
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts: List[int] = [0] * len(buckets)
+        self.sum: float = 0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # Counts are per bucket, they are only accumulated when rendered
+        index: int = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    _LABEL_VALUE_ESCAPES: Dict[int, str] = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n'})
+
+    def __init__(self, definitions: Dict[str, Tuple[str, str]], histogram_buckets: Tuple[float, ...]):
+        self.definitions = definitions
+        self.histogram_buckets = histogram_buckets
+        self.values: Dict[str, Dict[Labels, float]] = {name: {} for name in definitions}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {name: {} for name in definitions}
+        # Called on each scrape to refresh the gauges read from other components
+        self.collectors: List[Callable[[], None]] = []
+        self.enabled = False
+        self.lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def is_enabled(self) -> bool:
+        return self.enabled
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self.collectors.append(collector)
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        if self.enabled is False:
+            return
+        key: Labels = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[name][key] = self.values[name].get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        if self.enabled is False:
+            return
+        with self.lock:
+            self.values[name][tuple(sorted(labels.items()))] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        if self.enabled is False:
+            return
+        key: Labels = tuple(sorted(labels.items()))
+        with self.lock:
+            histogram: Optional[Histogram] = self.histograms[name].get(key)
+            if histogram is None:
+                histogram = self.histograms[name][key] = Histogram(self.histogram_buckets)
+            histogram.observe(value)
+
+    def render(self) -> str:
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                logging.warning(f'Failed to collect metrics: {e}')
+        lines: List[str] = []
+        with self.lock:
+            for name, (metric_type, description) in self.definitions.items():
+                lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                if metric_type == HISTOGRAM_METRIC_TYPE:
+                    for labels, histogram in self.histograms[name].items():
+                        lines.extend(self._render_histogram(name, labels, histogram))
+                    continue
+                for labels, value in self.values[name].items():
+                    lines.append(f'{name}{self._format_labels(labels)} {self._format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def _render_histogram(self, name: str, labels: Labels, histogram: Histogram) -> List[str]:
+        lines: List[str] = []
+        cumulative_count: int = 0
+        for bucket, count in zip(histogram.buckets, histogram.counts):
+            cumulative_count += count
+            lines.append(f'{name}_bucket{self._format_labels(labels + (("le", self._format_value(bucket)),))} '
+                         f'{cumulative_count}')
+        lines.append(f'{name}_bucket{self._format_labels(labels + (("le", "+Inf"),))} {histogram.count}')
+        lines.append(f'{name}_sum{self._format_labels(labels)} {self._format_value(histogram.sum)}')
+        lines.append(f'{name}_count{self._format_labels(labels)} {histogram.count}')
+        return lines
+
+    @classmethod
+    def _format_labels(cls, labels: Labels) -> str:
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{label}="{value.translate(cls._LABEL_VALUE_ESCAPES)}"' for label, value in labels) + '}'
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
@@ -0,0 +1,62 @@
+import logging
+from time import time
+from typing import Optional, Dict, Any, List
+
+from github import GithubException
+from github.Requester import Requester
+
+
+class NotificationFeed:
+    _NOTIFICATIONS_URL: str = '/notifications'
+    _POLL_INTERVAL_HEADER: str = 'x-poll-interval'
+
+    def __init__(self, full_sweep_period: int, default_poll_interval: int, page_size: int):
+        self.full_sweep_period = full_sweep_period
+        self.default_poll_interval = default_poll_interval
+        self.page_size = page_size
+        self.poll_interval = default_poll_interval
+        self.last_poll_time: Optional[float] = None
+        self.last_full_sweep_time: Optional[float] = None
+        # Most recent `updated_at` seen, ISO 8601 timestamps in UTC compare as strings
+        self.watermark: Optional[str] = None
+
+    def reset(self) -> None:
+        self.last_poll_time = None
+        self.last_full_sweep_time = None
+        self.watermark = None
+
+    def is_full_sweep_due(self) -> bool:
+        return self.last_full_sweep_time is None or time() - self.last_full_sweep_time >= self.full_sweep_period
+
+    def get_changed_repositories(self, requester: Requester) -> Optional[Dict[str, Dict[str, Any]]]:
+        # Repository full name -> repository payload, None when every repository has to be refreshed
+        now: float = time()
+        if not self.is_full_sweep_due() and self.last_poll_time is not None and \
+                now - self.last_poll_time < self.poll_interval:
+            return {}
+
+        try:
+            # Polled with a stable URL so the HTTP cache revalidates it, an unchanged feed answers "304 Not Modified"
+            headers, notifications = requester.requestJsonAndCheck(
+                'GET', self._NOTIFICATIONS_URL, parameters={'all': 'true', 'per_page': self.page_size})
+        except GithubException as e:
+            logging.warning(f'Failed to poll notifications, falling back to a full refresh: {e}')
+            self.reset()
+            return None
+
+        previous_watermark: Optional[str] = self.watermark
+        new_notifications: List[Dict[str, Any]] = [
+            notification for notification in notifications
+            if previous_watermark is None or notification['updated_at'] > previous_watermark]
+        if new_notifications:
+            self.watermark = max(notification['updated_at'] for notification in new_notifications)
+        self.last_poll_time = now
+        self.poll_interval = int(headers.get(self._POLL_INTERVAL_HEADER, self.default_poll_interval))
+
+        # A page with only new notifications may hide older changes on the next pages
+        is_truncated: bool = len(notifications) >= self.page_size and len(new_notifications) == len(notifications)
+        if self.is_full_sweep_due() or is_truncated:
+            self.last_full_sweep_time = now
+            return None
+        return {notification['repository']['full_name']: notification['repository']
+                for notification in new_notifications}
@@ -0,0 +1,81 @@
+import logging
+from time import time
+from typing import Dict, Optional
+
+from github_pr_monitor.network.rate_limit_tracker import RateLimitTracker, RateLimitStatus
+from github_pr_monitor.network.token_pool import TokenPool
+
+
+class RefreshScheduler:
+    # The budget spread by the token pool
+    _POOLED_RESOURCE: str = 'core'
+
+    def __init__(self, rate_limit_tracker: RateLimitTracker, refresh_delay: int, target_budget_ratio: float,
+                 token_pool: Optional[TokenPool] = None):
+        self.rate_limit_tracker = rate_limit_tracker
+        self.token_pool = token_pool
+        self.refresh_delay = refresh_delay
+        self.target_budget_ratio = target_budget_ratio
+        self.next_refresh_time: Optional[float] = time()
+        self.last_refresh_end: Optional[float] = None
+        self.cycle_start_charged_requests: Dict[str, int] = {}
+        self.cycle_start_statuses: Dict[str, RateLimitStatus] = {}
+
+    def set_refresh_delay(self, refresh_delay: int) -> None:
+        self.refresh_delay = refresh_delay
+        if self.next_refresh_time is not None:
+            self.next_refresh_time = (self.last_refresh_end or time()) + refresh_delay
+
+    def is_refresh_due(self) -> bool:
+        return self.next_refresh_time is not None and time() >= self.next_refresh_time
+
+    def start_cycle(self) -> None:
+        self.next_refresh_time = None
+        self.cycle_start_charged_requests = self.rate_limit_tracker.get_charged_requests()
+        self.cycle_start_statuses = self.rate_limit_tracker.get_statuses()
+
+    def end_cycle(self) -> float:
+        now: float = time()
+        interval: float = self.refresh_delay
+        for resource, charged_requests in self.rate_limit_tracker.get_charged_requests().items():
+            cost: int = self._get_cycle_cost(resource, charged_requests)
+            status: Optional[RateLimitStatus] = self._get_status(resource)
+            if cost > 0 and status is not None:
+                interval = max(interval, self._get_affordable_interval(status, cost, now))
+        interval = max(interval, self.rate_limit_tracker.get_retry_after_until() - now)
+
+        if interval > self.refresh_delay:
+            logging.info(f'Next refresh delayed to {int(interval)}s to stay within the rate limit budget')
+        self.last_refresh_end = now
+        self.next_refresh_time = now + interval
+        return interval
+
+    def _get_status(self, resource: str) -> Optional[RateLimitStatus]:
+        status: Optional[RateLimitStatus] = self.rate_limit_tracker.get_status(resource)
+        if status is None or not self._is_pooled(resource):
+            return status
+        # The tracker only saw the last account answering, the pool knows the budget left across accounts
+        return RateLimitStatus(resource, status.limit, self.token_pool.get_estimated_remaining(), status.used,
+                               status.reset_at)
+
+    def _is_pooled(self, resource: str) -> bool:
+        return resource == self._POOLED_RESOURCE and self.token_pool is not None and self.token_pool.is_enabled()
+
+    def _get_cycle_cost(self, resource: str, charged_requests: int) -> int:
+        cost: int = charged_requests - self.cycle_start_charged_requests.get(resource, 0)
+        # The remaining delta compares two accounts once requests are spread across them
+        if self._is_pooled(resource):
+            return cost
+        start_status: Optional[RateLimitStatus] = self.cycle_start_statuses.get(resource)
+        end_status: Optional[RateLimitStatus] = self.rate_limit_tracker.get_status(resource)
+        # GraphQL queries cost points rather than requests, the remaining delta is exact within one window
+        if start_status is not None and end_status is not None and start_status.reset_at == end_status.reset_at:
+            cost = max(cost, start_status.remaining - end_status.remaining)
+        return cost
+
+    def _get_affordable_interval(self, status: RateLimitStatus, cost: int, now: float) -> float:
+        seconds_to_reset: float = max(status.reset_at - now, 0)
+        budget: float = status.remaining * self.target_budget_ratio
+        if budget < cost:
+            return seconds_to_reset
+        return seconds_to_reset / (budget // cost)
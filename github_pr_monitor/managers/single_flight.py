@@ -0,0 +1,50 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from github_pr_monitor.managers.cancellation_token import CancellationToken, RefreshCancelledError
+
+
+class SingleFlight:
+    def __init__(self):
+        # Key -> result of the call in flight, shared by every caller arriving before it completes
+        self.calls: Dict[Hashable, Future] = {}
+        self.coalesced_calls = 0
+        self.lock = threading.Lock()
+
+    def do(self, key: Hashable, function: Callable[..., Any], *args: Any) -> Any:
+        while True:
+            with self.lock:
+                future: Optional[Future] = self.calls.get(key)
+                is_leader: bool = future is None
+                if is_leader:
+                    future = Future()
+                    self.calls[key] = future
+                else:
+                    self.coalesced_calls += 1
+            if is_leader:
+                break
+            try:
+                return future.result()
+            except RefreshCancelledError:
+                # The leader's refresh was cancelled, which may not be the caller's: it retries, possibly as leader
+                CancellationToken.raise_if_current_cancelled()
+
+        try:
+            result: Any = function(*args)
+        except BaseException as e:
+            self._complete(key)
+            future.set_exception(e)
+            raise
+        self._complete(key)
+        future.set_result(result)
+        return result
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.coalesced_calls = 0
+
+    def _complete(self, key: Hashable) -> None:
+        # Removed before the followers wake up, so those retrying do not join the completed call again
+        with self.lock:
+            del self.calls[key]
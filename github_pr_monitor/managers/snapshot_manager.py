@@ -0,0 +1,82 @@
+import json
+import logging
+import os
+import sqlite3
+import zlib
+from contextlib import closing
+from time import time
+from typing import List, Any, Dict, Optional
+
+from github_pr_monitor.constants.app_setting_constants import DEFAULT_CONFIG_DIR, DEFAULT_SNAPSHOT_FILE_NAME, \
+    SNAPSHOT_SCHEMA_VERSION, SNAPSHOT_MAX_BYTES
+from github_pr_monitor.models.repository_info import RepositoryInfo
+
+
+class SnapshotManager:
+    # A single row is kept and replaced on every save, so the store cannot grow past SNAPSHOT_MAX_BYTES
+    _SNAPSHOT_ID: int = 1
+
+    def __init__(self, dir_name: str = DEFAULT_CONFIG_DIR, file_name: str = DEFAULT_SNAPSHOT_FILE_NAME,
+                 max_bytes: int = SNAPSHOT_MAX_BYTES):
+        self.snapshot_path = self._get_snapshot_path(dir_name, file_name)
+        self.max_bytes = max_bytes
+        self._init_schema()
+
+    def load_snapshot(self) -> List[RepositoryInfo]:
+        try:
+            with closing(self._connect()) as connection, connection:
+                row = connection.execute('SELECT data FROM snapshot WHERE id = ?', (self._SNAPSHOT_ID,)).fetchone()
+            if row is None:
+                return []
+            data: List[Dict[str, Any]] = json.loads(zlib.decompress(row[0]))
+            return sorted([RepositoryInfo.from_dict(repository_info) for repository_info in data],
+                          key=lambda repository_info: repository_info.name)
+        except (sqlite3.Error, zlib.error, ValueError, KeyError, TypeError) as e:
+            logging.warning(f'Error while loading snapshot: {e}')
+            return []
+
+    def save_snapshot(self, repositories_info: List[RepositoryInfo]) -> None:
+        data: Optional[bytes] = self._serialize(repositories_info)
+        try:
+            with closing(self._connect()) as connection, connection:
+                connection.execute('INSERT OR REPLACE INTO snapshot (id, saved_at, data) VALUES (?, ?, ?)',
+                                   (self._SNAPSHOT_ID, time(), data))
+        except sqlite3.Error as e:
+            logging.warning(f'Error while saving snapshot: {e}')
+
+    def _serialize(self, repositories_info: List[RepositoryInfo]) -> bytes:
+        # Repositories with open PRs are the only ones painted, the others are dropped first when over the bound
+        kept: List[RepositoryInfo] = sorted(repositories_info, key=lambda repository_info:
+                                            not repository_info.pull_requests_info)
+        data: bytes = self._compress(kept)
+        while len(data) > self.max_bytes and kept:
+            kept = kept[:int(len(kept) * self.max_bytes / len(data))]
+            data = self._compress(kept)
+            logging.warning(f'Snapshot over {self.max_bytes} bytes, keeping {len(kept)} repositories')
+        return data
+
+    @staticmethod
+    def _compress(repositories_info: List[RepositoryInfo]) -> bytes:
+        return zlib.compress(json.dumps([repository_info.to_dict() for repository_info in repositories_info],
+                                        separators=(',', ':')).encode())
+
+    def _init_schema(self) -> None:
+        try:
+            with closing(self._connect()) as connection, connection:
+                schema_version: int = connection.execute('PRAGMA user_version').fetchone()[0]
+                if schema_version != SNAPSHOT_SCHEMA_VERSION:
+                    connection.execute('DROP TABLE IF EXISTS snapshot')
+                    connection.execute('CREATE TABLE snapshot (id INTEGER PRIMARY KEY, saved_at REAL, data BLOB)')
+                    connection.execute(f'PRAGMA user_version = {SNAPSHOT_SCHEMA_VERSION}')
+        except sqlite3.Error as e:
+            logging.warning(f'Error while initializing snapshot store: {e}')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.snapshot_path)
+
+    @staticmethod
+    def _get_snapshot_path(dir_name: str = DEFAULT_CONFIG_DIR, file_name: str = DEFAULT_SNAPSHOT_FILE_NAME) -> str:
+        snapshot_dir = os.path.expanduser(dir_name)
+        if not os.path.exists(snapshot_dir):
+            os.makedirs(snapshot_dir)
+        return os.path.join(snapshot_dir, file_name)
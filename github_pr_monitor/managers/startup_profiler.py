@@ -0,0 +1,72 @@
+import builtins
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Tuple, Dict, Iterator, Optional, Callable
+
+
+class StartupProfiler:
+    def __init__(self, max_reported_imports: int):
+        self.max_reported_imports = max_reported_imports
+        self.origin: float = time.perf_counter()
+        # (name, offset from the origin, duration) in seconds, instants have no duration
+        self.phases: List[Tuple[str, float, Optional[float]]] = []
+        # Top level package -> wall time of its first import, nested packages included
+        self.import_times: Dict[str, float] = {}
+        self.original_import: Optional[Callable] = None
+        self.enabled = False
+        self.lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.original_import = builtins.__import__
+        builtins.__import__ = self._profile_import
+
+    def is_enabled(self) -> bool:
+        return self.enabled
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if self.enabled is False:
+            yield
+            return
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.phases.append((name, start - self.origin, time.perf_counter() - start))
+
+    def mark(self, name: str) -> None:
+        if self.enabled is True:
+            with self.lock:
+                self.phases.append((name, time.perf_counter() - self.origin, None))
+
+    def report(self) -> None:
+        if self.enabled is False:
+            return
+        builtins.__import__ = self.original_import
+        self.enabled = False
+        lines: List[str] = ['Startup profile:']
+        for name, offset, duration in sorted(self.phases, key=lambda phase: phase[1]):
+            lines.append(f'  {offset * 1000:8.1f} ms  {name}' +
+                         (f' ({duration * 1000:.1f} ms)' if duration is not None else ''))
+        lines.append('Slowest imports, nested packages included:')
+        for package, duration in sorted(self.import_times.items(), key=lambda item: item[1],
+                                        reverse=True)[:self.max_reported_imports]:
+            lines.append(f'  {duration * 1000:8.1f} ms  {package}')
+        logging.info('\n'.join(lines))
+
+    def _profile_import(self, name: str, globals=None, locals=None, fromlist=(), level: int = 0):
+        package: str = name.split('.')[0]
+        # Relative imports and packages already loaded are not timed, only the first import of a package is
+        if level > 0 or package in sys.modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+        start: float = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            with self.lock:
+                self.import_times.setdefault(package, time.perf_counter() - start)
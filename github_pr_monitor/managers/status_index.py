@@ -0,0 +1,114 @@
+import threading
+from typing import Dict, Set, List, Iterable
+
+from github_pr_monitor.constants.app_setting_constants import PR_PRIORITY_ORDER, URGENT_PR_STATUSES
+from github_pr_monitor.models.pull_request_info import PullRequestInfo
+from github_pr_monitor.models.repository_info import RepositoryInfo
+
+
+class StatusIndex:
+    def __init__(self):
+        # Keyed by PR URL, repositories by their URL
+        self.pull_requests: Dict[str, PullRequestInfo] = {}
+        self.repository_pull_requests: Dict[str, Set[str]] = {}
+        self.status_members: Dict[str, Set[str]] = {status: set() for status in PR_PRIORITY_ORDER}
+        self.authored: Set[str] = set()
+        self.review_requested: Set[str] = set()
+        self.urgent_repositories: Set[str] = set()
+        self.repositories_with_pull_requests: Set[str] = set()
+        # PRs that became urgent since the last `pop_newly_urgent`
+        self.newly_urgent: Set[str] = set()
+        self.lock = threading.Lock()
+
+    def reset(self, repositories_info: Iterable[RepositoryInfo]) -> None:
+        # The given state is the baseline, none of its PRs is newly urgent
+        with self.lock:
+            self._update_repositories(repositories_info)
+            self.newly_urgent.clear()
+
+    def update_repository(self, repository_info: RepositoryInfo) -> None:
+        with self.lock:
+            self._update_repository(repository_info)
+
+    def update_repositories(self, repositories_info: Iterable[RepositoryInfo]) -> None:
+        # Complete results, the repositories missing from them are dropped
+        with self.lock:
+            self._update_repositories(repositories_info)
+
+    def count(self, status: str) -> int:
+        return len(self.status_members[status])
+
+    def count_authored(self) -> int:
+        return len(self.authored)
+
+    def count_review_requested(self) -> int:
+        return len(self.review_requested)
+
+    def is_urgent(self) -> bool:
+        return bool(self.urgent_repositories)
+
+    def has_pull_requests(self) -> bool:
+        return bool(self.repositories_with_pull_requests)
+
+    def pop_newly_urgent(self) -> List[PullRequestInfo]:
+        with self.lock:
+            pull_requests_info: List[PullRequestInfo] = [self.pull_requests[url] for url in self.newly_urgent]
+            self.newly_urgent.clear()
+        return sorted(pull_requests_info, key=lambda pull_request_info: pull_request_info.url)
+
+    def _update_repositories(self, repositories_info: Iterable[RepositoryInfo]) -> None:
+        repository_urls: Set[str] = set()
+        for repository_info in repositories_info:
+            repository_urls.add(repository_info.url)
+            self._update_repository(repository_info)
+        for repository_url in [url for url in self.repository_pull_requests if url not in repository_urls]:
+            for url in self.repository_pull_requests.pop(repository_url):
+                self._remove_pull_request(url)
+            self.urgent_repositories.discard(repository_url)
+            self.repositories_with_pull_requests.discard(repository_url)
+
+    def _update_repository(self, repository_info: RepositoryInfo) -> None:
+        urls: Set[str] = {pull_request_info.url for pull_request_info in repository_info.pull_requests_info}
+        for url in self.repository_pull_requests.get(repository_info.url, set()) - urls:
+            self._remove_pull_request(url)
+        for pull_request_info in repository_info.pull_requests_info:
+            previous_pull_request_info = self.pull_requests.get(pull_request_info.url)
+            # PRs reused from the previous refresh are the same objects, only the others are reindexed
+            if previous_pull_request_info is pull_request_info:
+                continue
+            was_urgent: bool = previous_pull_request_info is not None and \
+                previous_pull_request_info.status in URGENT_PR_STATUSES
+            # Still newly urgent if it was not notified yet
+            is_newly_urgent: bool = pull_request_info.status in URGENT_PR_STATUSES and \
+                (was_urgent is False or pull_request_info.url in self.newly_urgent)
+            if previous_pull_request_info is not None:
+                self._remove_pull_request(pull_request_info.url)
+            self._add_pull_request(pull_request_info)
+            if is_newly_urgent:
+                self.newly_urgent.add(pull_request_info.url)
+        self.repository_pull_requests[repository_info.url] = urls
+        self._set_membership(self.urgent_repositories, repository_info.url, repository_info.is_urgent)
+        self._set_membership(self.repositories_with_pull_requests, repository_info.url, bool(urls))
+
+    def _add_pull_request(self, pull_request_info: PullRequestInfo) -> None:
+        url: str = pull_request_info.url
+        self.pull_requests[url] = pull_request_info
+        self.status_members[pull_request_info.status].add(url)
+        self._set_membership(self.authored, url, pull_request_info.is_author)
+        self._set_membership(self.review_requested, url, pull_request_info.reviewers_info is not None and
+                             pull_request_info.reviewers_info.current_user in
+                             pull_request_info.reviewers_info.requested_reviewers)
+
+    def _remove_pull_request(self, url: str) -> None:
+        pull_request_info: PullRequestInfo = self.pull_requests.pop(url)
+        self.status_members[pull_request_info.status].discard(url)
+        self.authored.discard(url)
+        self.review_requested.discard(url)
+        self.newly_urgent.discard(url)
+
+    @staticmethod
+    def _set_membership(members: Set[str], key: str, is_member: bool) -> None:
+        if is_member:
+            members.add(key)
+        else:
+            members.discard(key)
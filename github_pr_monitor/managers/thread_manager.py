@@ -1,27 +1,63 @@
+import contextvars
 import threading
-import queue
-from typing import Any, Callable
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Dict
 
 
 class ThreadManager:
+    ACTIVE_TASKS: str = 'active_tasks'
+    QUEUED_TASKS: str = 'queued_tasks'
+    COMPLETED_TASKS: str = 'completed_tasks'
+
+    _THREAD_NAME_PREFIX: str = 'github_pr_monitor_worker'
+
     def __init__(self, max_threads: int):
-        self.active_threads = []
-        self.threads_lock = threading.Lock()
-        self.thread_queue = queue.Queue(max_threads)
-
-    def start_thread(self, target, args=(), daemon: bool = False) -> None:
-        thread = threading.Thread(target=self._run_and_release, args=(target, args, daemon), daemon=daemon)
-        if daemon is False:
-            self.thread_queue.put(thread)
+        self.max_threads = max_threads
+        self.executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix=self._THREAD_NAME_PREFIX)
+        # Submitted tasks not done yet, running or waiting for a worker
+        self.pending_tasks = 0
+        self.active_tasks = 0
+        self.completed_tasks = 0
+        self.stats_lock = threading.Lock()
+
+    def start_thread(self, target: Callable[..., Any], args=(), daemon: bool = False) -> None:
+        # Long-lived coordination work (refresh orchestration, quitting) must not hold a pool worker
+        thread = threading.Thread(target=target, args=args, daemon=daemon)
         thread.start()
 
-    def _run_and_release(self, target: Callable, args: Any, daemon: bool = True) -> None:
+    def submit(self, target: Callable[..., Any], *args: Any) -> Future:
+        with self.stats_lock:
+            self.pending_tasks += 1
+        try:
+            # Tasks run in the context of their submitter, e.g. with the cancellation token of its refresh
+            future: Future = self.executor.submit(self._run, contextvars.copy_context(), target, *args)
+        except RuntimeError:
+            # The pool is shut down
+            with self.stats_lock:
+                self.pending_tasks -= 1
+            raise
+        # Also called for cancelled tasks, which never run
+        future.add_done_callback(self._on_task_done)
+        return future
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.stats_lock:
+            return {self.ACTIVE_TASKS: self.active_tasks, self.QUEUED_TASKS: self.pending_tasks - self.active_tasks,
+                    self.COMPLETED_TASKS: self.completed_tasks}
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, context: contextvars.Context, target: Callable[..., Any], *args: Any) -> Any:
+        with self.stats_lock:
+            self.active_tasks += 1
         try:
-            target(*args)
+            return context.run(target, *args)
         finally:
-            if daemon is False:
-                self.thread_queue.get()
-                self.thread_queue.task_done()
+            with self.stats_lock:
+                self.active_tasks -= 1
 
-    def wait_for_all_threads(self) -> None:
-        self.thread_queue.join()
+    def _on_task_done(self, future: Future) -> None:
+        with self.stats_lock:
+            self.pending_tasks -= 1
+            self.completed_tasks += 1
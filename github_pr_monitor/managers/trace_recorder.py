@@ -0,0 +1,162 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class Span:
+    __slots__ = ('recorder', 'name', 'category', 'args', 'start')
+
+    def __init__(self, recorder: 'TraceRecorder', name: str, category: str, args: Dict[str, Any]):
+        self.recorder = recorder
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start: float = 0
+
+    def __enter__(self) -> 'Span':
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exception_type: Any, exception: Any, traceback: Any) -> None:
+        if exception is not None:
+            self.args['error'] = repr(exception)
+        self.recorder.record(self, perf_counter())
+
+    def set_arg(self, name: str, value: Any) -> None:
+        self.args[name] = value
+
+
+class DisabledSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> 'DisabledSpan':
+        return self
+
+    def __exit__(self, exception_type: Any, exception: Any, traceback: Any) -> None:
+        pass
+
+    def set_arg(self, name: str, value: Any) -> None:
+        pass
+
+
+class TraceRecorder:
+    # Path rewrites turning request URLs into endpoint templates, so traces group calls by endpoint
+    _URL_TEMPLATE_RULES: List[Tuple[re.Pattern, str]] = [
+        (re.compile(r'^/api/v3(?=/)'), ''),
+        (re.compile(r'^/repos/[^/]+/[^/]+'), '/repos/{owner}/{repo}'),
+        (re.compile(r'/branches/[^/]+'), '/branches/{branch}'),
+        (re.compile(r'^/(users|orgs)/[^/]+'), r'/\1/{login}'),
+        (re.compile(r'/\d+(?=/|$)'), '/{number}'),
+    ]
+    _DISABLED_SPAN: DisabledSpan = DisabledSpan()
+
+    def __init__(self):
+        # Tracing is off until a directory is set, spans then cost a single attribute check
+        self.trace_dir: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self.lanes: Dict[int, str] = {}
+        self.origin: float = perf_counter()
+        self.lock = threading.Lock()
+
+    def enable(self, trace_dir: str) -> None:
+        self.trace_dir = os.path.expanduser(trace_dir)
+        os.makedirs(self.trace_dir, exist_ok=True)
+        self.start_trace()
+
+    def start_trace(self) -> None:
+        with self.lock:
+            self.events = []
+            self.lanes = {}
+            self.origin = perf_counter()
+
+    def span(self, name: str, category: str, **args: Any) -> Any:
+        if self.trace_dir is None:
+            return self._DISABLED_SPAN
+        return Span(self, name, category, args)
+
+    def http_span(self, method: str, url: str) -> Any:
+        # The URL template is only computed when tracing, it is the costly part of a span
+        if self.trace_dir is None:
+            return self._DISABLED_SPAN
+        url_template: str = self.get_url_template(url)
+        return Span(self, f'{method} {url_template}', 'http', {'url_template': url_template})
+
+    def trace(self, category: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        def decorator(function: Callable[..., Any]) -> Callable[..., Any]:
+            name: str = function.__qualname__
+            if inspect.iscoroutinefunction(function):
+                @functools.wraps(function)
+                async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                    if self.trace_dir is None:
+                        return await function(*args, **kwargs)
+                    with Span(self, name, category, {}):
+                        return await function(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(function)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if self.trace_dir is None:
+                    return function(*args, **kwargs)
+                with Span(self, name, category, {}):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, span: Span, end: float) -> None:
+        lane, lane_name = self._get_lane()
+        with self.lock:
+            if span.start < self.origin:
+                # Started before the current trace, e.g. a request of an aborted refresh
+                return
+            self.lanes.setdefault(lane, lane_name)
+            self.events.append({'name': span.name, 'cat': span.category, 'ph': 'X', 'pid': os.getpid(), 'tid': lane,
+                                'ts': round((span.start - self.origin) * 1e6, 1),
+                                'dur': round((end - span.start) * 1e6, 1), 'args': span.args})
+
+    def write_trace(self) -> Optional[str]:
+        if self.trace_dir is None:
+            return None
+        with self.lock:
+            events: List[Dict[str, Any]] = self.events + [
+                {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': lane, 'args': {'name': lane_name}}
+                for lane, lane_name in self.lanes.items()]
+            self.events = []
+            self.lanes = {}
+            self.origin = perf_counter()
+        trace_path: str = os.path.join(self.trace_dir, f'refresh-{datetime.now().strftime("%Y%m%d-%H%M%S-%f")}.json')
+        try:
+            with open(trace_path, 'w') as trace_file:
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+        except OSError as e:
+            logging.warning(f'Failed to write trace {trace_path}: {e}')
+            return None
+        logging.info(f'Trace of {len(events)} events written to {trace_path}')
+        return trace_path
+
+    @classmethod
+    def get_url_template(cls, url: str) -> str:
+        path: str = urlsplit(url).path
+        for pattern, replacement in cls._URL_TEMPLATE_RULES:
+            path = pattern.sub(replacement, path)
+        return path
+
+    @staticmethod
+    def _get_lane() -> Tuple[int, str]:
+        # Coroutines interleave on the event loop thread, each task gets its own lane so spans nest properly
+        try:
+            task: Optional[asyncio.Task] = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is not None:
+            return id(task), task.get_name()
+        thread: threading.Thread = threading.current_thread()
+        return thread.ident, thread.name
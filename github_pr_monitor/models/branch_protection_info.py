@@ -0,0 +1,23 @@
+from typing import Dict, Any, Iterable, Tuple
+
+from github_pr_monitor.models.immutable_model import ImmutableModel
+
+
+class BranchProtectionInfo(ImmutableModel):
+    __slots__ = ('dismissal_users', 'required_approving_review_count')
+
+    dismissal_users: Tuple[str, ...]
+    required_approving_review_count: int
+
+    def __init__(self, dismissal_users: Iterable[str], required_approving_review_count: int):
+        self._set_fields(dismissal_users=tuple(dismissal_users),
+                         required_approving_review_count=required_approving_review_count)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'dismissal_users': list(self.dismissal_users),
+                'required_approving_review_count': self.required_approving_review_count}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'BranchProtectionInfo':
+        return cls(dismissal_users=data['dismissal_users'],
+                   required_approving_review_count=data['required_approving_review_count'])
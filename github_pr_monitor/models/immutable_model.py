@@ -0,0 +1,16 @@
+from typing import Any
+
+
+class ImmutableModel:
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable, cannot set "{name}"')
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f'{type(self).__name__} is immutable, cannot delete "{name}"')
+
+    def _set_fields(self, **fields: Any) -> None:
+        # Only meant to be called from `__init__`
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
@@ -1,31 +1,67 @@
+from typing import Dict, Any, Optional
+
 from github_pr_monitor.constants.emojis import PR_DRAFT_EMOJI, PR_OK_EMOJI, PR_URGENT_EMOJI, PR_IMPORTANT_EMOJI, \
-    PR_COMMENT_EMOJI, AUTHOR_EMOJI, REVIEWER_EMOJI
+    PR_COMMENT_EMOJI, AUTHOR_EMOJI, REVIEWER_EMOJI, ERROR_EMOJI
+from github_pr_monitor.models.immutable_model import ImmutableModel
 from github_pr_monitor.models.reviewers_info import ReviewersInfo
 
 
-class PullRequestInfo:
+class PullRequestInfo(ImmutableModel):
+    __slots__ = ('title', 'url', 'id', 'is_draft', 'reviewers_info', 'is_author', 'status')
+
+    title: str
+    url: str
+    id: int
+    is_draft: bool
+    reviewers_info: Optional[ReviewersInfo]
+    is_author: bool
+    status: str
 
-    def __init__(self, title: str, url: str, id: int, is_draft: bool, reviewers_info: ReviewersInfo,
+    def __init__(self, title: str, url: str, id: int, is_draft: bool, reviewers_info: Optional[ReviewersInfo],
                  is_author: bool):
-        self.title = title
-        self.url = url
-        self.id = id
-        self.is_draft = is_draft
-        self.reviewers_info = reviewers_info
-        self.is_author = is_author
+        self._set_fields(title=title,
+                         url=url,
+                         id=id,
+                         is_draft=is_draft,
+                         reviewers_info=reviewers_info,
+                         is_author=is_author)
+        # Read by the menu, the title and the status index, the fields it depends on never change
+        self._set_fields(status=self._get_status())
 
     def format_pr_title(self) -> str:
         status: str = f"{self.status}{AUTHOR_EMOJI if self.is_author else '     '} "
+        if self.reviewers_info is None:
+            # Reviews could not be fetched and there was no previous state to fall back to
+            return f"{status}({ERROR_EMOJI}) ➤\t{self.title}"
         reviewers: str = f"({self.reviewers_info.number_of_reviews}{REVIEWER_EMOJI}️) " \
                          f"[{self.reviewers_info.number_of_completed_reviews} " \
                          f"/ {self.reviewers_info.number_of_requested_reviewers}]"
 
         return f"{status}{reviewers} ➤\t{self.title}"
 
-    @property
-    def status(self) -> str:
+    def to_dict(self) -> Dict[str, Any]:
+        return {'title': self.title,
+                'url': self.url,
+                'id': self.id,
+                'is_draft': self.is_draft,
+                'is_author': self.is_author,
+                'reviewers_info': self.reviewers_info.to_dict() if self.reviewers_info is not None else None}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PullRequestInfo':
+        return cls(title=data['title'],
+                   url=data['url'],
+                   id=data['id'],
+                   is_draft=data['is_draft'],
+                   is_author=data['is_author'],
+                   reviewers_info=ReviewersInfo.from_dict(data['reviewers_info'])
+                   if data['reviewers_info'] is not None else None)
+
+    def _get_status(self) -> str:
         if self.is_draft:
             return PR_DRAFT_EMOJI
+        elif self.reviewers_info is None:
+            return PR_IMPORTANT_EMOJI
         elif self.reviewers_info.has_current_user_requested:
             return PR_COMMENT_EMOJI
         elif self.reviewers_info.has_current_user_reviewed and \
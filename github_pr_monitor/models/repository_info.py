@@ -1,26 +1,51 @@
-from typing import List, Tuple
+from typing import Tuple, Dict, Any, Iterable
 
-from github_pr_monitor.constants.app_setting_constants import PR_REPO_STATUS_MAPPING, PR_PRIORITY_ORDER
-from github_pr_monitor.constants.emojis import PR_URGENT_EMOJI, PR_COMMENT_EMOJI
+from github_pr_monitor.constants.app_setting_constants import PR_REPO_STATUS_MAPPING, PR_PRIORITY_ORDER, \
+    PR_PRIORITY_RANKS, URGENT_PR_STATUSES
+from github_pr_monitor.models.immutable_model import ImmutableModel
 from github_pr_monitor.models.pull_request_info import PullRequestInfo
 
 
-class RepositoryInfo:
-    def __init__(self, name: str, url: str, pull_requests_info: List[PullRequestInfo]):
-        self.name = name
-        self.url = url
-        self.prs_page_url = url + "/pulls"
-        self.pull_requests_info = pull_requests_info
-        self.status, self.is_urgent = self._get_highest_priority_status()
+class RepositoryInfo(ImmutableModel):
+    __slots__ = ('name', 'url', 'pull_requests_info', 'status', 'is_urgent')
+
+    name: str
+    url: str
+    pull_requests_info: Tuple[PullRequestInfo, ...]
+    status: str
+    is_urgent: bool
+
+    def __init__(self, name: str, url: str, pull_requests_info: Iterable[PullRequestInfo]):
+        self._set_fields(name=name,
+                         url=url,
+                         pull_requests_info=tuple(pull_requests_info))
+        status, is_urgent = self._get_highest_priority_status()
+        self._set_fields(status=status, is_urgent=is_urgent)
+
+    @property
+    def prs_page_url(self) -> str:
+        return self.url + "/pulls"
 
     def format_repo_title(self) -> str:
         return f"{self.status} {self.name}"
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name,
+                'url': self.url,
+                'pull_requests_info': [pull_request_info.to_dict() for pull_request_info in self.pull_requests_info]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RepositoryInfo':
+        return cls(name=data['name'],
+                   url=data['url'],
+                   pull_requests_info=[PullRequestInfo.from_dict(pull_request_info)
+                                       for pull_request_info in data['pull_requests_info']])
+
     def _get_highest_priority_status(self) -> Tuple[str, bool]:
         current_priority = PR_PRIORITY_ORDER[-1]
-        is_urgent = False
+        current_rank = PR_PRIORITY_RANKS[current_priority]
         for pr in self.pull_requests_info:
-            if PR_PRIORITY_ORDER.index(pr.status) < PR_PRIORITY_ORDER.index(current_priority):
-                current_priority = pr.status
-                is_urgent = pr.status in [PR_URGENT_EMOJI, PR_COMMENT_EMOJI]
-        return PR_REPO_STATUS_MAPPING[current_priority], is_urgent
+            status: str = pr.status
+            if PR_PRIORITY_RANKS[status] < current_rank:
+                current_priority, current_rank = status, PR_PRIORITY_RANKS[status]
+        return PR_REPO_STATUS_MAPPING[current_priority], current_priority in URGENT_PR_STATUSES
@@ -1,53 +1,99 @@
-from typing import List, Optional, Dict
+from typing import Optional, Dict, Tuple, Any, Iterable, FrozenSet
 
-from github.PaginatedList import PaginatedList
-from github.PullRequest import PullRequest
-from github.PullRequestReview import PullRequestReview
-from github.RequiredPullRequestReviews import RequiredPullRequestReviews
+from github_pr_monitor.models.branch_protection_info import BranchProtectionInfo
+from github_pr_monitor.models.immutable_model import ImmutableModel
 
 
-class ReviewersInfo:
+class ReviewersInfo(ImmutableModel):
     CHANGED_REQUESTED: str = 'CHANGES_REQUESTED'
     APPROVED: str = 'APPROVED'
+    PENDING: str = 'PENDING'
 
-    def __init__(self, pull_request: PullRequest, reviews: PaginatedList[PullRequestReview],
-                 branch_required_reviews: Optional[RequiredPullRequestReviews], current_user: str):
-        self.pull_request = pull_request
-        self.reviews = reviews
-        self.branch_required_reviews = branch_required_reviews
-        self.current_user = current_user
-
-        self.mandatory_reviewers = self._get_mandatory_reviewers()
-        self.has_current_user_reviewed = self._has_user_reviewed()
-        self.has_current_user_requested = self._has_user_requested_changes()
-        self.review_statuses = self._get_review_statuses()
-        self.number_of_reviews = len(self.review_statuses)
-        self.number_of_completed_reviews = sum(status == self.APPROVED for status in self.review_statuses.values())
-        self.number_of_requested_reviewers = self._get_number_of_requested_reviewers()
-        self.is_mandatory = current_user in self.mandatory_reviewers
-
-    def _get_mandatory_reviewers(self) -> List[str]:
-        mandatory_reviewers = set()
+    __slots__ = ('author', 'maintainer_can_modify', 'requested_reviewers', 'reviews', 'branch_protection_info',
+                 'current_user', 'mandatory_reviewers', 'has_current_user_reviewed', 'has_current_user_requested',
+                 'number_of_reviews', 'number_of_completed_reviews',
+                 'number_of_requested_reviewers', 'is_mandatory')
+
+    author: str
+    maintainer_can_modify: bool
+    requested_reviewers: Tuple[str, ...]
+    reviews: Tuple[Tuple[str, str], ...]
+    branch_protection_info: Optional[BranchProtectionInfo]
+    current_user: str
+    mandatory_reviewers: FrozenSet[str]
+    has_current_user_reviewed: bool
+    has_current_user_requested: bool
+    number_of_reviews: int
+    number_of_completed_reviews: int
+    number_of_requested_reviewers: int
+    is_mandatory: bool
+
+    def __init__(self, author: str, maintainer_can_modify: bool, requested_reviewers: Iterable[str],
+                 reviews: Iterable[Tuple[str, str]], branch_protection_info: Optional[BranchProtectionInfo],
+                 current_user: str):
+        self._set_fields(author=author,
+                         maintainer_can_modify=maintainer_can_modify,
+                         requested_reviewers=tuple(requested_reviewers),
+                         reviews=tuple((login, state) for login, state in reviews),
+                         branch_protection_info=branch_protection_info,
+                         current_user=current_user)
 
-        if self.branch_required_reviews is not None and self.branch_required_reviews.dismissal_users is not None:
-            mandatory_reviewers.update(user.login for user in self.branch_required_reviews.dismissal_users)
+        mandatory_reviewers: FrozenSet[str] = self._get_mandatory_reviewers()
+        self._set_fields(mandatory_reviewers=mandatory_reviewers,
+                         number_of_requested_reviewers=self._get_number_of_requested_reviewers(),
+                         is_mandatory=current_user in mandatory_reviewers)
+        # Only the counts are kept, the last review of each reviewer is not needed afterwards
+        self._aggregate_reviews()
 
-        if self.pull_request.maintainer_can_modify:
-            mandatory_reviewers.add(self.pull_request.user.login)
+    def to_dict(self) -> Dict[str, Any]:
+        return {'author': self.author,
+                'maintainer_can_modify': self.maintainer_can_modify,
+                'requested_reviewers': list(self.requested_reviewers),
+                'reviews': [list(review) for review in self.reviews],
+                'branch_protection_info': self.branch_protection_info.to_dict()
+                if self.branch_protection_info is not None else None,
+                'current_user': self.current_user}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ReviewersInfo':
+        branch_protection_info: Optional[Dict[str, Any]] = data['branch_protection_info']
+        return cls(author=data['author'],
+                   maintainer_can_modify=data['maintainer_can_modify'],
+                   requested_reviewers=data['requested_reviewers'],
+                   reviews=data['reviews'],
+                   branch_protection_info=BranchProtectionInfo.from_dict(branch_protection_info)
+                   if branch_protection_info is not None else None,
+                   current_user=data['current_user'])
+
+    def _get_mandatory_reviewers(self) -> FrozenSet[str]:
+        mandatory_reviewers = set()
 
-        mandatory_reviewers.update(request.login for request in self.pull_request.get_review_requests()[0])
-        return list(mandatory_reviewers)
+        if self.branch_protection_info is not None:
+            mandatory_reviewers.update(self.branch_protection_info.dismissal_users)
 
-    def _has_user_reviewed(self) -> bool:
-        return any(review.user.login == self.current_user for review in self.reviews if review.state != 'PENDING')
+        if self.maintainer_can_modify:
+            mandatory_reviewers.add(self.author)
 
-    def _has_user_requested_changes(self) -> bool:
-        return any(review.user.login == self.current_user and review.state == self.CHANGED_REQUESTED
-                   for review in self.reviews)
+        mandatory_reviewers.update(self.requested_reviewers)
+        return frozenset(mandatory_reviewers)
 
-    def _get_review_statuses(self) -> Dict[str, str]:
-        return {review.user.login: review.state for review in self.reviews}
+    def _aggregate_reviews(self) -> None:
+        # Reviews come oldest first, only the last state of each reviewer counts towards completed reviews
+        review_statuses: Dict[str, str] = {}
+        number_of_completed_reviews = 0
+        has_current_user_reviewed = False
+        has_current_user_requested = False
+        for login, state in self.reviews:
+            number_of_completed_reviews += (state == self.APPROVED) - (review_statuses.get(login) == self.APPROVED)
+            review_statuses[login] = state
+            if login == self.current_user:
+                has_current_user_reviewed |= state != self.PENDING
+                has_current_user_requested |= state == self.CHANGED_REQUESTED
+        self._set_fields(has_current_user_reviewed=has_current_user_reviewed,
+                         has_current_user_requested=has_current_user_requested,
+                         number_of_reviews=len(review_statuses),
+                         number_of_completed_reviews=number_of_completed_reviews)
 
     def _get_number_of_requested_reviewers(self) -> int:
-        branch_count = self.branch_required_reviews.required_approving_review_count if self.branch_required_reviews else 0
-        return max(len(self.pull_request.requested_reviewers), branch_count)
+        branch_count = self.branch_protection_info.required_approving_review_count if self.branch_protection_info else 0
+        return max(len(self.requested_reviewers), branch_count)
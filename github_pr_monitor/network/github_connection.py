@@ -0,0 +1,50 @@
+from typing import Optional, Union, Any
+
+import requests
+from github.Requester import Requester, HTTPSRequestsConnectionClass, HTTPRequestsConnectionClass
+from urllib3 import Retry
+
+from github_pr_monitor.config import GITHUB_SESSION_MANAGER
+
+
+# PyGithub opens a new connection object per request once connection classes are injected,
+# so the requests session (and its keep-alive pool) is shared through GITHUB_SESSION_MANAGER.
+class _SharedSessionConnectionMixin:
+    protocol: str
+    default_port: int
+
+    def _setup(self, host: str, port: Optional[int], timeout: Optional[int],
+               retry: Optional[Union[int, Retry]], pool_size: Optional[int], **kwargs: Any) -> None:
+        self.port = port if port else self.default_port
+        self.host = host
+        self.timeout = timeout
+        self.verify = kwargs.get('verify', True)
+        self.retry = retry if retry is not None else requests.adapters.DEFAULT_RETRIES
+        self.pool_size = pool_size if pool_size is not None else requests.adapters.DEFAULT_POOLSIZE
+        self.session = GITHUB_SESSION_MANAGER.get_session(f'{self.protocol}://{self.host}:{self.port}',
+                                                          self.retry, self.pool_size)
+
+    def close(self) -> None:
+        pass
+
+
+class SharedSessionHTTPSConnectionClass(_SharedSessionConnectionMixin, HTTPSRequestsConnectionClass):
+    protocol: str = 'https'
+    default_port: int = 443
+
+    def __init__(self, host: str, port: Optional[int] = None, strict: bool = False, timeout: Optional[int] = None,
+                 retry: Optional[Union[int, Retry]] = None, pool_size: Optional[int] = None, **kwargs: Any):
+        self._setup(host, port, timeout, retry, pool_size, **kwargs)
+
+
+class SharedSessionHTTPConnectionClass(_SharedSessionConnectionMixin, HTTPRequestsConnectionClass):
+    protocol: str = 'http'
+    default_port: int = 80
+
+    def __init__(self, host: str, port: Optional[int] = None, strict: bool = False, timeout: Optional[int] = None,
+                 retry: Optional[Union[int, Retry]] = None, pool_size: Optional[int] = None, **kwargs: Any):
+        self._setup(host, port, timeout, retry, pool_size, **kwargs)
+
+
+def install_shared_session_connection_classes() -> None:
+    Requester.injectConnectionClasses(SharedSessionHTTPConnectionClass, SharedSessionHTTPSConnectionClass)
@@ -0,0 +1,95 @@
+import threading
+from typing import Dict, Optional, Union
+
+import requests
+from urllib3 import Retry
+
+from github_pr_monitor.constants.metrics_constants import HTTP_REQUESTS_METRIC, REQUEST_ERROR_STATUS
+from github_pr_monitor.managers.metrics_registry import MetricsRegistry
+from github_pr_monitor.managers.trace_recorder import TraceRecorder
+from github_pr_monitor.network.http_cache import HttpResponseCache, CachingHTTPAdapter
+from github_pr_monitor.network.rate_limit_tracker import RateLimitTracker
+from github_pr_monitor.network.request_guard import RequestGuard, ResilientHTTPAdapter
+from github_pr_monitor.network.token_pool import TokenPool, TokenPoolAuth
+
+
+# Cache revalidation happens once, the retries of the request guard reuse the same conditional headers
+class GithubHTTPAdapter(CachingHTTPAdapter, ResilientHTTPAdapter):
+    def __init__(self, response_cache: HttpResponseCache, trace_recorder: TraceRecorder,
+                 metrics_registry: MetricsRegistry, **kwargs):
+        super().__init__(response_cache, **kwargs)
+        self.trace_recorder = trace_recorder
+        self.metrics_registry = metrics_registry
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        # One span per call, cache revalidation and retries included
+        with self.trace_recorder.http_span(request.method, request.url) as span:
+            try:
+                response: requests.Response = super().send(request, **kwargs)
+            except requests.exceptions.RequestException:
+                self._record_request(request, REQUEST_ERROR_STATUS)
+                raise
+            span.set_arg('status', response.status_code)
+            self._record_request(request, str(response.status_code))
+            return response
+
+    def _record_request(self, request: requests.PreparedRequest, status: str) -> None:
+        if self.metrics_registry.is_enabled():
+            self.metrics_registry.increment(HTTP_REQUESTS_METRIC, method=request.method,
+                                            endpoint=TraceRecorder.get_url_template(request.url), status=status)
+
+
+class GithubSessionManager:
+    def __init__(self, response_cache: HttpResponseCache, rate_limit_tracker: RateLimitTracker, token_pool: TokenPool,
+                 request_guard: RequestGuard, trace_recorder: TraceRecorder, metrics_registry: MetricsRegistry):
+        self.response_cache = response_cache
+        self.rate_limit_tracker = rate_limit_tracker
+        self.token_pool = token_pool
+        self.request_guard = request_guard
+        self.trace_recorder = trace_recorder
+        self.metrics_registry = metrics_registry
+        self.sessions: Dict[str, requests.Session] = {}
+        self.pool_sizes: Dict[str, int] = {}
+        self.sessions_lock = threading.Lock()
+
+    def get_session(self, base_url: str, retry: Optional[Union[int, Retry]] = None,
+                    pool_size: Optional[int] = None) -> requests.Session:
+        with self.sessions_lock:
+            session: Optional[requests.Session] = self.sessions.get(base_url)
+            if session is None:
+                session = self._create_session(base_url)
+                self.sessions[base_url] = session
+                self._mount_adapter(session, base_url, retry, pool_size)
+            elif pool_size is not None and pool_size > self.pool_sizes[base_url]:
+                # Grown in place, the fetchers already holding the session keep using it
+                self._mount_adapter(session, base_url, retry, pool_size)
+            return session
+
+    def close_all_sessions(self) -> None:
+        with self.sessions_lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
+            self.pool_sizes.clear()
+
+    def _create_session(self, base_url: str) -> requests.Session:
+        session = requests.Session()
+        # A non-None auth disables the ~/.netrc fallback of requests, it only rotates tokens when a pool is configured
+        session.auth = TokenPoolAuth(self.token_pool, session)
+        session.hooks['response'].append(self.rate_limit_tracker.observe)
+        # Last, a response it retries with another token is replaced after the other hooks saw it
+        session.hooks['response'].append(session.auth.on_response)
+        return session
+
+    def _mount_adapter(self, session: requests.Session, base_url: str, retry: Optional[Union[int, Retry]],
+                       pool_size: Optional[int]) -> None:
+        # The replaced adapter is not closed, requests still in flight on its connections complete
+        self.pool_sizes[base_url] = pool_size or requests.adapters.DEFAULT_POOLSIZE
+        adapter = GithubHTTPAdapter(self.response_cache,
+                                    trace_recorder=self.trace_recorder,
+                                    metrics_registry=self.metrics_registry,
+                                    request_guard=self.request_guard,
+                                    max_retries=retry if retry is not None else requests.adapters.DEFAULT_RETRIES,
+                                    pool_connections=self.pool_sizes[base_url],
+                                    pool_maxsize=self.pool_sizes[base_url])
+        session.mount(base_url, adapter)
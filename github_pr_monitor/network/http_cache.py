@@ -0,0 +1,125 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+class CachedResponse:
+    def __init__(self, etag: Optional[str], last_modified: Optional[str], content: bytes,
+                 headers: CaseInsensitiveDict, encoding: Optional[str]):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content = content
+        self.headers = headers
+        self.encoding = encoding
+
+
+class HttpResponseCache:
+    HITS: str = 'hits'
+    MISSES: str = 'misses'
+    REVALIDATIONS: str = 'revalidations'
+
+    def __init__(self, max_entries: int, max_bytes: int, max_entry_bytes: int):
+        self.max_entries = max_entries
+        # Bodies are bounded in total, and the largest ones are not kept at all so a few cannot evict all the others
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.entries: OrderedDict[Tuple[str, str], CachedResponse] = OrderedDict()
+        self.size: int = 0
+        self.stats: Dict[str, int] = {self.HITS: 0, self.MISSES: 0, self.REVALIDATIONS: 0}
+        self.lock = threading.Lock()
+
+    def lookup(self, key: Tuple[str, str]) -> Optional[CachedResponse]:
+        with self.lock:
+            cached_response = self.entries.get(key)
+            if cached_response is not None:
+                self.entries.move_to_end(key)
+            return cached_response
+
+    def store(self, key: Tuple[str, str], cached_response: CachedResponse) -> None:
+        with self.lock:
+            previous_response: Optional[CachedResponse] = self.entries.pop(key, None)
+            if previous_response is not None:
+                self.size -= len(previous_response.content)
+            # The previous body is stale, it is dropped even when the new one is too large to be kept
+            if len(cached_response.content) > self.max_entry_bytes:
+                return
+            self.entries[key] = cached_response
+            self.size += len(cached_response.content)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted_response = self.entries.popitem(last=False)
+                self.size -= len(evicted_response.content)
+
+    def record(self, stat: str) -> None:
+        with self.lock:
+            self.stats[stat] += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats)
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.stats = {stat: 0 for stat in self.stats}
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    # GitHub does not charge "304 Not Modified" answers against the rate limit
+    CONDITIONAL_HEADERS: Tuple[str, str] = ('If-None-Match', 'If-Modified-Since')
+    _NOT_MODIFIED: int = 304
+    _OK: int = 200
+
+    def __init__(self, response_cache: HttpResponseCache, **kwargs):
+        super().__init__(**kwargs)
+        self.response_cache = response_cache
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs) -> requests.Response:
+        if request.method != 'GET' or stream or any(header in request.headers for header in self.CONDITIONAL_HEADERS):
+            return super().send(request, stream=stream, **kwargs)
+
+        key: Tuple[str, str] = (request.url, request.headers.get('Accept', ''))
+        cached_response: Optional[CachedResponse] = self.response_cache.lookup(key)
+        if cached_response is not None:
+            if cached_response.etag:
+                request.headers['If-None-Match'] = cached_response.etag
+            if cached_response.last_modified:
+                request.headers['If-Modified-Since'] = cached_response.last_modified
+            self.response_cache.record(HttpResponseCache.REVALIDATIONS)
+
+        response: requests.Response = super().send(request, stream=stream, **kwargs)
+
+        if cached_response is not None and response.status_code == self._NOT_MODIFIED:
+            self.response_cache.record(HttpResponseCache.HITS)
+            return self._build_response_from_cache(response, cached_response)
+
+        if cached_response is None:
+            self.response_cache.record(HttpResponseCache.MISSES)
+        etag: Optional[str] = response.headers.get('ETag')
+        last_modified: Optional[str] = response.headers.get('Last-Modified')
+        if response.status_code == self._OK and (etag or last_modified):
+            self.response_cache.store(key, CachedResponse(etag=etag, last_modified=last_modified,
+                                                          content=response.content,
+                                                          headers=CaseInsensitiveDict(response.headers),
+                                                          encoding=response.encoding))
+        return response
+
+    def _build_response_from_cache(self, response: requests.Response,
+                                   cached_response: CachedResponse) -> requests.Response:
+        # Keep fresh headers (rate limit, date) but restore the ones describing the cached body (Link, Content-Type)
+        headers = CaseInsensitiveDict(cached_response.headers)
+        headers.update({name: value for name, value in response.headers.items() if name.lower() != 'content-length'})
+        response.headers = headers
+        response.status_code = self._OK
+        response.reason = 'OK'
+        response.encoding = cached_response.encoding
+        response._content = cached_response.content
+        response.from_cache = True
+        return response
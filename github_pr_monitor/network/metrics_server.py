@@ -0,0 +1,49 @@
+import http
+import logging
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Any
+
+from github_pr_monitor.constants.metrics_constants import METRICS_PATH
+from github_pr_monitor.managers.metrics_registry import MetricsRegistry
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    server: 'MetricsServer'
+    _CONTENT_TYPE: str = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def do_GET(self) -> None:
+        if self.path.split('?', 1)[0] != METRICS_PATH:
+            self.send_error(http.HTTPStatus.NOT_FOUND)
+            return
+        body: bytes = self.server.metrics_registry.render().encode('utf-8')
+        self.send_response(http.HTTPStatus.OK)
+        self.send_header('Content-Type', self._CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Scrapes are periodic, logging each of them would flood the application logs
+        pass
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, metrics_registry: MetricsRegistry, host: str, port: int):
+        super().__init__((host, port), MetricsRequestHandler)
+        self.metrics_registry = metrics_registry
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.metrics_registry.enable()
+        self.thread = threading.Thread(target=self.serve_forever, name='metrics_server', daemon=True)
+        self.thread.start()
+        logging.info(f'Metrics served on http://{self.server_address[0]}:{self.server_address[1]}{METRICS_PATH}')
+
+    def stop(self) -> None:
+        if self.thread is not None:
+            self.shutdown()
+            self.thread = None
+        self.server_close()
@@ -0,0 +1,70 @@
+import threading
+from time import time
+from typing import Dict, Optional, Any, Mapping
+
+import requests
+
+
+class RateLimitStatus:
+    def __init__(self, resource: str, limit: int, remaining: int, used: int, reset_at: float):
+        self.resource = resource
+        self.limit = limit
+        self.remaining = remaining
+        self.used = used
+        self.reset_at = reset_at
+
+
+class RateLimitTracker:
+    _DEFAULT_RESOURCE: str = 'core'
+
+    def __init__(self):
+        self.statuses: Dict[str, RateLimitStatus] = {}
+        # Requests actually charged against the limit, "304 Not Modified" answers are free
+        self.charged_requests: Dict[str, int] = {}
+        self.retry_after_until: float = 0
+        self.lock = threading.Lock()
+
+    def observe(self, response: requests.Response, *args: Any, **kwargs: Any) -> requests.Response:
+        self.observe_headers(response.headers, from_cache=getattr(response, 'from_cache', False))
+        return response
+
+    def observe_headers(self, headers: Mapping[str, str], from_cache: bool = False) -> None:
+        resource: str = headers.get('X-RateLimit-Resource', self._DEFAULT_RESOURCE)
+        with self.lock:
+            if 'X-RateLimit-Remaining' in headers:
+                self.statuses[resource] = RateLimitStatus(resource=resource,
+                                                          limit=int(headers.get('X-RateLimit-Limit', 0)),
+                                                          remaining=int(headers['X-RateLimit-Remaining']),
+                                                          used=int(headers.get('X-RateLimit-Used', 0)),
+                                                          reset_at=float(headers.get('X-RateLimit-Reset', 0)))
+            if not from_cache:
+                self.charged_requests[resource] = self.charged_requests.get(resource, 0) + 1
+            retry_after: Optional[str] = headers.get('Retry-After')
+            if retry_after is not None and retry_after.isdigit():
+                self.retry_after_until = max(self.retry_after_until, time() + int(retry_after))
+
+    def get_status(self, resource: str) -> Optional[RateLimitStatus]:
+        with self.lock:
+            return self.statuses.get(resource)
+
+    def get_statuses(self) -> Dict[str, RateLimitStatus]:
+        with self.lock:
+            return dict(self.statuses)
+
+    def get_most_constrained_status(self) -> Optional[RateLimitStatus]:
+        with self.lock:
+            statuses = [status for status in self.statuses.values() if status.limit > 0]
+        return min(statuses, key=lambda status: status.remaining / status.limit, default=None)
+
+    def get_charged_requests(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.charged_requests)
+
+    def get_retry_after_until(self) -> float:
+        with self.lock:
+            return self.retry_after_until
+
+    def is_rate_limited(self) -> bool:
+        with self.lock:
+            return self.retry_after_until > time() or any(status.remaining == 0 and status.reset_at > time()
+                                                          for status in self.statuses.values())
@@ -0,0 +1,155 @@
+import http
+import logging
+import random
+import threading
+from collections import deque
+from concurrent.futures import wait
+from functools import partial
+from time import time, sleep
+from typing import Optional, Mapping, Dict, Callable, Deque, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from github_pr_monitor.managers.cancellation_token import CancellationToken
+
+
+class CircuitBreaker:
+    def __init__(self, window_size: int, min_requests: int, failure_ratio: float, cool_down: float):
+        self.min_requests = min_requests
+        self.failure_ratio = failure_ratio
+        self.cool_down = cool_down
+        self.outcomes: Deque[bool] = deque(maxlen=window_size)
+        self.opened_until: float = 0
+        self.lock = threading.Lock()
+
+    def record(self, success: bool) -> bool:
+        # Returns whether this outcome opened the circuit
+        with self.lock:
+            self.outcomes.append(success)
+            failures: int = self.outcomes.count(False)
+            if self.opened_until > time() or len(self.outcomes) < self.min_requests or \
+                    failures / len(self.outcomes) < self.failure_ratio:
+                return False
+            self.opened_until = time() + self.cool_down
+            # Half-open once the cool down is over, the next outcomes are judged on a fresh window
+            self.outcomes.clear()
+            return True
+
+    def get_wait_time(self) -> float:
+        with self.lock:
+            return max(self.opened_until - time(), 0)
+
+
+class RequestGuard:
+    REQUESTS: str = 'requests'
+    RETRIES: str = 'retries'
+    FAILURES: str = 'failures'
+    CIRCUIT_OPENINGS: str = 'circuit_openings'
+
+    _SERVER_ERROR_STATUSES: Tuple[int, ...] = (http.HTTPStatus.INTERNAL_SERVER_ERROR, http.HTTPStatus.BAD_GATEWAY,
+                                               http.HTTPStatus.SERVICE_UNAVAILABLE, http.HTTPStatus.GATEWAY_TIMEOUT)
+    _SECONDARY_RATE_LIMIT_STATUSES: Tuple[int, int] = (http.HTTPStatus.FORBIDDEN, http.HTTPStatus.TOO_MANY_REQUESTS)
+
+    def __init__(self, max_concurrent_requests: int, max_retries: int, backoff_base: float, backoff_max: float,
+                 max_retry_after: int, circuit_breaker: CircuitBreaker):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.circuit_breaker = circuit_breaker
+        self.semaphore = threading.BoundedSemaphore(max_concurrent_requests)
+        self.stats: Dict[str, int] = {self.REQUESTS: 0, self.RETRIES: 0, self.FAILURES: 0, self.CIRCUIT_OPENINGS: 0}
+        self.lock = threading.Lock()
+
+    def set_max_concurrent_requests(self, max_concurrent_requests: int) -> None:
+        # Requests already holding the previous semaphore release it, new ones wait on this one
+        self.semaphore = threading.BoundedSemaphore(max_concurrent_requests)
+
+    def send(self, send_request: Callable[[], requests.Response]) -> requests.Response:
+        attempt: int = 0
+        while True:
+            self._sleep(self.get_circuit_wait_time())
+            try:
+                with self.semaphore:
+                    response: requests.Response = send_request()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                delay: Optional[float] = self.observe(attempt, None, None)
+                if delay is None:
+                    raise
+            else:
+                delay = self.observe(attempt, response.status_code, response.headers)
+                if delay is None:
+                    return response
+                response.close()
+            self._sleep(delay)
+            attempt += 1
+
+    def observe(self, attempt: int, status: Optional[int], headers: Optional[Mapping[str, str]]) -> Optional[float]:
+        # Returns the delay before the next attempt, None once the answer is final. No status means no answer at all
+        is_transient_failure: bool = status is None or self._is_transient_failure(status, headers)
+        with self.lock:
+            self.stats[self.REQUESTS] += 1
+        if self.circuit_breaker.record(not is_transient_failure):
+            logging.warning(f'Too many GitHub errors, requests are paused for {self.circuit_breaker.cool_down}s')
+            self._increment(self.CIRCUIT_OPENINGS)
+        if not is_transient_failure:
+            return None
+        delay: Optional[float] = self._get_retry_delay(attempt, headers)
+        self._increment(self.RETRIES if delay is not None else self.FAILURES)
+        return delay
+
+    def get_circuit_wait_time(self) -> float:
+        return self.circuit_breaker.get_wait_time()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats)
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.stats = {stat: 0 for stat in self.stats}
+
+    def log_stats(self) -> None:
+        stats: Dict[str, int] = self.get_stats()
+        logging.info(f'Requests: {stats[self.REQUESTS]} sent, {stats[self.RETRIES]} retried, '
+                     f'{stats[self.FAILURES]} failed, circuit opened {stats[self.CIRCUIT_OPENINGS]} times')
+
+    @staticmethod
+    def _sleep(delay: float) -> None:
+        # Cut short when the refresh is cancelled, which is also checked before every attempt
+        token: Optional[CancellationToken] = CancellationToken.get_current()
+        if token is None:
+            sleep(delay)
+            return
+        if delay > 0:
+            wait([token.cancelled], timeout=delay)
+        token.raise_if_cancelled()
+
+    def _is_transient_failure(self, status: int, headers: Optional[Mapping[str, str]]) -> bool:
+        # A 403 without Retry-After is a permission error or the primary rate limit, retrying would not help
+        return status in self._SERVER_ERROR_STATUSES or status == http.HTTPStatus.TOO_MANY_REQUESTS or \
+            (status in self._SECONDARY_RATE_LIMIT_STATUSES and headers is not None and 'Retry-After' in headers)
+
+    def _get_retry_delay(self, attempt: int, headers: Optional[Mapping[str, str]]) -> Optional[float]:
+        if attempt >= self.max_retries:
+            return None
+        retry_after: Optional[str] = headers.get('Retry-After') if headers is not None else None
+        if retry_after is not None and retry_after.isdigit():
+            # Longer waits are left to the caller, which reports the refresh as rate limited
+            return float(retry_after) if int(retry_after) <= self.max_retry_after else None
+        # Full jitter, concurrent workers failing together do not retry together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _increment(self, stat: str) -> None:
+        with self.lock:
+            self.stats[stat] += 1
+
+
+class ResilientHTTPAdapter(HTTPAdapter):
+    def __init__(self, request_guard: RequestGuard, **kwargs):
+        super().__init__(**kwargs)
+        self.request_guard = request_guard
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        return self.request_guard.send(partial(super().send, request, **kwargs))
@@ -0,0 +1,214 @@
+import http
+import logging
+import re
+import threading
+from time import time
+from typing import Dict, Optional, List, Any, Mapping, Tuple, Set
+from urllib.parse import urlparse
+
+import requests
+from requests.auth import AuthBase
+
+from github_pr_monitor.constants.api_constants import GITHUB_HTTP_TIMEOUT
+from github_pr_monitor.network.http_cache import CachingHTTPAdapter
+
+
+class AccountUsage:
+    # The primary rate limit is per account, so the tokens of one account share a single budget
+    def __init__(self, login: str):
+        self.login = login
+        self.tokens: List[str] = []
+        self.revoked_tokens: Set[str] = set()
+        self.remaining: Optional[int] = None
+        self.limit: Optional[int] = None
+        self.reset_at: float = 0
+        self.requests = 0
+        self.pending_requests = 0
+        # Rate limited accounts are sidelined until their window resets
+        self.sidelined_until: float = 0
+
+    def get_token(self) -> Optional[str]:
+        # Rotating tokens of the same account would not raise its budget, the others are only spares
+        return next((token for token in self.tokens if token not in self.revoked_tokens), None)
+
+    def is_available(self, now: float) -> bool:
+        return self.get_token() is not None and self.sidelined_until <= now
+
+    def get_estimated_remaining(self, now: float, default_remaining: int) -> int:
+        # Requests in flight are not accounted for by the last rate limit headers yet
+        remaining: int = default_remaining if self.remaining is None or self.reset_at <= now else self.remaining
+        return remaining - self.pending_requests
+
+
+class TokenPool:
+    _UNAUTHORIZED: int = http.HTTPStatus.UNAUTHORIZED
+    _RATE_LIMIT_STATUSES: Tuple[int, int] = (http.HTTPStatus.FORBIDDEN, http.HTTPStatus.TOO_MANY_REQUESTS)
+    _DEFAULT_SIDELINE_DURATION: int = 60
+    # Hourly quota of an account, assumed until a response tells otherwise
+    _DEFAULT_REMAINING: int = 5000
+    # Only the core budget is spread, search and GraphQL answers report other budgets
+    _CORE_RESOURCE: str = 'core'
+    # Only requests on a repository are spread, the others (`/user*`, `/notifications`, `@me` searches, GraphQL
+    # `viewer`) answer for the account of the token and keep the main one
+    _ROTATED_PATH: re.Pattern = re.compile(r'/repos/[^/]+/[^/]+(/|$)')
+
+    def __init__(self):
+        self.accounts: Dict[str, AccountUsage] = {}
+        self.token_accounts: Dict[str, AccountUsage] = {}
+        self.lock = threading.Lock()
+
+    def set_tokens(self, tokens: List[str], api_url: str) -> None:
+        # Tokens are grouped by the account they authenticate, which costs one request per token
+        accounts: Dict[str, AccountUsage] = {}
+        for token in dict.fromkeys(token for token in tokens if token):
+            login: Optional[str] = self._get_login(token, api_url)
+            if login is not None:
+                accounts.setdefault(login, self.accounts.get(login) or AccountUsage(login))
+                if token not in accounts[login].tokens:
+                    accounts[login].tokens.append(token)
+        for account in accounts.values():
+            account.tokens = [token for token in account.tokens if token in tokens]
+        with self.lock:
+            # Spreading requests is pointless within a single account
+            self.accounts = accounts if len(accounts) > 1 else {}
+            self.token_accounts = {token: account for account in self.accounts.values() for token in account.tokens}
+
+    def is_enabled(self) -> bool:
+        return len(self.accounts) > 0
+
+    def is_rotated(self, url: str) -> bool:
+        return self.is_enabled() and self._ROTATED_PATH.search(urlparse(url).path) is not None
+
+    def acquire(self, default_token: Optional[str]) -> Optional[str]:
+        # The account with the largest remaining quota wins, the token of the connection belongs to one of them
+        if not self.accounts:
+            return default_token
+        now: float = time()
+        with self.lock:
+            available_accounts: List[AccountUsage] = [account for account in self.accounts.values()
+                                                      if account.is_available(now)]
+            if not available_accounts:
+                return default_token
+            account: AccountUsage = max(available_accounts, key=lambda account_usage: (
+                account_usage.get_estimated_remaining(now, self._DEFAULT_REMAINING), -account_usage.requests))
+            account.requests += 1
+            account.pending_requests += 1
+            return account.get_token()
+
+    def observe(self, token: str, status: int, headers: Mapping[str, str]) -> bool:
+        # Returns whether the token was taken out of rotation by this answer
+        with self.lock:
+            account: Optional[AccountUsage] = self.token_accounts.get(token)
+            if account is None:
+                return False
+            account.pending_requests = max(account.pending_requests - 1, 0)
+            if 'X-RateLimit-Remaining' in headers and \
+                    headers.get('X-RateLimit-Resource', self._CORE_RESOURCE) == self._CORE_RESOURCE:
+                account.remaining = int(headers['X-RateLimit-Remaining'])
+                account.limit = int(headers.get('X-RateLimit-Limit', 0))
+                account.reset_at = float(headers.get('X-RateLimit-Reset', 0))
+            if status == self._UNAUTHORIZED:
+                account.revoked_tokens.add(token)
+                logging.warning(f'Token {self._mask(token)} of {account.login} was rejected, it is removed from the '
+                                f'rotation')
+                return True
+            retry_after: Optional[str] = headers.get('Retry-After')
+            if status in self._RATE_LIMIT_STATUSES and (account.remaining == 0 or retry_after is not None):
+                account.sidelined_until = time() + int(retry_after) \
+                    if retry_after is not None and retry_after.isdigit() \
+                    else max(account.reset_at, time() + self._DEFAULT_SIDELINE_DURATION)
+                logging.warning(f'Account {account.login} is rate limited, its tokens are sidelined until '
+                                f'{account.sidelined_until:.0f}')
+                return True
+            return False
+
+    def has_available_token(self) -> bool:
+        # A revoked token may have a spare in its account, a rate limited account has none
+        now: float = time()
+        with self.lock:
+            return any(account.is_available(now) for account in self.accounts.values())
+
+    def get_estimated_remaining(self) -> Optional[int]:
+        # Core budget left across the accounts in rotation, None when there is no rotation
+        if not self.accounts:
+            return None
+        now: float = time()
+        with self.lock:
+            return sum(max(account.get_estimated_remaining(now, self._DEFAULT_REMAINING), 0)
+                       for account in self.accounts.values() if account.is_available(now))
+
+    def reset_usage(self) -> None:
+        with self.lock:
+            for account in self.accounts.values():
+                account.requests = 0
+                account.pending_requests = 0
+
+    def log_usage(self) -> None:
+        if not self.accounts:
+            return
+        now: float = time()
+        with self.lock:
+            for account in self.accounts.values():
+                state: str = 'revoked' if account.get_token() is None \
+                    else 'sidelined' if not account.is_available(now) else 'active'
+                logging.info(f'Account {account.login} ({len(account.tokens)} tokens): {account.requests} requests, '
+                             f'{account.remaining if account.remaining is not None else "?"}/'
+                             f'{account.limit if account.limit is not None else "?"} remaining, {state}')
+
+    @staticmethod
+    def _get_login(token: str, api_url: str) -> Optional[str]:
+        # Not sent through the shared sessions, whose auth is this pool
+        try:
+            response: requests.Response = requests.get(f'{api_url}/user', headers={'Authorization': f'token {token}'},
+                                                       timeout=GITHUB_HTTP_TIMEOUT)
+            response.raise_for_status()
+            return response.json()['login']
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            logging.warning(f'Token {TokenPool._mask(token)} is left out of the rotation, its account could not be '
+                            f'resolved: {e}')
+            return None
+
+    @staticmethod
+    def _mask(token: str) -> str:
+        return f'…{token[-4:]}'
+
+
+class TokenPoolAuth(AuthBase):
+    # Swaps the token of each request, PyGithub and the GraphQL fetcher keep authenticating with their own token
+    _AUTHORIZATION_HEADER: str = 'Authorization'
+
+    def __init__(self, token_pool: TokenPool, session: requests.Session):
+        self.token_pool = token_pool
+        self.session = session
+
+    def __call__(self, request: requests.PreparedRequest) -> requests.PreparedRequest:
+        if self._AUTHORIZATION_HEADER not in request.headers or not self.token_pool.is_rotated(request.url):
+            return request
+        scheme, _, default_token = request.headers[self._AUTHORIZATION_HEADER].partition(' ')
+        token: Optional[str] = self.token_pool.acquire(default_token)
+        request.headers[self._AUTHORIZATION_HEADER] = f'{scheme} {token}'
+        return request
+
+    def on_response(self, response: requests.Response, **kwargs: Any) -> requests.Response:
+        # Last hook of the session, the others have already seen this response
+        if self._AUTHORIZATION_HEADER not in response.request.headers or \
+                not self.token_pool.is_rotated(response.request.url):
+            return response
+        scheme, _, token = response.request.headers[self._AUTHORIZATION_HEADER].partition(' ')
+        if not self.token_pool.observe(token, response.status_code, response.headers) or \
+                not self.token_pool.has_available_token():
+            return response
+        token = self.token_pool.acquire(None)
+        if token is None:
+            return response
+        retried_request: requests.PreparedRequest = response.request.copy()
+        retried_request.headers[self._AUTHORIZATION_HEADER] = f'{scheme} {token}'
+        # Added by the cache adapter on the way out, left in they would make it bypass its cache
+        for header in CachingHTTPAdapter.CONDITIONAL_HEADERS:
+            retried_request.headers.pop(header, None)
+        response.close()
+        # Sent through the session so every hook sees the retried response, this one retries again if needed. Each
+        # retry takes one token out of rotation, so this ends once every token was tried
+        retried_response: requests.Response = self.session.send(retried_request, **kwargs)
+        retried_response.history.insert(0, response)
+        return retried_response
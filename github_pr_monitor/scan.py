@@ -0,0 +1,212 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import List, Dict, Any, Optional, TextIO, Set
+
+from github_pr_monitor.app.repository_info_fetcher import RepositoryInfoFetcher
+from github_pr_monitor.config import RATE_LIMIT_TRACKER, TOKEN_POOL, REQUEST_GUARD, TRACE_RECORDER, METRICS_REGISTRY
+from github_pr_monitor.constants.api_constants import GITHUB_API_URL
+from github_pr_monitor.constants.app_setting_constants import FETCH_BACKENDS, DISCOVERY_MODES, \
+    DEFAULT_FETCH_BACKEND, DEFAULT_DISCOVERY_MODE
+from github_pr_monitor.constants.metrics_constants import METRICS_HOST
+from github_pr_monitor.constants.thread_constants import APPLICATION_MAX_THREADS
+from github_pr_monitor.models.repository_info import RepositoryInfo
+from github_pr_monitor.network.metrics_server import MetricsServer
+
+JSON_OUTPUT_FORMAT: str = 'json'
+NDJSON_OUTPUT_FORMAT: str = 'ndjson'
+OUTPUT_FORMATS: List[str] = [JSON_OUTPUT_FORMAT, NDJSON_OUTPUT_FORMAT]
+GITHUB_TOKEN_ENVIRONMENT_VARIABLES: List[str] = ['GITHUB_TOKEN', 'GH_TOKEN']
+# Comma separated tokens, requests are spread across their accounts by remaining quota
+GITHUB_ADDITIONAL_TOKENS_ENVIRONMENT_VARIABLE: str = 'GITHUB_TOKENS'
+
+
+# Headless entry point: runs the fetch engine without the menu bar app, so it must never import rumps
+class RepositoryScanner:
+    def __init__(self, fetcher: RepositoryInfoFetcher, output: TextIO, output_format: str, include_empty: bool,
+                 show_progress: bool):
+        self.fetcher = fetcher
+        self.output = output
+        self.output_format = output_format
+        self.include_empty = include_empty
+        self.show_progress = show_progress
+        self.records: List[Dict[str, Any]] = []
+        # Repositories matched by several filters are only reported once
+        self.reported_urls: Set[str] = set()
+        self.output_lock = threading.Lock()
+        self.filter_label: str = ''
+        # Request counters are reset by each refresh, they are summed over all filters
+        self.request_stats: Counter = Counter()
+
+    def scan(self, github_pat: str, repo_search_filters: List[Optional[str]]) -> None:
+        for repo_search_filter in repo_search_filters:
+            self.filter_label = repo_search_filter or '*'
+            start: float = time.perf_counter()
+            TRACE_RECORDER.start_trace()
+            try:
+                repositories_info: List[RepositoryInfo] = self.fetcher.get_repositories_info(
+                    github_pat, repo_search_filter, self._on_repository_info)
+            finally:
+                # Also written for a failed refresh, that is when it is the most useful
+                TRACE_RECORDER.write_trace()
+            self.request_stats.update(REQUEST_GUARD.get_stats())
+            # Backends only report repositories they fetched, anything else still has to be written
+            for repository_info in repositories_info:
+                self._report(repository_info)
+            logging.info(f'Filter "{self.filter_label}": {len(repositories_info)} repositories '
+                         f'in {time.perf_counter() - start:.2f}s')
+        if self.output_format == JSON_OUTPUT_FORMAT:
+            json.dump(sorted(self.records, key=lambda record: record['url']), self.output, ensure_ascii=False,
+                      indent=2)
+            self.output.write('\n')
+        self.output.flush()
+
+    def _on_repository_info(self, repository_info: RepositoryInfo, completed: int, total: int) -> None:
+        if self.show_progress:
+            print(f'[{self.filter_label}] {completed}/{total} {repository_info.status} {repository_info.name} '
+                  f'({len(repository_info.pull_requests_info)} PRs)', file=sys.stderr)
+        self._report(repository_info)
+
+    def _report(self, repository_info: RepositoryInfo) -> None:
+        if not self.include_empty and not repository_info.pull_requests_info:
+            return
+        with self.output_lock:
+            if repository_info.url in self.reported_urls:
+                return
+            self.reported_urls.add(repository_info.url)
+            record: Dict[str, Any] = self._to_record(repository_info)
+            if self.output_format == NDJSON_OUTPUT_FORMAT:
+                # Streamed as each repository completes, so consumers can start before the scan ends
+                self.output.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.records.append(record)
+
+    @staticmethod
+    def _to_record(repository_info: RepositoryInfo) -> Dict[str, Any]:
+        record: Dict[str, Any] = repository_info.to_dict()
+        record['status'] = repository_info.status
+        record['is_urgent'] = repository_info.is_urgent
+        for pull_request_record, pull_request_info in zip(record['pull_requests_info'],
+                                                           repository_info.pull_requests_info):
+            pull_request_record['status'] = pull_request_info.status
+        return record
+
+    def get_pull_requests_count(self) -> int:
+        return sum(len(record['pull_requests_info']) for record in self.records)
+
+
+def get_github_pat() -> Optional[str]:
+    for variable in GITHUB_TOKEN_ENVIRONMENT_VARIABLES:
+        if os.environ.get(variable):
+            return os.environ[variable]
+    # The keychain is only a fallback, servers and CI jobs usually have no keyring backend
+    try:
+        from github_pr_monitor.security.keyring_manager import KeyringManager
+        return KeyringManager().get_github_pat()
+    except Exception as e:
+        logging.warning(f'Failed to read the token from the keyring: {e}')
+        return None
+
+
+def get_additional_github_pats() -> List[str]:
+    tokens: Optional[str] = os.environ.get(GITHUB_ADDITIONAL_TOKENS_ENVIRONMENT_VARIABLE)
+    if tokens is not None:
+        return [token.strip() for token in tokens.split(',') if token.strip()]
+    try:
+        from github_pr_monitor.security.keyring_manager import KeyringManager
+        return KeyringManager().get_additional_github_pats()
+    except Exception as e:
+        logging.warning(f'Failed to read the additional tokens from the keyring: {e}')
+        return []
+
+
+def print_summary(scanner: RepositoryScanner, wall_time: float) -> None:
+    repositories: int = len(scanner.records)
+    charged_requests: int = sum(RATE_LIMIT_TRACKER.get_charged_requests().values())
+    request_stats: Counter = scanner.request_stats
+    print(f'Scanned {repositories} repositories with {scanner.get_pull_requests_count()} open PRs '
+          f'in {wall_time:.2f}s ({repositories / wall_time if wall_time > 0 else 0:.1f} repositories/s), '
+          f'{charged_requests} requests charged, {request_stats[REQUEST_GUARD.RETRIES]} retried, '
+          f'{request_stats[REQUEST_GUARD.FAILURES]} failed', file=sys.stderr)
+    rate_limit_status = RATE_LIMIT_TRACKER.get_most_constrained_status()
+    if rate_limit_status is not None:
+        print(f'Rate limit: {rate_limit_status.remaining}/{rate_limit_status.limit} remaining '
+              f'({rate_limit_status.resource})', file=sys.stderr)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scan GitHub PRs without the menu bar app and write them as JSON.")
+    parser.add_argument("-r", "--repo_search_filter", help="Keyword to filter repositories, can be repeated",
+                        action="append", type=str)
+    parser.add_argument("--owner", help="Only report repositories of this user or organization, can be repeated",
+                        action="append", default=[], type=str)
+    parser.add_argument("-b", "--backend", help="API used to fetch pull requests", choices=FETCH_BACKENDS,
+                        default=DEFAULT_FETCH_BACKEND, type=str)
+    parser.add_argument("-d", "--discovery", help="How repositories with open PRs are found", choices=DISCOVERY_MODES,
+                        default=DEFAULT_DISCOVERY_MODE, type=str)
+    parser.add_argument("-j", "--concurrency", help="Maximum concurrent requests", default=APPLICATION_MAX_THREADS,
+                        type=int)
+    parser.add_argument("-f", "--format", help="Output format", choices=OUTPUT_FORMATS, default=JSON_OUTPUT_FORMAT,
+                        type=str)
+    parser.add_argument("-o", "--output", help="Output file, standard output by default", type=str)
+    parser.add_argument("--include_empty", help="Also report repositories without open PRs", action="store_true")
+    parser.add_argument("--api_url", help="GitHub API URL", default=GITHUB_API_URL, type=str)
+    parser.add_argument("-t", "--trace", help="Directory where a Chrome trace of each refresh is written", type=str)
+    parser.add_argument("-m", "--metrics_port", help="Serve Prometheus metrics on this local port while scanning",
+                        type=int)
+    parser.add_argument("-q", "--quiet", help="Do not report progress on standard error", action="store_true")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+
+def main() -> int:
+    args: argparse.Namespace = parse_arguments()
+    # Logs go to standard error with the progress, standard output only carries the JSON
+    logging.getLogger().setLevel(logging.WARNING if args.quiet else logging.INFO)
+    github_pat: Optional[str] = get_github_pat()
+    if not github_pat:
+        logging.error(f'No GitHub token found, set {GITHUB_TOKEN_ENVIRONMENT_VARIABLES[0]} or store one with the app')
+        return 1
+
+    TOKEN_POOL.set_tokens([github_pat] + get_additional_github_pats(), args.api_url)
+    if args.trace:
+        TRACE_RECORDER.enable(args.trace)
+    metrics_server: Optional[MetricsServer] = None
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(METRICS_REGISTRY, METRICS_HOST, args.metrics_port)
+        metrics_server.start()
+    fetcher = RepositoryInfoFetcher()
+    fetcher.set_base_url(args.api_url)
+    fetcher.set_max_concurrency(args.concurrency)
+    fetcher.set_discovery_mode(args.discovery)
+    fetcher.set_fetch_backend(args.backend)
+    # Applied by the discovery, repositories of other owners are never listed nor enriched
+    fetcher.set_owners(args.owner)
+    output: TextIO = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    scanner = RepositoryScanner(fetcher, output, args.format, args.include_empty, not args.quiet)
+    start: float = time.perf_counter()
+    try:
+        scanner.scan(github_pat, args.repo_search_filter or [None])
+    except Exception as e:
+        logging.error(f'Scan failed: {e}')
+        return 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if fetcher.async_fetcher is not None:
+            fetcher.async_fetcher.close()
+        fetcher.thread_manager.shutdown()
+        if metrics_server is not None:
+            metrics_server.stop()
+    print_summary(scanner, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
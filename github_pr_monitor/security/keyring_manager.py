@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 import keyring
 
 
@@ -5,9 +7,12 @@ class KeyringManager:
 
     _GITHUB_SERVICE_NAME: str = 'github'
     _TOKEN_KEY: str = 'token'
+    _ADDITIONAL_TOKENS_KEY: str = 'additional_tokens'
+    _TOKENS_SEPARATOR: str = ','
 
     def __init__(self):
         self._github_pat = self._load_github_pat()
+        self._additional_github_pats = self._load_additional_github_pats()
 
     def set_github_pat(self, token: str) -> None:
         keyring.set_password(self._GITHUB_SERVICE_NAME, self._TOKEN_KEY, token if token != '' else None)
@@ -16,7 +21,19 @@ class KeyringManager:
     def get_github_pat(self) -> str:
         return self._github_pat
 
+    def set_additional_github_pats(self, tokens: List[str]) -> None:
+        tokens = [token for token in tokens if token]
+        keyring.set_password(self._GITHUB_SERVICE_NAME, self._ADDITIONAL_TOKENS_KEY,
+                             self._TOKENS_SEPARATOR.join(tokens))
+        self._additional_github_pats = tokens
+
+    def get_additional_github_pats(self) -> List[str]:
+        return self._additional_github_pats
+
     def _load_github_pat(self) -> str:
         token = keyring.get_password(self._GITHUB_SERVICE_NAME, self._TOKEN_KEY)
         return token if token != '' else None
 
+    def _load_additional_github_pats(self) -> List[str]:
+        tokens: Optional[str] = keyring.get_password(self._GITHUB_SERVICE_NAME, self._ADDITIONAL_TOKENS_KEY)
+        return [token.strip() for token in tokens.split(self._TOKENS_SEPARATOR) if token.strip()] if tokens else []
@@ -0,0 +1,174 @@
+import json
+import os
+from typing import Dict, Any, Tuple, Optional, List
+
+import pytest
+from github import UnknownObjectException
+from github.Requester import Requester
+
+from github_pr_monitor.app.github_graphql_fetcher import GithubGraphQLFetcher
+from github_pr_monitor.app.repository_info_fetcher import RepositoryInfoFetcher
+from github_pr_monitor.constants.api_constants import GITHUB_API_URL
+from github_pr_monitor.constants.app_setting_constants import REST_FETCH_BACKEND, GRAPHQL_FETCH_BACKEND, \
+    REPOSITORIES_DISCOVERY_MODE
+from github_pr_monitor.constants.emojis import PR_DRAFT_EMOJI, PR_OK_EMOJI, PR_URGENT_EMOJI, PR_IMPORTANT_EMOJI, \
+    PR_COMMENT_EMOJI
+from github_pr_monitor.models.repository_info import RepositoryInfo
+
+FIXTURES_DIR: str = os.path.join(os.path.dirname(__file__), 'fixtures')
+GITHUB_PAT: str = 'recorded-token'
+
+# Checked on top of the equivalence, two backends agreeing on a wrong status would go unnoticed otherwise
+EXPECTED_STATUSES: Dict[Tuple[str, int], str] = {
+    ('widgets', 1): PR_DRAFT_EMOJI,
+    ('widgets', 2): PR_COMMENT_EMOJI,
+    ('widgets', 3): PR_OK_EMOJI,
+    ('widgets', 4): PR_URGENT_EMOJI,
+    ('widgets', 5): PR_URGENT_EMOJI,
+    ('widgets', 6): PR_IMPORTANT_EMOJI,
+    ('widgets', 7): PR_URGENT_EMOJI,
+    ('widgets', 8): PR_IMPORTANT_EMOJI,
+    ('widgets', 9): PR_URGENT_EMOJI,
+    ('widgets', 10): PR_OK_EMOJI,
+    ('widgets', 11): PR_OK_EMOJI,
+    ('gadgets', 1): PR_URGENT_EMOJI,
+    ('gadgets', 2): PR_DRAFT_EMOJI,
+}
+
+
+def load_fixture(name: str) -> Dict[str, Any]:
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as fixture:
+        return json.load(fixture)
+
+
+def get_repositories_info(fetch_backend: str) -> List[RepositoryInfo]:
+    fetcher = RepositoryInfoFetcher()
+    # The fetcher is a singleton, nothing from a previous test may be reused
+    fetcher.invalidate_cache()
+    fetcher.pull_requests_snapshot = {}
+    fetcher.set_fetch_backend(fetch_backend)
+    fetcher.set_discovery_mode(REPOSITORIES_DISCOVERY_MODE)
+    return fetcher.get_repositories_info(GITHUB_PAT, None)
+
+
+def get_statuses(repositories_info: List[RepositoryInfo]) -> Dict[Tuple[str, int], str]:
+    return {(repository_info.name, pull_request_info.id): pull_request_info.status
+            for repository_info in repositories_info for pull_request_info in repository_info.pull_requests_info}
+
+
+@pytest.fixture
+def rest_recording(monkeypatch: pytest.MonkeyPatch) -> Dict[str, Any]:
+    # Returned so a test can record more answers
+    responses: Dict[str, Any] = load_fixture('rest_recording.json')['responses']
+
+    def request_json_and_check(_requester: Requester, verb: str, url: str, *args: Any, **kwargs: Any) \
+            -> Tuple[Dict[str, Any], Any]:
+        path: str = url[len(GITHUB_API_URL):] if url.startswith(GITHUB_API_URL) else url
+        payload: Optional[Any] = responses.get(path, responses.get(f'{GITHUB_API_URL}{path}'))
+        if verb != 'GET' or payload is None:
+            # Unprotected branches answer 404 on their required reviews
+            raise UnknownObjectException(404, {'message': 'Not Found'}, {})
+        return {}, json.loads(json.dumps(payload))
+
+    monkeypatch.setattr(Requester, 'requestJsonAndCheck', request_json_and_check)
+    return responses
+
+
+@pytest.fixture
+def requested_urls(rest_recording: Dict[str, Any], monkeypatch: pytest.MonkeyPatch) -> List[str]:
+    # URLs requested from the replayed recording, in order
+    urls: List[str] = []
+    replay_request = Requester.requestJsonAndCheck
+
+    def request_json_and_check(requester: Requester, verb: str, url: str, *args: Any, **kwargs: Any) \
+            -> Tuple[Dict[str, Any], Any]:
+        urls.append(url)
+        return replay_request(requester, verb, url, *args, **kwargs)
+
+    monkeypatch.setattr(Requester, 'requestJsonAndCheck', request_json_and_check)
+    return urls
+
+
+@pytest.fixture
+def graphql_recording(monkeypatch: pytest.MonkeyPatch) -> None:
+    recording: Dict[str, Any] = load_fixture('graphql_recording.json')
+
+    def execute(_fetcher: GithubGraphQLFetcher, query: str, /, **variables: Any) -> Dict[str, Any]:
+        if query == GithubGraphQLFetcher._REPOSITORIES_QUERY:
+            return recording['repositories']
+        if query == GithubGraphQLFetcher._REPOSITORIES_PULL_REQUESTS_QUERY:
+            return {'nodes': [repository for repository in recording['repositories_pull_requests']['nodes']
+                              if repository['id'] in variables['ids']]}
+        if query == GithubGraphQLFetcher._PULL_REQUEST_REVIEWS_PAGE_QUERY:
+            return recording['pull_request_reviews'][variables['id']]
+        raise AssertionError(f'Query not recorded: {query}')
+
+    monkeypatch.setattr(GithubGraphQLFetcher, '_execute', execute)
+
+
+def test_rest_statuses_match_recording(rest_recording: Dict[str, Any]) -> None:
+    assert get_statuses(get_repositories_info(REST_FETCH_BACKEND)) == EXPECTED_STATUSES
+
+
+def test_graphql_statuses_match_recording(graphql_recording: None) -> None:
+    assert get_statuses(get_repositories_info(GRAPHQL_FETCH_BACKEND)) == EXPECTED_STATUSES
+
+
+def test_rest_and_graphql_backends_are_equivalent(rest_recording: Dict[str, Any], graphql_recording: None) -> None:
+    rest_repositories_info: List[RepositoryInfo] = get_repositories_info(REST_FETCH_BACKEND)
+    graphql_repositories_info: List[RepositoryInfo] = get_repositories_info(GRAPHQL_FETCH_BACKEND)
+
+    assert get_statuses(rest_repositories_info) == get_statuses(graphql_repositories_info)
+    assert [(repository_info.name, repository_info.status, repository_info.is_urgent)
+            for repository_info in rest_repositories_info] == \
+           [(repository_info.name, repository_info.status, repository_info.is_urgent)
+            for repository_info in graphql_repositories_info]
+    # The counts shown next to each PR title come from the same reviews
+    assert [pull_request_info.format_pr_title() for repository_info in rest_repositories_info
+            for pull_request_info in repository_info.pull_requests_info] == \
+           [pull_request_info.format_pr_title() for repository_info in graphql_repositories_info
+            for pull_request_info in repository_info.pull_requests_info]
+
+
+def test_change_feed_only_refreshes_discovered_repositories(rest_recording: Dict[str, Any],
+                                                           requested_urls: List[str]) -> None:
+    # The first refresh is a full sweep, the notifications that follow point at a discovered repository and at
+    # one the user only watches
+    rest_recording['/notifications'] = []
+    fetcher = RepositoryInfoFetcher()
+    fetcher.invalidate_cache()
+    fetcher.set_fetch_backend(REST_FETCH_BACKEND)
+    fetcher.set_discovery_mode(REPOSITORIES_DISCOVERY_MODE)
+    fetcher.set_change_feed_enabled(True)
+    first_repositories_info: List[RepositoryInfo] = fetcher.get_repositories_info(GITHUB_PAT, None)
+    widgets: Dict[str, Any] = next(repository for repository in rest_recording['/user/repos']
+                                   if repository['name'] == 'widgets')
+    watched: Dict[str, Any] = {**widgets, 'name': 'watched', 'full_name': 'someone/watched',
+                               'url': f'{GITHUB_API_URL}/repos/someone/watched'}
+    rest_recording['/notifications'] = [{'updated_at': '2026-10-18T00:00:00Z', 'repository': repository}
+                                        for repository in (widgets, watched)]
+    # Polled again right away, not after the poll interval
+    fetcher.notification_feed.last_poll_time = None
+    requested_urls.clear()
+
+    second_repositories_info: List[RepositoryInfo] = fetcher.get_repositories_info(GITHUB_PAT, None)
+
+    assert [repository_info.name for repository_info in second_repositories_info] == \
+           [repository_info.name for repository_info in first_repositories_info]
+    assert any('/repos/octo-org/widgets/' in url for url in requested_urls)
+    assert not any('/repos/someone/watched' in url for url in requested_urls)
+
+
+def test_repositories_of_other_owners_are_not_enriched(rest_recording: Dict[str, Any], requested_urls: List[str],
+                                                       monkeypatch: pytest.MonkeyPatch) -> None:
+    fetcher = RepositoryInfoFetcher()
+    # Restored after the test, the fetcher is a singleton
+    monkeypatch.setattr(fetcher, 'owners', set())
+    fetcher.set_owners(['Octo-Org'])
+    selected_repositories_info: List[RepositoryInfo] = get_repositories_info(REST_FETCH_BACKEND)
+    fetcher.set_owners(['hubot'])
+    requested_urls.clear()
+
+    assert [repository_info.name for repository_info in selected_repositories_info] == ['gadgets', 'widgets']
+    assert get_repositories_info(REST_FETCH_BACKEND) == []
+    assert not any('/repos/' in url for url in requested_urls)
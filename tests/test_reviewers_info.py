@@ -0,0 +1,137 @@
+import itertools
+import json
+import os
+from typing import Dict, Any, List, Tuple, Optional, Iterator
+
+import pytest
+
+from github_pr_monitor.constants.api_constants import GITHUB_API_URL
+from github_pr_monitor.constants.app_setting_constants import PR_PRIORITY_ORDER, PR_REPO_STATUS_MAPPING
+from github_pr_monitor.constants.emojis import PR_URGENT_EMOJI, PR_COMMENT_EMOJI
+from github_pr_monitor.models.branch_protection_info import BranchProtectionInfo
+from github_pr_monitor.models.pull_request_info import PullRequestInfo
+from github_pr_monitor.models.repository_info import RepositoryInfo
+from github_pr_monitor.models.reviewers_info import ReviewersInfo
+
+FIXTURES_DIR: str = os.path.join(os.path.dirname(__file__), 'fixtures')
+APPROVED: str = 'APPROVED'
+PENDING: str = 'PENDING'
+CHANGES_REQUESTED: str = 'CHANGES_REQUESTED'
+
+
+def load_recorded_pull_requests() -> List[Dict[str, Any]]:
+    # Each recorded PR with its reviews and the required reviews of its base branch, None when not protected
+    with open(os.path.join(FIXTURES_DIR, 'rest_recording.json'), encoding='utf-8') as fixture:
+        responses: Dict[str, Any] = json.load(fixture)['responses']
+    pull_requests: List[Dict[str, Any]] = []
+    for url, payload in responses.items():
+        if not url.startswith(GITHUB_API_URL) or not url.endswith('/pulls'):
+            continue
+        for pull_request in payload:
+            base: Dict[str, Any] = pull_request['base']
+            protection_url: str = f'{base["repo"]["url"]}/branches/{base["ref"].replace("/", "%2F")}' \
+                                  f'/protection/required_pull_request_reviews'
+            pull_requests.append({'pull_request': pull_request,
+                                  'reviews': responses[f'{pull_request["url"]}/reviews'],
+                                  'required_reviews': responses.get(protection_url)})
+    return pull_requests
+
+
+def get_participants(recorded_pull_request: Dict[str, Any]) -> List[str]:
+    pull_request: Dict[str, Any] = recorded_pull_request['pull_request']
+    required_reviews: Dict[str, Any] = recorded_pull_request['required_reviews'] or {}
+    return sorted({pull_request['user']['login'], 'nobody'} |
+                  {user['login'] for user in pull_request['requested_reviewers']} |
+                  {review['user']['login'] for review in recorded_pull_request['reviews']} |
+                  {user['login'] for user in (required_reviews.get('dismissal_restrictions') or {}).get('users', [])})
+
+
+def build_reviewers_info(recorded_pull_request: Dict[str, Any], current_user: str) -> ReviewersInfo:
+    pull_request: Dict[str, Any] = recorded_pull_request['pull_request']
+    required_reviews: Optional[Dict[str, Any]] = recorded_pull_request['required_reviews']
+    branch_protection_info: Optional[BranchProtectionInfo] = None
+    if required_reviews is not None:
+        branch_protection_info = BranchProtectionInfo(
+            dismissal_users=[user['login'] for user in required_reviews['dismissal_restrictions']['users']],
+            required_approving_review_count=required_reviews['required_approving_review_count'])
+    return ReviewersInfo(author=pull_request['user']['login'],
+                         maintainer_can_modify=pull_request['maintainer_can_modify'],
+                         requested_reviewers=[user['login'] for user in pull_request['requested_reviewers']],
+                         reviews=[(review['user']['login'], review['state'])
+                                  for review in recorded_pull_request['reviews']],
+                         branch_protection_info=branch_protection_info,
+                         current_user=current_user)
+
+
+def get_reference_facts(reviewers_info: ReviewersInfo) -> Dict[str, Any]:
+    # The computation `ReviewersInfo` replaced, one pass over the reviews per fact
+    review_statuses: Dict[str, str] = {login: state for login, state in reviewers_info.reviews}
+    current_user: str = reviewers_info.current_user
+    return {'has_current_user_reviewed': any(login == current_user
+                                             for login, state in reviewers_info.reviews if state != PENDING),
+            'has_current_user_requested': any(login == current_user and state == CHANGES_REQUESTED
+                                              for login, state in reviewers_info.reviews),
+            'number_of_reviews': len(review_statuses),
+            'number_of_completed_reviews': sum(state == APPROVED for state in review_statuses.values())}
+
+
+def get_reference_repository_status(pull_requests_info: List[PullRequestInfo]) -> Tuple[str, bool]:
+    current_priority: str = PR_PRIORITY_ORDER[-1]
+    is_urgent: bool = False
+    for pr in pull_requests_info:
+        if PR_PRIORITY_ORDER.index(pr.status) < PR_PRIORITY_ORDER.index(current_priority):
+            current_priority = pr.status
+            is_urgent = pr.status in [PR_URGENT_EMOJI, PR_COMMENT_EMOJI]
+    return PR_REPO_STATUS_MAPPING[current_priority], is_urgent
+
+
+def iterate_recorded_cases() -> Iterator[Tuple[Dict[str, Any], str]]:
+    # Every recorded PR, seen by each of its participants and by a user taking no part in it
+    for recorded_pull_request in load_recorded_pull_requests():
+        for current_user in get_participants(recorded_pull_request):
+            yield recorded_pull_request, current_user
+
+
+RECORDED_CASES: List[Tuple[Dict[str, Any], str]] = list(iterate_recorded_cases())
+RECORDED_CASE_IDS: List[str] = [f'{recorded_pull_request["pull_request"]["base"]["repo"]["name"]}'
+                                f'#{recorded_pull_request["pull_request"]["number"]}-{current_user}'
+                                for recorded_pull_request, current_user in RECORDED_CASES]
+
+
+@pytest.mark.parametrize('recorded_pull_request,current_user', RECORDED_CASES, ids=RECORDED_CASE_IDS)
+def test_single_pass_aggregation_matches_reference(recorded_pull_request: Dict[str, Any], current_user: str) -> None:
+    reviewers_info: ReviewersInfo = build_reviewers_info(recorded_pull_request, current_user)
+
+    assert get_reference_facts(reviewers_info) == {name: getattr(reviewers_info, name)
+                                                   for name in get_reference_facts(reviewers_info)}
+
+
+@pytest.mark.parametrize('recorded_pull_request,current_user', RECORDED_CASES, ids=RECORDED_CASE_IDS)
+def test_aggregation_survives_serialization(recorded_pull_request: Dict[str, Any], current_user: str) -> None:
+    reviewers_info: ReviewersInfo = build_reviewers_info(recorded_pull_request, current_user)
+    restored_reviewers_info: ReviewersInfo = ReviewersInfo.from_dict(json.loads(json.dumps(reviewers_info.to_dict())))
+
+    assert get_reference_facts(restored_reviewers_info) == get_reference_facts(reviewers_info)
+    assert restored_reviewers_info.number_of_completed_reviews == reviewers_info.number_of_completed_reviews
+
+
+def test_repository_status_matches_reference() -> None:
+    pull_requests_info: List[PullRequestInfo] = []
+    for recorded_pull_request, current_user in RECORDED_CASES:
+        pull_request: Dict[str, Any] = recorded_pull_request['pull_request']
+        pull_requests_info.append(PullRequestInfo(title=pull_request['title'],
+                                                  url=pull_request['html_url'],
+                                                  id=pull_request['number'],
+                                                  is_draft=pull_request['draft'],
+                                                  reviewers_info=build_reviewers_info(recorded_pull_request,
+                                                                                      current_user),
+                                                  is_author=pull_request['user']['login'] == current_user))
+    # Every ordered subset would be too many, consecutive windows still mix all the recorded statuses
+    for size in range(0, 4):
+        for start in range(len(pull_requests_info) - size + 1):
+            window: List[PullRequestInfo] = pull_requests_info[start:start + size]
+            for ordering in itertools.permutations(window):
+                repository_info = RepositoryInfo(name='widgets', url='https://github.com/octo-org/widgets',
+                                                 pull_requests_info=ordering)
+                assert (repository_info.status, repository_info.is_urgent) == \
+                       get_reference_repository_status(list(ordering))
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Tuple
+
+import pytest
+
+from github_pr_monitor.app.github_api_fetcher import GithubAPIFetcher
+from github_pr_monitor.app.github_graphql_fetcher import GithubGraphQLFetcher
+from github_pr_monitor.constants.api_constants import SEARCH_MAX_RESULTS, OPEN_PULL_REQUESTS_SEARCH_QUERY
+from github_pr_monitor.constants.app_setting_constants import SEARCH_DISCOVERY_MODE
+
+QUERY: str = 'is:pr is:open archived:false org:octo-org'
+CREATED_AT_START: datetime = datetime(2024, 1, 1, tzinfo=timezone.utc)
+PAGE_SIZE: int = 50
+
+
+def test_search_under_the_cap_is_not_split() -> None:
+    assert GithubAPIFetcher.split_search(QUERY, None, SEARCH_MAX_RESULTS) == []
+
+
+def test_search_over_the_cap_is_split_without_gap_nor_overlap() -> None:
+    created_range: Tuple[datetime, datetime] = (CREATED_AT_START, CREATED_AT_START + timedelta(days=10))
+
+    first_half, second_half = GithubAPIFetcher.split_search(QUERY, created_range, SEARCH_MAX_RESULTS + 1)
+
+    assert first_half[0] == created_range[0] and second_half[1] == created_range[1]
+    assert second_half[0] - first_half[1] == timedelta(seconds=1)
+    assert GithubAPIFetcher.get_search_query(QUERY, first_half) == \
+           f'{QUERY} created:2024-01-01T00:00:00Z..2024-01-06T00:00:00Z'
+
+
+def test_narrow_search_over_the_cap_is_used_truncated() -> None:
+    created_range: Tuple[datetime, datetime] = (CREATED_AT_START, CREATED_AT_START + timedelta(seconds=30))
+
+    assert GithubAPIFetcher.split_search(QUERY, created_range, SEARCH_MAX_RESULTS + 1) == []
+
+
+def test_selected_owners_replace_the_search_scopes() -> None:
+    assert GithubAPIFetcher.get_open_pull_requests_search_queries('octocat', ['octo-org'], {'hubot', 'octo-org'}) == \
+           [f'{OPEN_PULL_REQUESTS_SEARCH_QUERY} user:hubot', f'{OPEN_PULL_REQUESTS_SEARCH_QUERY} user:octo-org']
+
+
+def test_graphql_discovery_finds_repositories_past_the_cap(monkeypatch: pytest.MonkeyPatch) -> None:
+    # One PR per hour, each in its own repository, so a truncated search would miss repositories
+    created_dates: List[str] = [f'{CREATED_AT_START + timedelta(hours=index):%Y-%m-%dT%H:%M:%SZ}'
+                                for index in range(SEARCH_MAX_RESULTS * 3)]
+
+    def execute(_fetcher: GithubGraphQLFetcher, query: str, /, **variables: Any) -> Dict[str, Any]:
+        if query == GithubGraphQLFetcher._VIEWER_ORGANIZATIONS_QUERY:
+            return {'viewer': {'login': 'octocat', 'organizations': {'nodes': [{'login': 'octo-org'}]}}}
+        qualifiers: List[str] = variables['query'].split()
+        if 'org:octo-org' not in qualifiers:
+            return {'search': {'issueCount': 0, 'pageInfo': {'hasNextPage': False, 'endCursor': None}, 'nodes': []}}
+        start, end = next((qualifier[len('created:'):].split('..') for qualifier in qualifiers
+                           if qualifier.startswith('created:')), ('', '~'))
+        matches: List[int] = [index for index, created_at in enumerate(created_dates) if start <= created_at <= end]
+        offset: int = int(variables['cursor'] or 0)
+        served: List[int] = matches[:SEARCH_MAX_RESULTS][offset:offset + PAGE_SIZE]
+        has_next_page: bool = offset + PAGE_SIZE < min(len(matches), SEARCH_MAX_RESULTS)
+        return {'search': {'issueCount': len(matches),
+                           'pageInfo': {'hasNextPage': has_next_page, 'endCursor': str(offset + PAGE_SIZE)},
+                           'nodes': [{'repository': {'id': f'R_{index}', 'name': f'repo-{index}'}}
+                                     for index in served]}}
+
+    monkeypatch.setattr(GithubGraphQLFetcher, '_execute', execute)
+    fetcher = GithubGraphQLFetcher()
+    fetcher.set_discovery_mode(SEARCH_DISCOVERY_MODE)
+
+    current_user, repository_ids = fetcher._discover_repository_ids(None)
+
+    assert current_user == 'octocat'
+    assert sorted(repository_ids) == sorted(f'R_{index}' for index in range(len(created_dates)))
@@ -0,0 +1,227 @@
+import json
+import os
+from time import time
+from typing import Dict, Any, List, Tuple, Optional, Callable, Iterator
+from urllib.parse import urlparse
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from github_pr_monitor.app.repository_info_fetcher import RepositoryInfoFetcher
+from github_pr_monitor.config import HTTP_RESPONSE_CACHE, TRACE_RECORDER, METRICS_REGISTRY, TOKEN_POOL
+from github_pr_monitor.constants.api_constants import GITHUB_API_URL
+from github_pr_monitor.constants.app_setting_constants import REST_FETCH_BACKEND, REPOSITORIES_DISCOVERY_MODE
+from github_pr_monitor.models.repository_info import RepositoryInfo
+from github_pr_monitor.network.github_session_manager import GithubSessionManager
+from github_pr_monitor.network.rate_limit_tracker import RateLimitTracker
+from github_pr_monitor.network.request_guard import RequestGuard, CircuitBreaker
+from github_pr_monitor.network.token_pool import TokenPool
+
+FIXTURES_DIR: str = os.path.join(os.path.dirname(__file__), 'fixtures')
+REPOSITORY_URL: str = f'{GITHUB_API_URL}/repos/octo-org/widgets/pulls'
+# Token -> login of its account
+ACCOUNTS: Dict[str, str] = {'octocat-token': 'octocat', 'octocat-spare-token': 'octocat', 'hubot-token': 'hubot'}
+
+# (status, headers, payload) answered to a token for a URL path
+Handler = Callable[[str, str], Tuple[int, Dict[str, str], Any]]
+
+
+class FakeGithub:
+    def __init__(self):
+        self.handler: Handler = self.answer_ok
+        # (token, path) of every request that reached the network
+        self.sent_requests: List[Tuple[str, str]] = []
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        token: str = request.headers.get('Authorization', '').partition(' ')[2]
+        path: str = urlparse(request.url).path
+        self.sent_requests.append((token, path))
+        status, headers, payload = (401, {}, {'message': 'Bad credentials'}) if token not in ACCOUNTS \
+            else self.handler(token, path)
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json', **headers})
+        response._content = json.dumps(payload).encode()
+        response._content_consumed = True
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    @staticmethod
+    def answer_ok(token: str, path: str) -> Tuple[int, Dict[str, str], Any]:
+        if path == '/user':
+            return 200, {}, {'login': ACCOUNTS[token]}
+        return 200, {'X-RateLimit-Remaining': '4000', 'X-RateLimit-Limit': '5000'}, []
+
+    def get_sent_tokens(self, path_prefix: str) -> List[str]:
+        return [token for token, path in self.sent_requests if path.startswith(path_prefix)]
+
+
+@pytest.fixture
+def fake_github(monkeypatch: pytest.MonkeyPatch) -> FakeGithub:
+    # Below the adapters of the shared sessions, so caching, the request guard and the hooks all run
+    fake = FakeGithub()
+    monkeypatch.setattr(HTTPAdapter, 'send', fake.send)
+    return fake
+
+
+@pytest.fixture
+def session_manager() -> Iterator[GithubSessionManager]:
+    # No retry from the request guard, only the token pool may send a request again
+    request_guard = RequestGuard(max_concurrent_requests=4, max_retries=0, backoff_base=0, backoff_max=0,
+                                 max_retry_after=0, circuit_breaker=CircuitBreaker(window_size=100, min_requests=100,
+                                                                                   failure_ratio=1, cool_down=0))
+    manager = GithubSessionManager(HTTP_RESPONSE_CACHE, RateLimitTracker(), TokenPool(), request_guard,
+                                   TRACE_RECORDER, METRICS_REGISTRY)
+    yield manager
+    manager.close_all_sessions()
+
+
+def get(session_manager: GithubSessionManager, url: str, token: str = 'octocat-token') -> requests.Response:
+    return session_manager.get_session(GITHUB_API_URL).get(url, headers={'Authorization': f'token {token}'})
+
+
+def test_tokens_are_grouped_by_account(fake_github: FakeGithub) -> None:
+    token_pool = TokenPool()
+
+    token_pool.set_tokens(['octocat-token', 'hubot-token', 'octocat-spare-token', 'revoked-token'], GITHUB_API_URL)
+
+    assert {login: account.tokens for login, account in token_pool.accounts.items()} == \
+           {'octocat': ['octocat-token', 'octocat-spare-token'], 'hubot': ['hubot-token']}
+    assert token_pool.token_accounts['octocat-spare-token'] is token_pool.accounts['octocat']
+
+
+def test_tokens_of_a_single_account_are_not_rotated(fake_github: FakeGithub) -> None:
+    token_pool = TokenPool()
+
+    token_pool.set_tokens(['octocat-token', 'octocat-spare-token'], GITHUB_API_URL)
+
+    assert not token_pool.is_enabled()
+    assert token_pool.acquire('octocat-token') == 'octocat-token'
+
+
+@pytest.mark.parametrize('status,headers', [(403, {'X-RateLimit-Remaining': '0'}), (429, {'Retry-After': '60'})],
+                         ids=['primary-rate-limit', 'secondary-rate-limit'])
+def test_rate_limited_account_is_sidelined(fake_github: FakeGithub, session_manager: GithubSessionManager,
+                                           status: int, headers: Dict[str, str]) -> None:
+    session_manager.token_pool.set_tokens(['octocat-token', 'hubot-token'], GITHUB_API_URL)
+    fake_github.handler = lambda token, path: (status, headers, {}) if ACCOUNTS[token] == 'octocat' \
+        else FakeGithub.answer_ok(token, path)
+
+    first_response: requests.Response = get(session_manager, REPOSITORY_URL)
+    second_response: requests.Response = get(session_manager, REPOSITORY_URL)
+
+    # The first account is tried first, retried with the other one, and left out afterwards
+    assert (first_response.status_code, [response.status_code for response in first_response.history]) == \
+           (200, [status])
+    assert (second_response.status_code, second_response.history) == (200, [])
+    assert fake_github.get_sent_tokens('/repos/') == ['octocat-token', 'hubot-token', 'hubot-token']
+    assert not session_manager.token_pool.accounts['octocat'].is_available(time())
+
+
+def test_rejected_token_is_dropped(fake_github: FakeGithub, session_manager: GithubSessionManager) -> None:
+    session_manager.token_pool.set_tokens(['octocat-token', 'octocat-spare-token', 'hubot-token'], GITHUB_API_URL)
+    fake_github.handler = lambda token, path: (401, {}, {}) if token == 'octocat-token' and path != '/user' \
+        else FakeGithub.answer_ok(token, path)
+
+    responses: List[requests.Response] = [get(session_manager, REPOSITORY_URL) for _ in range(4)]
+
+    assert [response.status_code for response in responses] == [200] * 4
+    assert fake_github.get_sent_tokens('/repos/').count('octocat-token') == 1
+    # The account keeps its budget through its spare token
+    assert session_manager.token_pool.accounts['octocat'].get_token() == 'octocat-spare-token'
+    assert 'octocat-spare-token' in fake_github.get_sent_tokens('/repos/')
+
+
+def test_retry_uses_the_next_token(fake_github: FakeGithub, session_manager: GithubSessionManager) -> None:
+    session_manager.token_pool.set_tokens(['octocat-token', 'hubot-token'], GITHUB_API_URL)
+    fake_github.handler = lambda token, path: (429, {'Retry-After': '60'}, {}) if path.startswith('/repos/') \
+        else FakeGithub.answer_ok(token, path)
+
+    response: requests.Response = get(session_manager, REPOSITORY_URL)
+
+    # Every account was tried once, the last answer is the one reported
+    assert fake_github.get_sent_tokens('/repos/') == ['octocat-token', 'hubot-token']
+    assert (response.status_code, len(response.history)) == (429, 1)
+    assert not session_manager.token_pool.has_available_token()
+
+
+def test_retried_response_goes_through_the_session_hooks(fake_github: FakeGithub,
+                                                         session_manager: GithubSessionManager) -> None:
+    session_manager.token_pool.set_tokens(['octocat-token', 'hubot-token'], GITHUB_API_URL)
+    fake_github.handler = lambda token, path: (403, {'X-RateLimit-Remaining': '0'}, {}) \
+        if ACCOUNTS[token] == 'octocat' else FakeGithub.answer_ok(token, path)
+
+    get(session_manager, REPOSITORY_URL)
+
+    assert session_manager.rate_limit_tracker.get_charged_requests() == {'core': 2}
+    assert session_manager.rate_limit_tracker.get_status('core').remaining == 4000
+
+
+def test_user_requests_keep_the_main_token(fake_github: FakeGithub, session_manager: GithubSessionManager) -> None:
+    session_manager.token_pool.set_tokens(['octocat-token', 'hubot-token'], GITHUB_API_URL)
+    fake_github.sent_requests.clear()
+
+    for url in [f'{GITHUB_API_URL}/user', f'{GITHUB_API_URL}/user/repos', f'{GITHUB_API_URL}/notifications',
+                f'{GITHUB_API_URL}/search/issues?q=review-requested:@me', f'{GITHUB_API_URL}/graphql']:
+        for _ in range(3):
+            get(session_manager, url)
+    for _ in range(4):
+        get(session_manager, REPOSITORY_URL)
+
+    assert set(token for token, path in fake_github.sent_requests if not path.startswith('/repos/')) == \
+           {'octocat-token'}
+    assert set(fake_github.get_sent_tokens('/repos/')) == {'octocat-token', 'hubot-token'}
+
+
+@pytest.fixture
+def two_accounts_recording(fake_github: FakeGithub) -> Iterator[FakeGithub]:
+    # The recorded account answers as octocat, a second account with a larger budget sees none of its repositories
+    with open(os.path.join(FIXTURES_DIR, 'rest_recording.json'), encoding='utf-8') as fixture:
+        responses: Dict[str, Any] = json.load(fixture)['responses']
+
+    def handle(token: str, path: str) -> Tuple[int, Dict[str, str], Any]:
+        headers: Dict[str, str] = {'X-RateLimit-Remaining': '100' if ACCOUNTS[token] == 'octocat' else '4000',
+                                   'X-RateLimit-Limit': '5000', 'X-RateLimit-Resource': 'core'}
+        if path == '/user':
+            return 200, headers, {**responses['/user'], 'login': ACCOUNTS[token]}
+        if path == '/user/repos' and ACCOUNTS[token] != 'octocat':
+            return 200, headers, []
+        payload: Optional[Any] = responses.get(path, responses.get(f'{GITHUB_API_URL}{path}'))
+        # Unprotected branches answer 404 on their required reviews
+        return (404, headers, {'message': 'Not Found'}) if payload is None else (200, headers, payload)
+
+    fake_github.handler = handle
+    TOKEN_POOL.set_tokens(['octocat-token', 'hubot-token'], GITHUB_API_URL)
+    # Resolving the accounts of the pool asked each of them who it is
+    fake_github.sent_requests.clear()
+    yield fake_github
+    TOKEN_POOL.set_tokens([], GITHUB_API_URL)
+
+
+def get_repository_names(repositories_info: List[RepositoryInfo]) -> List[str]:
+    return [repository_info.name for repository_info in repositories_info]
+
+
+def test_current_user_and_repositories_stay_stable_across_accounts(two_accounts_recording: FakeGithub) -> None:
+    fetcher = RepositoryInfoFetcher()
+    # The fetcher is a singleton, nothing from a previous test may be reused
+    fetcher.invalidate_cache()
+    fetcher.pull_requests_snapshot = {}
+    fetcher.current_user = None
+    fetcher.set_fetch_backend(REST_FETCH_BACKEND)
+    fetcher.set_discovery_mode(REPOSITORIES_DISCOVERY_MODE)
+
+    first_repository_names: List[str] = get_repository_names(fetcher.get_repositories_info('octocat-token', None))
+    first_snapshot = fetcher.pull_requests_snapshot
+    second_repository_names: List[str] = get_repository_names(fetcher.get_repositories_info('octocat-token', None))
+
+    assert fetcher.current_user == 'octocat'
+    assert first_repository_names == second_repository_names == ['gadgets', 'widgets']
+    # The second refresh built on the first one instead of starting over for another user
+    assert first_snapshot and fetcher.reused_prs_count == len(first_snapshot)
+    assert set(two_accounts_recording.get_sent_tokens('/user')) == {'octocat-token'}
+    assert 'hubot-token' in two_accounts_recording.get_sent_tokens('/repos/')